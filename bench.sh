@@ -0,0 +1,20 @@
+python3 src/bench_textnode.py
+python3 src/bench_htmlnode.py
+python3 src/bench_build.py
+python3 src/bench_blocknode.py 50
+python3 src/bench_inlinecache.py
+python3 src/bench_suite.py
+python3 src/bench_metrics.py
+python3 src/bench_asyncbuild.py
+python3 src/bench_spanbuffer.py
+python3 src/bench_escape.py
+python3 src/bench_frozen.py
+python3 src/bench_startup.py
+python3 src/bench_watch.py
+python3 src/bench_mmapsource.py 1024
+python3 src/bench_batch.py
+python3 src/bench_output.py
+python3 src/bench_searchindex.py
+python3 src/bench_references.py
+python3 src/bench_astcache.py
+python3 src/bench_template.py
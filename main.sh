@@ -1 +1 @@
-python3 src/main.py
+PYTHONPATH=src python3 -m staticsite "$@"
@@ -0,0 +1,57 @@
+import gc
+import os
+import tempfile
+import time
+
+from bench_build import PAGE
+from staticsite.astcache import ASTCache, dump_textnodes, load_textnodes
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.textnode import text_to_textnodes
+
+
+def make_pages(pages):
+    # A few screens of Markdown per page: the bench_build page with its body repeated.
+    return [PAGE.format(n=n) + "\n".join(PAGE.format(n=n).split("\n")[2:]) * 4 for n in range(pages)]
+
+
+def timed(func):
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def directory_size(root):
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, names in os.walk(root) for name in names)
+
+
+def bench_astcache(pages=5_000):
+    markdowns = make_pages(pages)
+    source_bytes = sum(len(markdown.encode("utf-8")) for markdown in markdowns)
+    print(f"{pages} pages, {source_bytes / 1e6:.1f} MB of Markdown")
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = ASTCache(root)
+        parse_time, trees = timed(lambda: [markdown_to_html_node(markdown) for markdown in markdowns])
+        store_time, _ = timed(lambda: [cache.put(markdown, tree) for markdown, tree in zip(markdowns, trees)])
+        load_time, loaded = timed(lambda: [cache.get(markdown) for markdown in markdowns])
+        assert [tree.to_html() for tree in loaded] == [tree.to_html() for tree in trees]
+        print(f"  page trees: parse {parse_time:.3f}s, load from cache {load_time:.3f}s, "
+              f"speedup {parse_time / load_time:.1f}x (storing {store_time:.3f}s)")
+        print(f"  cache size {directory_size(root) / 1e6:.1f} MB")
+
+    paragraphs = [block for markdown in markdowns for block in markdown.split("\n\n") if not block.startswith("#")]
+    parse_time, text_nodes = timed(lambda: [text_to_textnodes(text) for text in paragraphs])
+    blobs = [dump_textnodes(nodes) for nodes in text_nodes]
+    load_time, loaded = timed(lambda: [load_textnodes(blob) for blob in blobs])
+    assert loaded == text_nodes
+    print(f"  TextNodes of {len(paragraphs)} paragraphs: text_to_textnodes {parse_time:.3f}s, "
+          f"load_textnodes {load_time:.3f}s, speedup {parse_time / load_time:.1f}x")
+
+
+if __name__ == "__main__":
+    bench_astcache()
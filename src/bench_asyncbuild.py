@@ -0,0 +1,27 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from bench_build import counts, make_site, timed
+from staticsite.build import build_site
+
+
+def bench_pipelines(pages=50_000):
+    # Full builds of the same tree, so the difference is how reads, conversion and
+    # writes overlap. Each build starts from an empty output directory.
+    print(f"Full build of {pages} pages on local disk, batch vs async pipeline "
+          f"({os.cpu_count()} CPUs available)")
+    root = tempfile.mkdtemp()
+    try:
+        content, output, template = make_site(root, pages)
+        for pipeline, jobs in (("batch", 1), ("async", 1), ("batch", 4), ("async", 4)):
+            shutil.rmtree(output, ignore_errors=True)
+            elapsed, stats = timed(build_site, content, output, template, None, jobs, 0, None, pipeline)
+            print(f"  {pipeline} jobs={jobs}: {elapsed:.2f}s, {pages / elapsed:,.0f} pages/s {counts(stats)}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    bench_pipelines(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,71 @@
+import gc
+import io
+import time
+
+from staticsite.textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
+
+
+def make_nodes(count):
+    # The mix text_to_textnodes gives for ordinary prose: mostly text, some of each
+    # inline type, now and then something that needs escaping.
+    nodes = []
+    for i in range(count):
+        kind = i % 8
+        if kind == 0:
+            nodes.append(TextNode(f"bold {i}", TextType.BOLD))
+        elif kind == 1:
+            nodes.append(TextNode(f"italic {i}", TextType.ITALIC))
+        elif kind == 2:
+            nodes.append(TextNode(f"a < b && {i}", TextType.CODE))
+        elif kind == 3:
+            nodes.append(TextNode(f"link {i}", TextType.LINK, f"https://boot.dev/{i}"))
+        elif kind == 4:
+            nodes.append(TextNode(f"image {i}", TextType.IMAGE, f"https://i.imgur.com/{i}.png"))
+        else:
+            nodes.append(TextNode(f" plain text number {i} in between ", TextType.TEXT))
+    return nodes
+
+
+def per_node(nodes):
+    return "".join([text_node_to_html_node(node).to_html() for node in nodes])
+
+
+def batch(nodes):
+    return text_nodes_to_html(nodes)
+
+
+def batch_to_buffer(nodes):
+    out = io.StringIO()
+    text_nodes_to_html(nodes, out)
+    return out
+
+
+def bench_batch(count=1_000_000, rounds=3):
+    # Interleaved rounds, best of each kept, with the collector off while timing.
+    print(f"Converting {count} TextNodes to HTML")
+    nodes = make_nodes(count)
+    assert per_node(nodes) == batch(nodes)
+    variants = [
+        ("LeafNode per node (before)", per_node),
+        ("text_nodes_to_html", batch),
+        ("text_nodes_to_html to buffer", batch_to_buffer),
+    ]
+    best = {}
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for name, func in variants:
+                start = time.perf_counter()
+                func(nodes)
+                elapsed = time.perf_counter() - start
+                best[name] = min(best.get(name, elapsed), elapsed)
+    finally:
+        gc.enable()
+    baseline = best[variants[0][0]]
+    for name, _ in variants:
+        print(f"  {name:30} {best[name]:.3f}s, {best[name] / count * 1e9:4.0f} ns per node, "
+              f"speedup {baseline / best[name]:.1f}x")
+
+
+if __name__ == "__main__":
+    bench_batch()
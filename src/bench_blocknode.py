@@ -0,0 +1,75 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from staticsite.blocknode import markdown_to_html_file, markdown_to_html_node
+
+
+SECTION = """## Release {n}
+
+This release has **bold changes**, an _italic_ note and a `code` sample.
+See the [notes](https://boot.dev/releases/{n}) for details.
+
+- fixed one thing
+- fixed [another](https://boot.dev/issues/{n})
+- added an ![icon](https://i.imgur.com/{n}.png)
+
+```
+run --release {n}
+```
+
+> Thanks to everyone who helped.
+
+"""
+
+
+def make_input(path, megabytes):
+    target = megabytes * 1024 * 1024
+    written = 0
+    n = 0
+    with open(path, "w") as fp:
+        while written < target:
+            chunk = "".join(SECTION.format(n=n + i) for i in range(1000))
+            fp.write(chunk)
+            written += len(chunk)
+            n += 1000
+
+
+def convert(mode, path):
+    with open(os.devnull, "w") as fp_out:
+        with open(path) as fp_in:
+            if mode == "stream":
+                markdown_to_html_file(fp_in, fp_out)
+            else:
+                markdown_to_html_node(fp_in.read()).render_to(fp_out)
+
+
+def run_child(mode, path):
+    # Each mode runs in its own process so its peak RSS isn't mixed up with the other's.
+    start = time.perf_counter()
+    convert(mode, path)
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak_kib}")
+
+
+def bench_streaming(megabytes):
+    print(f"Block conversion of a {megabytes} MB document: read() whole vs streaming")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.md")
+        make_input(path, megabytes)
+        for mode in ("read", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, path],
+                                 capture_output=True, text=True, check=True).stdout
+            elapsed, peak_kib = out.split()[-2:]
+            print(f"  {mode}: {float(elapsed):.1f}s, peak RSS {int(peak_kib) / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        run_child(sys.argv[2], sys.argv[3])
+    else:
+        bench_streaming(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
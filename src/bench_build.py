@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import time
+
+from staticsite.build import build_site
+
+
+PAGE = (
+    "# Page {n}\n\n"
+    "This is **bold text** with an _italic_ word, a `code block` and a [link](https://boot.dev/{n}).\n\n"
+    "## Section\n\n"
+    "Another paragraph with an ![image](https://i.imgur.com/{n}.png) in it.\n"
+)
+
+
+def make_site(root, pages):
+    content = os.path.join(root, "content")
+    for n in range(pages):
+        directory = os.path.join(content, f"section{n % 100}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"page{n}.md"), "w") as fp:
+            fp.write(PAGE.format(n=n))
+    template = os.path.join(root, "template.html")
+    with open(template, "w") as fp:
+        fp.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+    return content, os.path.join(root, "public"), template
+
+
+def counts(stats):
+    return {key: stats[key] for key in ("built", "skipped", "removed")}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_incremental_build(pages=10_000):
+    print(f"Incremental build of {pages} pages")
+    root = tempfile.mkdtemp()
+    try:
+        content, output, template = make_site(root, pages)
+        full, stats = timed(build_site, content, output, template)
+        print(f"  full build {full:.3f}s {counts(stats)}")
+        noop, stats = timed(build_site, content, output, template)
+        print(f"  no-op rebuild {noop:.3f}s {counts(stats)}")
+        with open(os.path.join(content, "section0", "page0.md"), "a") as fp:
+            fp.write("\nOne more line.\n")
+        one, stats = timed(build_site, content, output, template)
+        print(f"  one page changed {one:.3f}s {counts(stats)}")
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_parallel_build(pages=10_000):
+    print(f"Full build of {pages} pages by worker count ({os.cpu_count()} CPUs available)")
+    root = tempfile.mkdtemp()
+    try:
+        content, output, template = make_site(root, pages)
+        baseline = None
+        for jobs in (1, 2, 4, 8):
+            shutil.rmtree(output, ignore_errors=True)
+            elapsed, stats = timed(build_site, content, output, template, None, jobs)
+            baseline = baseline or elapsed
+            busiest = max(worker["seconds"] for worker in stats["workers"])
+            print(f"  jobs={jobs}: {elapsed:.3f}s, speedup {baseline / elapsed:.2f}x, "
+                  f"{len(stats['workers'])} workers, busiest worker {busiest:.3f}s")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    bench_incremental_build()
+    bench_parallel_build()
@@ -0,0 +1,94 @@
+import gc
+import html
+import time
+
+from staticsite.escape import SafeString
+from staticsite.htmlnode import LeafNode, ParentNode
+
+
+class RawLeaf(LeafNode):
+    # to_html as it was before escaping, for the baseline.
+    __slots__ = ()
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("All leaf nodes must have a value.")
+        if not self.tag:
+            return f"{self.value}"
+        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+
+    def props_to_html(self):
+        if self.props is None:
+            return ""
+        return "".join([f' {k}="{v}"' for k, v in self.props.items()])
+
+
+class NaiveLeaf(LeafNode):
+    # html.escape on every value and attribute, no fast path.
+    __slots__ = ()
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("All leaf nodes must have a value.")
+        if not self.tag:
+            return html.escape(self.value, quote=False)
+        return f"<{self.tag}{self.props_to_html()}>{html.escape(self.value, quote=False)}</{self.tag}>"
+
+
+    def props_to_html(self):
+        if self.props is None:
+            return ""
+        return "".join([f' {k}="{html.escape(v)}"' for k, v in self.props.items()])
+
+
+def make_tree(leaf_cls, count, make_value):
+    # Paragraphs of ten leaves: plain text, bold and a link with an href.
+    paragraphs = []
+    for p in range(count // 10):
+        leaves = []
+        for i in range(10):
+            value = make_value(p * 10 + i)
+            if i % 3 == 0:
+                leaves.append(leaf_cls(None, value))
+            elif i % 3 == 1:
+                leaves.append(leaf_cls("b", value))
+            else:
+                leaves.append(leaf_cls("a", value, {"href": f"https://example.com/{p}/{i}"}))
+        paragraphs.append(ParentNode("p", leaves))
+    return ParentNode("div", paragraphs)
+
+
+def bench_escaping(count=200_000, rounds=5):
+    # Trees are built up front and timed in interleaved rounds, best of each kept,
+    # so allocation and machine noise hit every variant alike. The collector is off
+    # while timing, as in timeit, since its pauses are bigger than the differences.
+    print(f"Rendering {count} leaves, ns per leaf")
+    plain = lambda n: f"leaf number {n} with some words"
+    special = lambda n: f"leaf {n} with <tags> & entities"
+    safe = lambda n: SafeString(f"leaf number {n} with some words")
+    variants = [
+        ("no escaping (before)", make_tree(RawLeaf, count, plain)),
+        ("html.escape per leaf", make_tree(NaiveLeaf, count, plain)),
+        ("escape, nothing to escape", make_tree(LeafNode, count, plain)),
+        ("escape, SafeString values", make_tree(LeafNode, count, safe)),
+        ("escape, every value escaped", make_tree(LeafNode, count, special)),
+    ]
+    best = {}
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for name, tree in variants:
+                start = time.perf_counter()
+                tree.to_html()
+                elapsed = time.perf_counter() - start
+                best[name] = min(best.get(name, elapsed), elapsed)
+    finally:
+        gc.enable()
+    baseline = best[variants[0][0]]
+    for name, _ in variants:
+        print(f"  {name:30} {best[name] / count * 1e9:6.0f} ns ({best[name] / baseline - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    bench_escaping()
@@ -0,0 +1,48 @@
+import time
+
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.htmlnode import LeafNode, ParentNode
+
+
+def make_chrome():
+    # Header, sidebar and footer shared by every page: a few hundred nodes in all.
+    nav = "\n".join(f"- [Section {n}](https://example.com/section/{n}) **new** _items_" for n in range(30))
+    sidebar = "\n".join(f"1. [Post {n}](https://example.com/posts/{n}) with `tags`" for n in range(40))
+    footer = ("Made with **staticsite**, [source](https://example.com/src), "
+              "[license](https://example.com/license).\n\n" + nav)
+    return (
+        ParentNode("header", [LeafNode("h1", "Example site"), markdown_to_html_node(nav)], {"class": "top"}),
+        ParentNode("aside", [markdown_to_html_node(sidebar)]),
+        ParentNode("footer", [markdown_to_html_node(footer)]),
+    )
+
+
+def make_content(n):
+    return markdown_to_html_node(f"# Page {n}\n\nThis is page **{n}** with a [link](https://example.com/{n}).")
+
+
+def render_pages(chrome, contents):
+    header, sidebar, footer = chrome
+    start = time.perf_counter()
+    size = 0
+    for content in contents:
+        size += len(ParentNode("body", [header, sidebar, content, footer]).to_html())
+    return time.perf_counter() - start, size
+
+
+def bench_frozen_chrome(pages=10_000):
+    print(f"Rendering {pages} pages that share a header, sidebar and footer")
+    contents = [make_content(n) for n in range(pages)]
+    chrome = make_chrome()
+    plain, plain_size = render_pages(chrome, contents)
+    for node in chrome:
+        node.freeze()
+    frozen, frozen_size = render_pages(chrome, contents)
+    assert frozen_size == plain_size
+    print(f"  chrome re-rendered per page: {plain:.3f}s")
+    print(f"  chrome frozen:               {frozen:.3f}s ({plain / frozen:.1f}x), "
+          f"{plain_size / pages / 1024:.1f} KiB per page")
+
+
+if __name__ == "__main__":
+    bench_frozen_chrome()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import time
+
+from staticsite.htmlnode import LeafNode, ParentNode
+
+
+def concat_to_html(node):
+    # The old string-concatenation renderer, for comparison.
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    props_str = ""
+    for k, v in (node.props or {}).items():
+        props_str += f' {k}="{v}"'
+    html = f"<{node.tag}{props_str}>"
+    for child in node.children:
+        html += concat_to_html(child)
+    html += f"</{node.tag}>"
+    return html
+
+
+def recursive_iter_html(node):
+    # The previous recursive streaming renderer, for comparison.
+    if not isinstance(node, ParentNode):
+        yield node.to_html()
+        return
+    yield f"<{node.tag}{node.props_to_html()}>"
+    for child in node.children:
+        yield from recursive_iter_html(child)
+    yield f"</{node.tag}>"
+
+
+def make_deep_tree(depth):
+    node = LeafNode("b", "deep")
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+    return node
+
+
+def make_wide_tree(count):
+    return ParentNode("ul", [LeafNode("li", f"item number {i}", {"class": "entry"})
+                             for i in range(count)])
+
+
+def make_page_tree(count):
+    # Sections of paragraphs, each paragraph a handful of inline leaves.
+    paragraphs = []
+    for i in range(count // 5):
+        paragraphs.append(ParentNode("p", [
+            LeafNode(None, "Some plain text "),
+            LeafNode("b", "bold"),
+            LeafNode(None, " and "),
+            LeafNode("a", "a link", {"href": f"https://example.com/{i}"}),
+        ]))
+    sections = [ParentNode("section", paragraphs[i:i + 100])
+                for i in range(0, len(paragraphs), 100)]
+    return ParentNode("main", sections)
+
+
+def best_of(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def render_to_file(node, path):
+    with open(path, "w") as fp:
+        node.render_to(fp)
+
+
+def bench_render():
+    print("HTML rendering of 100k-node trees: concatenation vs streaming")
+    path = os.path.join(tempfile.mkdtemp(), "out.html")
+    for name, tree in (("wide", make_wide_tree(100_000)), ("page", make_page_tree(100_000))):
+        concat = best_of(lambda: concat_to_html(tree))
+        joined = best_of(tree.to_html)
+        streamed = best_of(lambda: render_to_file(tree, path))
+        print(f"  {name}: concat {concat:.3f}s, to_html {joined:.3f}s, render_to file {streamed:.3f}s")
+    os.remove(path)
+
+
+def bench_iterative():
+    print("Recursive vs explicit-stack rendering")
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(50_000)
+    try:
+        for name, tree in (("10k deep", make_deep_tree(10_000)), ("1M wide", make_wide_tree(1_000_000))):
+            recursive = best_of(lambda: "".join(recursive_iter_html(tree)))
+            iterative = best_of(tree.to_html)
+            print(f"  {name}: recursive {recursive:.3f}s, iterative {iterative:.3f}s")
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+if __name__ == "__main__":
+    bench_render()
+    bench_iterative()
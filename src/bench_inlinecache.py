@@ -0,0 +1,47 @@
+import time
+
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.inlinecache import InlineCache
+
+
+NAV = (
+    "- [Home](https://example.com/) and [Blog](https://example.com/blog) and [About](https://example.com/about)\n"
+    "- [Projects](https://example.com/projects) with **featured** and _archived_ entries\n"
+    "- [Contact](https://example.com/contact) via `email` or [mastodon](https://example.social/@me)\n"
+)
+
+FOOTER = (
+    "Made with **staticsite**. Licensed under [CC BY](https://creativecommons.org/licenses/by/4.0/). "
+    "Source on [GitHub](https://github.com/example/site), built with `python3`, "
+    "hosted on ![a tiny logo](https://example.com/logo.png) infrastructure.\n"
+)
+
+
+def make_page(n):
+    return (
+        f"# Page {n}\n\n{NAV}\n"
+        f"This page is number **{n}** with a [unique link](https://example.com/{n}).\n\n"
+        f"{NAV}\n{FOOTER}\n{FOOTER}"
+    )
+
+
+def time_pages(pages, cache=None):
+    start = time.perf_counter()
+    for page in pages:
+        markdown_to_html_node(page, cache).to_html()
+    return time.perf_counter() - start
+
+
+def bench_inline_cache(count=10_000):
+    print(f"Converting {count} pages sharing nav and footer fragments")
+    pages = [make_page(n) for n in range(count)]
+    uncached = time_pages(pages)
+    cache = InlineCache(maxsize=1024)
+    cached = time_pages(pages, cache)
+    stats = cache.stats()
+    print(f"  uncached {uncached:.3f}s, cached {cached:.3f}s, speedup {uncached / cached:.1f}x")
+    print(f"  {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    bench_inline_cache()
@@ -0,0 +1,35 @@
+import time
+
+from staticsite.metrics import collecting
+from staticsite.textnode import text_nodes_to_html_nodes, text_to_textnodes
+
+
+TEXT = "This is **text** with an _italic_ word and a `code block` and a [link](https://boot.dev)"
+
+
+def time_calls(func, arg, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func(arg)
+    return time.perf_counter() - start
+
+
+def bench_overhead(count=50_000):
+    # Instrumentation is meant to be left compiled in, so the disabled wrapper has to
+    # be close to free next to calling the undecorated function.
+    print(f"Instrumentation overhead over {count} calls")
+    nodes = text_to_textnodes(TEXT)
+    for name, func, arg in (
+        ("text_to_textnodes", text_to_textnodes, TEXT),
+        ("text_nodes_to_html_nodes", text_nodes_to_html_nodes, nodes),
+    ):
+        bare = time_calls(func.__wrapped__, arg, count)
+        disabled = time_calls(func, arg, count)
+        with collecting():
+            enabled = time_calls(func, arg, count)
+        print(f"  {name}: bare {bare:.3f}s, disabled {disabled:.3f}s "
+              f"({disabled / bare - 1:+.1%}), enabled {enabled:.3f}s ({enabled / bare - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    bench_overhead()
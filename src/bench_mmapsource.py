@@ -0,0 +1,72 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_blocknode import make_input
+from staticsite.blocknode import markdown_to_html_file, markdown_to_html_node
+from staticsite.mmapsource import MappedSource
+
+
+def convert(mode, path):
+    with open(os.devnull, "w") as fp_out:
+        if mode == "mmap":
+            with MappedSource(path) as source:
+                markdown_to_html_file(source, fp_out)
+            return
+        with open(path) as fp_in:
+            if mode == "stream":
+                markdown_to_html_file(fp_in, fp_out)
+            else:
+                markdown_to_html_node(fp_in.read()).render_to(fp_out)
+
+
+def scan(mode, path):
+    # Block grouping alone, without building or rendering nodes.
+    if mode == "mmap":
+        with MappedSource(path) as source:
+            for _ in source.iter_blocks():
+                pass
+        return
+    from staticsite.blocknode import iter_blocks
+
+    with open(path) as fp_in:
+        lines = fp_in.read().splitlines() if mode == "read" else fp_in
+        for _ in iter_blocks(lines):
+            pass
+
+
+def run_child(task, mode, path):
+    # Each run gets its own process so its peak RSS isn't mixed up with the others'.
+    start = time.perf_counter()
+    (convert if task == "convert" else scan)(mode, path)
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak_kib}")
+
+
+def bench_mapped_input(megabytes):
+    print(f"{megabytes} MB document: read() whole vs streaming lines vs memory-mapped")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.md")
+        make_input(path, megabytes)
+        for task in ("scan", "convert"):
+            print(f"  {task}:")
+            for mode in ("read", "stream", "mmap"):
+                child = subprocess.run([sys.executable, __file__, "--child", task, mode, path],
+                                       capture_output=True, text=True)
+                if child.returncode != 0:
+                    # read() on a big enough input runs out of memory.
+                    print(f"    {mode}: failed with exit status {child.returncode}")
+                    continue
+                elapsed, peak_kib = child.stdout.split()[-2:]
+                print(f"    {mode}: {float(elapsed):.1f}s, peak RSS {int(peak_kib) / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        run_child(*sys.argv[2:5])
+    else:
+        bench_mapped_input(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import time
+
+from bench_build import make_site
+from staticsite import build
+from staticsite.build import MANIFEST_NAME, build_site
+
+
+def rewrite_output(output_path, html):
+    # write_output as it was before: every rendered page rewritten in place.
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as fp:
+        fp.write(html)
+    return True
+
+
+def sync(source_dir, target_dir):
+    # rsync's default quick check: copy whatever differs in size or mtime from the
+    # deployed copy. Returns the number of files copied.
+    copied = 0
+    for dirpath, _, filenames in os.walk(source_dir):
+        out_dir = os.path.join(target_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(out_dir, exist_ok=True)
+        for filename in filenames:
+            source = os.path.join(dirpath, filename)
+            target = os.path.join(out_dir, filename)
+            st = os.stat(source)
+            try:
+                deployed = os.stat(target)
+                if deployed.st_size == st.st_size and deployed.st_mtime_ns == st.st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                pass
+            shutil.copy2(source, target)
+            copied += 1
+    return copied
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_unchanged_writes(pages=20_000, changed=0.01):
+    # A full rebuild, as on CI with no build manifest carried over, after a small
+    # fraction of the sources were edited, then a sync of the output to a deploy copy.
+    print(f"Rebuild and sync of {pages} pages with {changed:.0%} changed")
+    for name, writer in (("rewrite every page", rewrite_output), ("skip unchanged", build.write_output)):
+        root = tempfile.mkdtemp()
+        try:
+            content, output, template = make_site(root, pages)
+            deployed = os.path.join(root, "deployed")
+            build_site(content, output, template)
+            sync(output, deployed)
+            for n in range(0, pages, int(1 / changed)):
+                with open(os.path.join(content, f"section{n % 100}", f"page{n}.md"), "a") as fp:
+                    fp.write("\nOne more line.\n")
+            os.remove(os.path.join(output, MANIFEST_NAME))
+            original = build.write_output
+            build.write_output = writer
+            try:
+                build_time, stats = timed(build_site, content, output, template)
+            finally:
+                build.write_output = original
+            sync_time, copied = timed(sync, output, deployed)
+            print(f"  {name:18}: build {build_time:.3f}s, sync {sync_time:.3f}s, "
+                  f"{copied} files copied (built {stats['built']})")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    bench_unchanged_writes()
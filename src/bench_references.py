@@ -0,0 +1,95 @@
+import gc
+import posixpath
+import random
+import time
+
+from staticsite.references import ReferenceIndex, add_references
+from staticsite.textnode import extract_markdown_images, extract_markdown_links, text_to_textnodes
+
+
+def make_pages(pages, links, seed=0):
+    # {page url: inline Markdown}, links spread evenly over the pages: nine in ten
+    # internal, mostly to pages that exist, the rest external; one in five an image.
+    rng = random.Random(seed)
+    urls = [f"section{n % 100}/page{n}.html" for n in range(pages)]
+    per_page = links // pages
+    texts = {}
+    for url in urls:
+        parts = []
+        for i in range(per_page):
+            roll = rng.random()
+            if roll < 0.1:
+                target = f"https://example.com/{i}"
+            elif roll < 0.12:
+                target = f"/section{i % 100}/missing{i}.html"
+            else:
+                target = "/" + rng.choice(urls)
+            marker = "!" if i % 5 == 0 else ""
+            parts.append(f"see {marker}[ref {i}]({target}) and")
+        texts[url] = " ".join(parts)
+    return texts
+
+
+def best_of(func, repeat=3):
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def rescan(texts, page_urls):
+    # What a checker run after the build does: extract the links from every page
+    # again and resolve each one on its own.
+    broken = []
+    for page_url, text in texts.items():
+        for extract in (extract_markdown_links, extract_markdown_images):
+            for _, url in extract(text):
+                if "://" in url:
+                    continue
+                path = url[1:] if url.startswith("/") else posixpath.join(posixpath.dirname(page_url), url)
+                if posixpath.normpath(path) not in page_urls:
+                    broken.append((page_url, url))
+    return sorted(broken)
+
+
+def bench_references(pages=10_000, links=1_000_000):
+    print(f"{links} links and images over {pages} pages")
+    texts = make_pages(pages, links)
+    parsed = {url: text_to_textnodes(text) for url, text in texts.items()}
+
+    def parse():
+        return [text_to_textnodes(text) for text in texts.values()]
+
+    def collect():
+        refs = {}
+        for url, text_nodes in parsed.items():
+            add_references(refs.setdefault(url, []), text_nodes)
+        return refs
+
+    parse_time, _ = best_of(parse, repeat=1)
+    collect_time, refs = best_of(collect)
+    print(f"  text_to_textnodes {parse_time:.3f}s, collecting the references from its nodes "
+          f"{collect_time:.3f}s (+{collect_time / parse_time:.0%})")
+
+    def check():
+        index = ReferenceIndex(texts)
+        for url, page_refs in refs.items():
+            index.add_page(url, page_refs)
+        return index.broken()
+
+    index_time, broken = best_of(check)
+    rescan_time, rescanned = best_of(lambda: rescan(texts, set(texts)), repeat=1)
+    assert [tuple(pair) for pair in broken] == rescanned
+    print(f"  broken links: per-page rescan {rescan_time:.3f}s, reference index {index_time:.3f}s, "
+          f"speedup {rescan_time / index_time:.1f}x ({len(broken)} found)")
+
+
+if __name__ == "__main__":
+    bench_references()
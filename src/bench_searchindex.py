@@ -0,0 +1,71 @@
+import gzip
+import os
+import random
+import shutil
+import tempfile
+
+from bench_build import timed
+from bench_suite import WORDS
+from staticsite.build import MANIFEST_NAME, build_site
+from staticsite.metrics import Metrics
+from staticsite.searchindex import SEARCH_DIR
+
+
+def make_corpus(root, pages, words_per_page=300, vocabulary=20_000, seed=0):
+    # Pages of Zipf-ish prose over a made-up vocabulary, so posting lists range from
+    # nearly every page down to a single one, as in real text.
+    rng = random.Random(seed)
+    vocab = [f"{rng.choice(WORDS)}{n}" for n in range(vocabulary)] + list(WORDS)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    content = os.path.join(root, "content")
+    for n in range(pages):
+        directory = os.path.join(content, f"section{n % 100}")
+        os.makedirs(directory, exist_ok=True)
+        words = rng.choices(vocab, weights, k=words_per_page)
+        for i in range(0, len(words), 40):
+            words[i] = f"**{words[i]}**"
+        with open(os.path.join(directory, f"page{n}.md"), "w") as fp:
+            fp.write(f"# Page {n}\n\n" + " ".join(words) + f"\n\nSee [the {words[1]} page](https://boot.dev/{n}).\n")
+    return content, os.path.join(root, "public")
+
+
+def index_size(output):
+    search_dir = os.path.join(output, SEARCH_DIR)
+    compressed = raw = 0
+    for name in os.listdir(search_dir):
+        with open(os.path.join(search_dir, name), "rb") as fp:
+            data = fp.read()
+        compressed += len(data)
+        raw += len(gzip.decompress(data)) if name.endswith(".gz") else len(data)
+    return compressed, raw
+
+
+def bench_search_index(pages=10_000):
+    print(f"Search index over {pages} pages")
+    root = tempfile.mkdtemp()
+    try:
+        content, output = make_corpus(root, pages)
+        plain, _ = timed(build_site, content, output)
+        shutil.rmtree(output)
+        metrics = Metrics()
+        indexed, stats = timed(build_site, content, output, None, None, 1, 0, metrics, "batch", True)
+        compressed, raw = index_size(output)
+        stages = metrics.to_dict()
+        print(f"  full build {plain:.3f}s, with index {indexed:.3f}s, {stats['indexed']} pages indexed")
+        print(f"  inverting and writing the index {stages['search_index']['seconds']:.3f}s")
+        print(f"  index {compressed / 2**20:.2f} MiB gzipped, {raw / 2**20:.2f} MiB as plain JSON")
+        with open(os.path.join(content, "section0", "page0.md"), "a") as fp:
+            fp.write("\nOne more line.\n")
+        one, stats = timed(build_site, content, output, None, None, 1, 0, None, "batch", True)
+        print(f"  one page changed {one:.3f}s, re-indexing all {stats['indexed']} pages from their terms files")
+        noop, _ = timed(build_site, content, output, None, None, 1, 0, None, "batch", True)
+        noop_plain, _ = timed(build_site, content, output)
+        manifest_size = os.path.getsize(os.path.join(output, MANIFEST_NAME))
+        print(f"  no-op build {noop:.3f}s with the index, {noop_plain:.3f}s without; "
+              f"manifest {manifest_size / 2**20:.2f} MiB")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    bench_search_index()
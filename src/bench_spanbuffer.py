@@ -0,0 +1,57 @@
+import time
+import tracemalloc
+
+from bench_suite import make_inline_document
+from staticsite.inlinecache import inline_to_html
+from staticsite.spanbuffer import parse_inline
+from staticsite.textnode import text_to_textnodes
+
+
+def make_document(spans):
+    # Grows the mixed corpus until it parses into at least this many inline spans.
+    size = spans * 8
+    while True:
+        doc = make_inline_document(size, link_density=0.1, delimiter_density=0.3)
+        if len(text_to_textnodes(doc)) >= spans:
+            return doc
+        size *= 2
+
+
+def timed(func, arg, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def retained(func, arg):
+    # Bytes still allocated for the result once parsing is done.
+    tracemalloc.start()
+    result = func(arg)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def bench_span_buffer(spans=100_000):
+    doc = make_document(spans)
+    count = len(text_to_textnodes(doc))
+    print(f"Inline parse of {len(doc) / 1e6:.1f} MB into {count} spans: TextNode list vs SpanBuffer")
+    for name, parse in (("TextNode list", text_to_textnodes), ("SpanBuffer", parse_inline)):
+        seconds, result = timed(parse, doc)
+        print(f"  {name}: parse {seconds:.3f}s ({count / seconds:,.0f} spans/s), "
+              f"retained {retained(parse, doc) / 2**20:.1f} MiB")
+    seconds, _ = timed(inline_to_html, doc)
+    print(f"  render via TextNodes/LeafNodes {seconds:.3f}s")
+    seconds, _ = timed(lambda text: parse_inline(text).to_html(), doc)
+    print(f"  render via SpanBuffer {seconds:.3f}s")
+    seconds, _ = timed(lambda buffer: buffer.to_textnodes(), parse_inline(doc))
+    print(f"  SpanBuffer.to_textnodes {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    bench_span_buffer()
@@ -0,0 +1,68 @@
+import compileall
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGET_MS = 30
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def import_ms(args, stdin=None, repeat=5):
+    # Sum of the top level cumulative import times from -X importtime, best of a few
+    # runs. Callers subtract a bare interpreter's figure, so only the modules the
+    # command adds count.
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    best = None
+    for _ in range(repeat):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", *args], input=stdin,
+                                capture_output=True, text=True, env=env, check=True).stderr
+        total = sum(int(m[2]) for m in IMPORT_LINE.finditer(stderr) if len(m[3]) == 1) / 1000
+        best = total if best is None else min(best, total)
+    return best
+
+
+def wall_ms(args, stdin=None, repeat=5):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], input=stdin, capture_output=True, text=True,
+                       env=env, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_startup():
+    print(f"Startup cost per command, imports beyond a bare interpreter (target {TARGET_MS} ms)")
+    # Byte-compile first: with PYTHONDONTWRITEBYTECODE set, every run would otherwise
+    # compile the package from source, which an installed CLI never does.
+    compileall.compile_dir(os.path.join(SRC_DIR, "staticsite"), quiet=1)
+    baseline_import = import_ms(["-c", "pass"])
+    baseline_wall = wall_ms(["-c", "pass"])
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w") as fp:
+            fp.write("# Home\n\nHello **world**.\n")
+        commands = (
+            ("import staticsite", ["-c", "import staticsite"], None),
+            ("staticsite --help", ["-m", "staticsite", "--help"], None),
+            ("staticsite --convert -", ["-m", "staticsite", "--convert", "-"], "# Title\n\nSome _text_.\n"),
+            ("staticsite (one page build)", ["-m", "staticsite", content, os.path.join(tmp, "public")], None),
+        )
+        for name, args, stdin in commands:
+            imports = import_ms(args, stdin) - baseline_import
+            wall = wall_ms(args, stdin) - baseline_wall
+            verdict = "ok" if imports < TARGET_MS else "OVER"
+            print(f"  {name:30} imports {imports:6.1f} ms, wall +{wall:6.1f} ms  {verdict}")
+
+
+if __name__ == "__main__":
+    bench_startup()
@@ -0,0 +1,244 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+
+from staticsite.htmlnode import ENTER, LeafNode, ParentNode, walk
+from staticsite.textnode import TextNode, TextType, split_nodes_delimiter, text_node_to_html_node, text_to_textnodes
+
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.2
+
+WORDS = ("static", "site", "node", "markdown", "render", "page", "the", "a", "of", "build",
+         "html", "text", "link", "fast", "tree", "and", "with", "for", "to", "in")
+
+
+def make_inline_document(size, link_density=0.1, delimiter_density=0.1, seed=0):
+    # Inline Markdown of roughly size characters. Each word is wrapped in a
+    # delimiter pair with probability delimiter_density, and turned into a link or
+    # image with probability link_density. Seeded, so every run sees the same text.
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+
+    while length < size:
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < link_density:
+            if rng.random() < 0.5:
+                part = f"[{word}](https://example.com/{word}/{length})"
+            else:
+                part = f"![{word}](https://example.com/{word}.png)"
+        elif roll < link_density + delimiter_density:
+            delimiter = rng.choice(("**", "_", "`"))
+            part = f"{delimiter}{word}{delimiter}"
+        else:
+            part = word
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def make_tree(leaf_count, depth):
+    # A div holding groups of ten leaves, each group wrapped in depth nested spans.
+    groups = []
+    for g in range(max(leaf_count // 10, 1)):
+        node = ParentNode("p", [LeafNode("b" if i % 2 else None, f"leaf {g}.{i}") for i in range(10)])
+        for _ in range(depth):
+            node = ParentNode("span", [node], {"class": "nest"})
+        groups.append(node)
+    return ParentNode("div", groups)
+
+
+def count_nodes(node):
+    return sum(1 for event, _ in walk(node) if event is ENTER)
+
+
+# Input builders return (input, number of units in it) for the throughput figure.
+def inline_case(size, link_density, delimiter_density):
+    doc = make_inline_document(size, link_density, delimiter_density)
+    return doc, len(doc) / 1e6
+
+
+def textnode_case(size, link_density, delimiter_density):
+    nodes = text_to_textnodes(make_inline_document(size, link_density, delimiter_density))
+    return nodes, len(nodes)
+
+
+def delimiter_case(size, delimiter_density):
+    doc = make_inline_document(size, 0, delimiter_density)
+    return [TextNode(doc, TextType.TEXT)], len(doc) / 1e6
+
+
+def tree_case(leaf_count, depth):
+    tree = make_tree(leaf_count, depth)
+    return tree, count_nodes(tree)
+
+
+def convert_nodes(nodes):
+    return [text_node_to_html_node(node) for node in nodes]
+
+
+def split_bold(nodes):
+    return split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+
+def render(tree):
+    return tree.to_html()
+
+
+# name -> (stage function, input builder, throughput unit)
+CASES = {
+    "text_to_textnodes/256k-plain": (text_to_textnodes, lambda: inline_case(256_000, 0, 0), "MB"),
+    "text_to_textnodes/256k-mixed": (text_to_textnodes, lambda: inline_case(256_000, 0.1, 0.1), "MB"),
+    "text_to_textnodes/256k-links": (text_to_textnodes, lambda: inline_case(256_000, 0.5, 0), "MB"),
+    "text_to_textnodes/2M-mixed": (text_to_textnodes, lambda: inline_case(2_000_000, 0.1, 0.1), "MB"),
+    "split_nodes_delimiter/1M-sparse": (split_bold, lambda: delimiter_case(1_000_000, 0.02), "MB"),
+    "split_nodes_delimiter/1M-dense": (split_bold, lambda: delimiter_case(1_000_000, 0.5), "MB"),
+    "text_node_to_html_node/mixed": (convert_nodes, lambda: textnode_case(1_000_000, 0.1, 0.3), "nodes"),
+    "to_html/flat": (render, lambda: tree_case(100_000, 0), "nodes"),
+    "to_html/depth-10": (render, lambda: tree_case(20_000, 10), "nodes"),
+    "to_html/depth-1000": (render, lambda: tree_case(200, 1000), "nodes"),
+}
+
+
+def measure(func, arg, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_cases(names, repeat=3):
+    results = {}
+    for name in names:
+        func, build, unit = CASES[name]
+        arg, units = build()
+        seconds, peak = measure(func, arg, repeat)
+        results[name] = {
+            "throughput": units / seconds,
+            "unit": f"{unit}/s",
+            "seconds": seconds,
+            "peak_memory": peak,
+        }
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Returns a list of (case, message) for every case that got slower or hungrier than
+    # the baseline by more than threshold. Cases missing from either side are skipped.
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - threshold):
+            drop = 1 - result["throughput"] / base["throughput"]
+            regressions.append((name, f"throughput down {drop:.0%} "
+                                      f"({base['throughput']:.3g} -> {result['throughput']:.3g} {result['unit']})"))
+        if result["peak_memory"] > base["peak_memory"] * (1 + threshold):
+            growth = result["peak_memory"] / base["peak_memory"] - 1
+            regressions.append((name, f"peak memory up {growth:.0%} "
+                                      f"({base['peak_memory']} -> {result['peak_memory']} bytes)"))
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != BASELINE_VERSION:
+        return None
+    return data["results"]
+
+
+def save_baseline(path, results):
+    with open(path, "w") as fp:
+        json.dump({"version": BASELINE_VERSION, "results": results}, fp, indent=2, sort_keys=True)
+        fp.write("\n")
+
+
+def profile_cases(names, limit=15, dump_dir=None):
+    # Runs each case once under cProfile and prints its hottest functions by own time.
+    for name in names:
+        func, build, _ = CASES[name]
+        arg, _ = build()
+        profiler = cProfile.Profile()
+        profiler.runcall(func, arg)
+        print(f"== {name}")
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        stats.sort_stats("tottime").print_stats(limit)
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+            stats.dump_stats(os.path.join(dump_dir, name.replace("/", "_") + ".prof"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the node pipeline and gate on regressions.")
+    parser.add_argument("cases", nargs="*", help="case names to run (default: all)")
+    # Timings only compare on the machine that recorded them, so there is no default
+    # baseline file: the gate runs only when one is named (and bench_baseline.json is
+    # gitignored).
+    parser.add_argument("--baseline", help="baseline JSON file to gate against")
+    parser.add_argument("--update", action="store_true", help="write the results as the new --baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown / memory growth as a fraction (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, best is kept")
+    parser.add_argument("--profile", action="store_true", help="print cProfile hot spots instead of timing")
+    parser.add_argument("--profile-dir", help="also dump one .prof file per case here")
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    args = parser.parse_args(argv)
+    if args.update and not args.baseline:
+        parser.error("--update needs --baseline")
+
+    names = args.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if args.list or unknown:
+        if unknown:
+            print(f"unknown cases: {', '.join(unknown)}")
+        print("\n".join(CASES))
+        return 2 if unknown else 0
+    if args.profile:
+        profile_cases(names, dump_dir=args.profile_dir)
+        return 0
+
+    results = run_cases(names, args.repeat)
+    for name, result in results.items():
+        print(f"{name:36} {result['throughput']:10.3f} {result['unit']:8} "
+              f"peak {result['peak_memory'] / 2**20:8.1f} MiB")
+
+    if not args.baseline:
+        return 0
+    baseline = load_baseline(args.baseline)
+    if args.update:
+        save_baseline(args.baseline, {**(baseline or {}), **results})
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        # A missing or outdated baseline must not pass the gate silently.
+        print(f"no usable baseline at {args.baseline}; record one with --update")
+        return 2
+    regressions = compare(results, baseline, args.threshold)
+    for name, message in regressions:
+        print(f"REGRESSION {name}: {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
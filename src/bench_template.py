@@ -0,0 +1,68 @@
+import gc
+import time
+
+from bench_frozen import make_chrome, make_content
+from staticsite.escape import SafeString
+from staticsite.template import Template
+
+
+def make_template():
+    # A realistic page shell: head with a stylesheet block, a navigation slot, the
+    # content and a footer, a few KiB of static HTML around three slots.
+    styles = "\n".join(f".rule-{n} {{ margin: {n}px; padding: {n % 7}px; }}" for n in range(120))
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{{ Title }}</title>\n"
+        f"<style>\n{styles}\n</style>\n</head>\n<body>\n{{{{ Nav }}}}\n<main>\n{{{{ Content }}}}\n</main>\n"
+        "<footer>Made with staticsite</footer>\n</body>\n</html>\n"
+    )
+
+
+def naive(text, title, nav, content):
+    return text.replace("{{ Title }}", title).replace("{{ Nav }}", nav).replace("{{ Content }}", content)
+
+
+def timed(func):
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def bench_template(pages=10_000):
+    text = make_template()
+    header, _, _ = make_chrome()
+    header.freeze()
+    nav = SafeString(header.to_html())
+    contents = [SafeString(make_content(n).to_html()) for n in range(pages)]
+    titles = [f"Page {n}" for n in range(pages)]
+    print(f"Wrapping {pages} pages in a {len(text) / 1024:.1f} KiB template with a "
+          f"{len(nav) / 1024:.1f} KiB nav")
+
+    replace_time, replaced = timed(lambda: [naive(text, title, nav, content)
+                                            for title, content in zip(titles, contents)])
+
+    def compiled():
+        template = Template(text)
+        return [template.render({"Title": title, "Nav": nav, "Content": content})
+                for title, content in zip(titles, contents)]
+
+    compiled_time, rendered = timed(compiled)
+    assert rendered == replaced
+
+    def compiled_node():
+        template = Template(text)
+        return [template.render({"Title": title, "Nav": header, "Content": content})
+                for title, content in zip(titles, contents)]
+
+    node_time, rendered = timed(compiled_node)
+    assert rendered == replaced
+    print(f"  str.replace per slot:          {replace_time:.3f}s")
+    print(f"  precompiled template:          {compiled_time:.3f}s ({replace_time / compiled_time:.1f}x)")
+    print(f"  precompiled, frozen nav node:  {node_time:.3f}s ({replace_time / node_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    bench_template()
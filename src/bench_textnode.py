@@ -0,0 +1,169 @@
+import contextlib
+import os
+import time
+import tracemalloc
+
+from staticsite.textnode import TextNode, TextType, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from staticsite.textnode import text_node_to_html_node, extract_markdown_images, extract_markdown_links
+from staticsite.htmlnode import LeafNode
+
+
+PARAGRAPH = (
+	"This is **bold text** with an _italic_ word, a `code block`, an "
+	"![image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev). "
+	"Then a plain sentence with nothing special in it at all to pad things out.\n"
+)
+
+
+def staged_text_to_textnodes(mkdntxt):
+	# The old five-stage pipeline, for comparison.
+	nodes = [TextNode(mkdntxt, TextType.TEXT)]
+	nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+	nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+	nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+	nodes = split_nodes_image(nodes)
+	nodes = split_nodes_link(nodes)
+	return nodes
+
+
+class DictTextNode:
+	# TextNode and LeafNode as they were before __slots__, for comparison.
+	def __init__(self, text, text_type, url=None):
+		self.text = text
+		self.text_type = text_type
+		self.url = url
+
+
+class DictLeafNode:
+	def __init__(self, tag, value, props=None):
+		self.tag = tag
+		self.value = value
+		self.children = []
+		self.props = props
+
+
+def string_split_nodes(old_nodes, extract, template, text_type):
+	# split_nodes_image/split_nodes_link as they were before match spans: re-search
+	# with an uncompiled pattern, then rebuild each match and str.split on it.
+	resultlst = []
+	for node in old_nodes:
+		try:
+			extractions = extract(node.text)
+		except Exception:
+			resultlst.append(node)
+			continue
+		remaining = node.text
+		for e in extractions:
+			before, remaining = remaining.split(template.format(*e), 1)
+			if before:
+				resultlst.append(TextNode(before, TextType.TEXT))
+			resultlst.append(TextNode(e[0], text_type, e[1]))
+		if remaining:
+			resultlst.append(TextNode(remaining, TextType.TEXT))
+	return resultlst
+
+
+def string_split_images_and_links(nodes):
+	nodes = string_split_nodes(nodes, extract_markdown_images, "![{}]({})", TextType.IMAGE)
+	return string_split_nodes(nodes, extract_markdown_links, "[{}]({})", TextType.LINK)
+
+
+def span_split_images_and_links(nodes):
+	return split_nodes_link(split_nodes_image(nodes))
+
+
+def raising_split_images_and_links(nodes):
+	# The splitters before the fast path: every node without a match went through
+	# an extractor exception and a print.
+	for extract in (extract_markdown_images, extract_markdown_links):
+		resultlst = []
+		for node in nodes:
+			try:
+				extract(node.text)
+			except Exception:
+				print("\nAn input was either improperly formatted or no links where found - returning input with other potential results.\n")
+				resultlst.append(node)
+				continue
+		nodes = resultlst
+	return nodes
+
+
+def make_document(size):
+	return PARAGRAPH * (size // len(PARAGRAPH) + 1)
+
+
+def best_of(func, arg, repeat=3):
+	best = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func(arg)
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+
+def bench_text_to_textnodes():
+	print("text_to_textnodes: staged pipeline vs single-pass scanner")
+	for megabytes in (1, 2, 4):
+		doc = make_document(megabytes * 1024 * 1024)
+		staged = best_of(staged_text_to_textnodes, doc)
+		scanner = best_of(text_to_textnodes, doc)
+		print(f"  {megabytes} MB: staged {staged:.3f}s, single-pass {scanner:.3f}s, "
+			  f"speedup {staged / scanner:.1f}x")
+
+
+def bench_split_images_and_links():
+	print("split_nodes_image + split_nodes_link: str.split on rebuilt matches vs match spans")
+	for count in (1000, 5000, 20000):
+		text = "".join(f"see ![img {i}](https://i.imgur.com/{i}.png) and [link {i}](https://boot.dev/{i}) "
+					   for i in range(count))
+		nodes = [TextNode(text, TextType.TEXT)]
+		old = best_of(string_split_images_and_links, nodes)
+		new = best_of(span_split_images_and_links, nodes)
+		print(f"  {count} images + {count} links: str.split {old:.3f}s, spans {new:.3f}s, "
+			  f"speedup {old / new:.1f}x")
+
+
+def bench_plain_text_nodes(count=1_000_000):
+	print(f"Image and link splitting over {count} plain-text nodes")
+	nodes = [TextNode(f"Plain text node number {i} with nothing to extract.", TextType.TEXT)
+			 for i in range(count)]
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		old = best_of(raising_split_images_and_links, nodes, repeat=1)
+	new = best_of(span_split_images_and_links, nodes)
+	print(f"  exception + print {old:.3f}s, fast path {new:.3f}s, speedup {old / new:.1f}x")
+
+
+def peak_memory(func, arg):
+	tracemalloc.start()
+	result = func(arg)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	del result
+	return peak
+
+
+def bench_node_memory():
+	print("Peak memory holding a 4 MB document as TextNodes plus LeafNodes")
+	doc = make_document(4 * 1024 * 1024)
+	# Keep the strings alive outside the traced region so only node overhead is measured.
+	spans = [(n.text, n.text_type, n.url) for n in text_to_textnodes(doc)]
+	leaves = [(leaf.tag, leaf.value, leaf.props)
+			  for leaf in map(text_node_to_html_node, (TextNode(*span) for span in spans))]
+
+	def build(classes):
+		text_node_class, leaf_class = classes
+		return ([text_node_class(*span) for span in spans],
+				[leaf_class(*leaf) for leaf in leaves])
+
+	plain = peak_memory(build, (DictTextNode, DictLeafNode))
+	slotted = peak_memory(build, (TextNode, LeafNode))
+	print(f"  {len(spans)} nodes each: __dict__ {plain / 2**20:.1f} MiB, "
+		  f"slotted {slotted / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+	bench_text_to_textnodes()
+	bench_node_memory()
+	bench_split_images_and_links()
+	bench_plain_text_nodes()
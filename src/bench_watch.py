@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import time
+
+from bench_build import make_site
+from staticsite.build import build_site
+from staticsite.watch import LiveSite, open_watcher
+
+
+TARGET = 0.050
+
+
+def bench_edit_latency(pages=5_000, edits=20):
+    print(f"Watch mode: edit-to-output latency for one page of a {pages}-page site "
+          f"(target {TARGET * 1000:.0f} ms)")
+    root = tempfile.mkdtemp()
+    try:
+        content, output, template = make_site(root, pages)
+        build_site(content, output, template)
+        source = os.path.join(content, "section7", "page7.md")
+        with open(source) as fp:
+            original = fp.read()
+        for poll in (False, True):
+            site = LiveSite(content, output, template)
+            start = time.perf_counter()
+            watcher = open_watcher([content], site.template_files, poll=poll)
+            setup = time.perf_counter() - start
+            latencies = []
+            try:
+                for n in range(edits):
+                    edited = time.perf_counter()
+                    with open(source, "w") as fp:
+                        fp.write(original + f"\nEdit number {n}.\n")
+                    changed = set()
+                    while source not in changed:
+                        changed |= watcher.wait(timeout=1)
+                    site.handle(changed)
+                    latencies.append(time.perf_counter() - edited)
+            finally:
+                watcher.close()
+            latencies.sort()
+            median = latencies[len(latencies) // 2]
+            print(f"  {type(watcher).__name__}: setup {setup:.3f}s, median {median * 1000:.1f} ms, "
+                  f"worst {latencies[-1] * 1000:.1f} ms, "
+                  f"{'within' if median <= TARGET else 'over'} target")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    bench_edit_latency()
@@ -0,0 +1,19 @@
+# File helpers shared by the tests that build sites on disk.
+import os
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(text)
+
+
+def read_file(path):
+    with open(path, encoding="utf-8") as fp:
+        return fp.read()
+
+
+def bump_mtime(path):
+    # Make sure a rewrite is visible to the stat check even on coarse-mtime filesystems.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
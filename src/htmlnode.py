@@ -1,57 +0,0 @@
-class HTMLNode:
-    def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
-        self.value = value
-        self.children = children
-        self.props = props
-
-
-    def to_html(self):
-        raise NotImplementedError
-    
-
-    def props_to_html(self):
-        if self.props is None:
-            return ""
-        props_str = ""
-        
-        for k, v in self.props.items():
-            props_str += f' {k}="{v}"'
-
-        return props_str
-    
-
-    def __repr__(self):
-        return(f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})")
-
-
-class LeafNode(HTMLNode):
-    def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, [], props)
-
-
-    def to_html(self):
-        if not self.value:
-            raise ValueError("All leaf nodes must have a value.")
-        if not self.tag:
-            return f"{self.value}"
-        return f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>'
-
-
-class ParentNode(HTMLNode):
-    def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
-
-
-    def to_html(self):
-        if not self.tag:
-            raise ValueError("No tag provided.")
-        if not self.children:
-            raise ValueError("No children provided.")
-        html = f"<{self.tag}{self.props_to_html()}>"
-        
-        for child in self.children:
-            html += child.to_html()
-        
-        html += f"</{self.tag}>"
-        return html
@@ -1,10 +0,0 @@
-from textnode import TextNode, TextType
-
-def main():
-    Dummy = TextNode("What a godawful endeavour.", 
-                     TextType.LINK, 
-                     "https://www.f******garbage.crap")
-    print(Dummy)
-    
-
-main()
@@ -0,0 +1,46 @@
+# Static site generator: Markdown to HTML.
+# The public names below are imported from their modules on first use, so
+# importing the package, or running the CLI for --help or --convert, doesn't
+# load the parser, the renderer and the builder up front.
+import importlib
+
+
+EXPORTS = {
+    "TextNode": "textnode",
+    "TextType": "textnode",
+    "Diagnostics": "textnode",
+    "text_to_textnodes": "textnode",
+    "text_node_to_html_node": "textnode",
+    "text_nodes_to_html": "textnode",
+    "HTMLNode": "htmlnode",
+    "LeafNode": "htmlnode",
+    "ParentNode": "htmlnode",
+    "SafeString": "escape",
+    "markdown_to_html_node": "blocknode",
+    "markdown_to_html_file": "blocknode",
+    "MappedSource": "mmapsource",
+    "InlineCache": "inlinecache",
+    "ASTCache": "astcache",
+    "SearchIndex": "searchindex",
+    "ReferenceIndex": "references",
+    "Template": "template",
+    "SpanBuffer": "spanbuffer",
+    "parse_inline": "spanbuffer",
+    "Metrics": "metrics",
+    "build_site": "build",
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -0,0 +1,271 @@
+from array import array
+import os
+import struct
+import sys
+
+from .blocknode import PARSER_VERSION
+from .escape import SafeString
+from .htmlnode import LeafNode, ParentNode
+from .spanbuffer import TYPE_CODES, TYPES
+from .textnode import TextNode
+
+
+# Binary layout, all integers little-endian:
+#   header        magic, format version, blocknode.PARSER_VERSION, payload kind, record
+#                 typecode, string count, string bytes, record count (HEADER)
+#   string ends   one uint32 per string: its end offset in the blob
+#   string blob   every distinct string once, UTF-8, back to back
+#   records       integers describing the nodes, layout depending on the payload kind,
+#                 in the narrowest of int8, int16 and int32 that holds them all
+# Strings are interned, so a tag, class name or url repeated all over a page is
+# stored once and every node refers to it by index.
+MAGIC = b"SSAC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHHcIII")
+RECORD_TYPES = ((b"b", 0x7F), (b"h", 0x7FFF), (b"i", 0x7FFFFFFF))
+
+# Payload kinds.
+TEXTNODES = 1
+TREE = 2
+
+# Index for a missing string (a None url, tag or value).
+NONE = -1
+
+# Tree records, in document order. A leaf is
+#   LEAF or SAFE_LEAF, tag, value, prop count, key, value, key, value, ...
+# and a parent is
+#   PARENT, tag, child count, prop count, key, value, ...
+# followed by its children. SAFE_LEAF marks an escape.SafeString value, which must
+# come back as one so it isn't escaped again.
+LEAF = 0
+SAFE_LEAF = 1
+PARENT = 2
+
+LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+
+    def add(self, string):
+        if string is None:
+            return NONE
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+
+def pack(kind, strings, records):
+    blob = bytearray()
+    ends = array("I")
+    for string in strings.strings:
+        blob += string.encode("utf-8")
+        ends.append(len(blob))
+    # Records are built as int32 and narrowed once the biggest value is known; the
+    # smallest is never below NONE.
+    biggest = max(records, default=0)
+    typecode = next(code for code, limit in RECORD_TYPES if biggest <= limit)
+    records = array(typecode.decode(), records)
+    if not LITTLE_ENDIAN:
+        ends.byteswap()
+        records.byteswap()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, PARSER_VERSION, kind, typecode, len(ends), len(blob),
+                         len(records))
+    return b"".join([header, ends.tobytes(), bytes(blob), records.tobytes()])
+
+
+def check_header(data, kind):
+    # Returns the typecode and counts from data's header, after checking it's a current
+    # payload of the given kind, written in this format by this parser version.
+    # Anything else raises ValueError, so callers can treat an old or damaged cache as
+    # missing.
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated AST cache data.")
+    magic, version, parser, data_kind, typecode, *counts = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not AST cache data.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported AST cache version: {version}.")
+    if parser != PARSER_VERSION:
+        raise ValueError(f"AST cache data from parser version {parser}.")
+    if data_kind != kind:
+        raise ValueError("AST cache data holds a different kind of payload.")
+    if typecode not in (b"b", b"h", b"i"):
+        raise ValueError("Damaged AST cache data.")
+    return typecode, *counts
+
+
+def unpack(data, kind):
+    # Returns the string table and records of data, checked as check_header does.
+    typecode, string_count, blob_size, record_count = check_header(data, kind)
+    records = array(typecode.decode())
+    pos = HEADER.size
+    if len(data) != pos + 4 * string_count + blob_size + records.itemsize * record_count:
+        raise ValueError("Truncated AST cache data.")
+    ends = array("I")
+    ends.frombytes(data[pos:pos + 4 * string_count])
+    pos += 4 * string_count
+    # Decoded in one go and sliced up, rather than decoding every string on its own.
+    blob = data[pos:pos + blob_size]
+    pos += blob_size
+    records.frombytes(data[pos:])
+    if not LITTLE_ENDIAN:
+        ends.byteswap()
+        records.byteswap()
+    if blob.isascii():
+        text = blob.decode("ascii")
+        strings = [text[start:end] for start, end in zip([0, *ends], ends)]
+    else:
+        strings = [blob[start:end].decode("utf-8") for start, end in zip([0, *ends], ends)]
+    return strings, records
+
+
+def dump_textnodes(text_nodes):
+    # Three records per node: type code, text, url.
+    strings = StringTable()
+    add = strings.add
+    records = array("i")
+    for node in text_nodes:
+        code = TYPE_CODES.get(node.text_type)
+        if code is None:
+            raise Exception("No valid text type provided.")
+        records.extend((code, add(node.text), add(node.url)))
+    return pack(TEXTNODES, strings, records)
+
+
+def load_textnodes(data):
+    strings, records = unpack(data, TEXTNODES)
+    strings.append(None)
+    return [TextNode(strings[text], TYPES[code], strings[url])
+            for code, text, url in zip(records[0::3], records[1::3], records[2::3])]
+
+
+def dump_tree(node):
+    # Walks the tree with an explicit stack, like the renderer, so depth doesn't
+    # matter. Only LeafNode and ParentNode trees can be stored; frozen subtrees go in
+    # as plain nodes and come back unfrozen.
+    strings = StringTable()
+    add = strings.add
+    records = array("i")
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParentNode):
+            records.extend((PARENT, add(node.tag), len(node.children)))
+            stack.extend(reversed(node.children))
+        elif isinstance(node, LeafNode):
+            value = node.value
+            records.extend((SAFE_LEAF if isinstance(value, SafeString) else LEAF, add(node.tag), add(value)))
+        else:
+            raise ValueError(f"Can't store a {type(node).__name__} in the AST cache.")
+        props = node.props
+        if props is None:
+            records.append(NONE)
+        else:
+            records.append(len(props))
+            for key, value in props.items():
+                records.append(add(key))
+                records.append(add(value))
+    return pack(TREE, strings, records)
+
+
+def load_tree(data):
+    strings, records = unpack(data, TREE)
+    strings.append(None)
+    # One empty list standing in for the children of the parent being filled, with
+    # how many it still needs.
+    root = []
+    stack = [(root, 1)]
+    children, remaining = root, 1
+    pos = 0
+    size = len(records)
+    try:
+        while pos < size:
+            kind = records[pos]
+            tag = strings[records[pos + 1]]
+            third = records[pos + 2]
+            prop_count = records[pos + 3]
+            pos += 4
+            props = None
+            if prop_count != NONE:
+                props = {strings[records[i]]: strings[records[i + 1]] for i in range(pos, pos + 2 * prop_count, 2)}
+                pos += 2 * prop_count
+            if kind == PARENT:
+                node = ParentNode(tag, [], props)
+            elif kind == LEAF:
+                node = LeafNode(tag, strings[third], props)
+            else:
+                node = LeafNode(tag, SafeString(strings[third]), props)
+            children.append(node)
+            remaining -= 1
+            if kind == PARENT and third:
+                stack.append((children, remaining))
+                children, remaining = node.children, third
+                continue
+            while not remaining and len(stack) > 1:
+                children, remaining = stack.pop()
+    except IndexError:
+        raise ValueError("Damaged AST cache data.") from None
+    if len(root) != 1 or len(stack) != 1:
+        raise ValueError("Damaged AST cache data.")
+    return root[0]
+
+
+class ASTCache:
+    # Parsed page trees on disk, one file per distinct Markdown source, named by the
+    # source's hash, so a page whose text hasn't changed loads its tree instead of
+    # being parsed again, in this process or any later one. Entries in an old format,
+    # or made by another parser version, are treated as missing and overwritten.
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+
+    def path(self, markdown):
+        # Imported here: loading OpenSSL is a good part of a small build's startup.
+        import hashlib
+
+        digest = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".ast")
+
+
+    def get(self, markdown):
+        # Returns the stored tree for markdown, or None.
+        try:
+            with open(self.path(markdown), "rb") as fp:
+                node = load_tree(fp.read())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return node
+
+
+    def has(self, markdown):
+        # Whether a current entry for markdown is stored, from its header alone.
+        try:
+            with open(self.path(markdown), "rb") as fp:
+                check_header(fp.read(HEADER.size), TREE)
+        except (OSError, ValueError):
+            return False
+        return True
+
+
+    def put(self, markdown, node):
+        path = self.path(markdown)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Temp file plus rename, so a reader in another process never loads half an entry.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(dump_tree(node))
+        os.replace(tmp_path, path)
+
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
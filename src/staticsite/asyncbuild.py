@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+from .build import init_worker, page_error, page_title, read_source, render_in_worker, render_pages, write_output
+from .inlinecache import InlineCache
+from .metrics import collecting
+
+
+# Chunks allowed to wait between two stages. A full queue makes the stage feeding it
+# wait, so a slow converter can't let reads pile up the whole site in memory.
+QUEUE_SIZE = 8
+
+# Pages per chunk. Every hop onto a thread or process costs about as much as
+# converting a small page, so pages move between stages in chunks.
+CHUNK_SIZE = 32
+
+# Threads doing blocking reads and writes. File I/O releases the GIL, so these keep
+# the disk busy while the converter holds it.
+IO_THREADS = 2
+
+# Queue end marker, one per consumer.
+DONE = None
+
+
+def read_chunk(chunk, errors):
+    pages = []
+    for source, output_path in chunk:
+        try:
+            pages.append((output_path, read_source(source), page_title(source)))
+        except Exception as error:
+            errors.append([output_path, page_error(error)])
+    return pages
+
+
+def write_chunk(pages, errors):
+    # Returns how many of the pages' files were written rather than left unchanged;
+    # [output path, message] for those that couldn't be goes into errors.
+    written = 0
+    for output_path, html in pages:
+        try:
+            written += bool(write_output(output_path, html))
+        except Exception as error:
+            errors.append([output_path, page_error(error)])
+    return written
+
+
+async def run_pipeline(stale, convert, converters=1, io_threads=IO_THREADS, queue_size=QUEUE_SIZE,
+                       chunk_size=CHUNK_SIZE, errors=None):
+    # Streams (source, output path) pairs through three stages joined by bounded queues:
+    #   readers    load chunks of sources on the I/O threads,
+    #   converters await convert(pages) for [(output path, html)], where pages is a
+    #              list of (output path, markdown, default title),
+    #   writers    write the pages out on the I/O threads.
+    # Pages that convert fails on are left out of what it returns; one that can't be
+    # read or written is added to errors as [output path, message]. If a stage raises anyway,
+    # the task group cancels the others and the error propagates.
+    # Returns the number of output files written.
+    loop = asyncio.get_running_loop()
+    chunks = iter([stale[i:i + chunk_size] for i in range(0, len(stale), chunk_size)])
+    read_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    written = 0
+    if errors is None:
+        errors = []
+
+    with ThreadPoolExecutor(io_threads) as io:
+        async def reader():
+            # Readers share one iterator, so each chunk is read exactly once.
+            for chunk in chunks:
+                await read_queue.put(await loop.run_in_executor(io, read_chunk, chunk, errors))
+
+        async def converter():
+            while (pages := await read_queue.get()) is not DONE:
+                await write_queue.put(await convert(pages))
+
+        async def writer():
+            nonlocal written
+            while (pages := await write_queue.get()) is not DONE:
+                written += await loop.run_in_executor(io, write_chunk, pages, errors)
+
+        async def run_stage(worker, count, downstream, consumers):
+            await asyncio.gather(*(worker() for _ in range(count)))
+            for _ in range(consumers):
+                await downstream.put(DONE)
+
+        async with asyncio.TaskGroup() as group:
+            group.create_task(run_stage(reader, io_threads, read_queue, converters))
+            group.create_task(run_stage(converter, converters, write_queue, io_threads))
+            group.create_task(run_stage(writer, io_threads, None, 0))
+    return written
+
+
+def render_stale_async(stale, template, jobs, inline_cache_size=0, metrics=None, records=None, indexes=(),
+                       ast_cache=None, errors=None, io_threads=IO_THREADS, queue_size=QUEUE_SIZE,
+                       chunk_size=CHUNK_SIZE):
+    # Async counterpart of build.render_stale. With jobs <= 1 pages are converted on a
+    # single thread next to the I/O threads; otherwise in a pool of worker processes,
+    # with two chunks in flight per worker so none of them waits on the parent.
+    # Returns the same per-worker list as render_stale, with one entry for the whole
+    # pipeline, or none when conversion ran in worker processes, and the number of
+    # output files written. records, indexes, ast_cache and errors are as for
+    # render_stale.
+    start = time.perf_counter()
+    cache = None
+    # Pages are reported by output path along the pipeline and by source to the caller.
+    page_errors = []
+
+    if jobs <= 1:
+        cache = InlineCache(inline_cache_size) if inline_cache_size else None
+        pool = ThreadPoolExecutor(1)
+        converters = 1
+
+        def render_chunk(pages):
+            return render_pages(pages, template, cache, records, indexes, ast_cache, page_errors)
+
+        def convert(pages):
+            return asyncio.get_running_loop().run_in_executor(pool, render_chunk, pages)
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                   initargs=(template, inline_cache_size, metrics is not None, indexes,
+                                             ast_cache))
+        converters = jobs * 2
+
+        async def convert(pages):
+            loop = asyncio.get_running_loop()
+            rendered, chunk_metrics, chunk_records, chunk_errors = await loop.run_in_executor(
+                pool, render_in_worker, pages)
+            page_errors.extend(chunk_errors)
+            if chunk_metrics is not None:
+                metrics.merge(chunk_metrics)
+            if chunk_records is not None:
+                records.extend(chunk_records)
+            return rendered
+
+    with pool, collecting(metrics) if metrics is not None else nullcontext():
+        written = asyncio.run(run_pipeline(stale, convert, converters, io_threads, queue_size, chunk_size,
+                                           page_errors))
+    if errors is not None:
+        sources = {output_path: source for source, output_path in stale}
+        errors.extend([sources[output_path], message] for output_path, message in page_errors)
+
+    if jobs > 1 or not stale:
+        return [], written
+    worker = {"pid": os.getpid(), "batches": 1, "pages": len(stale),
+              "seconds": time.perf_counter() - start}
+    if cache is not None:
+        worker["inline_cache"] = cache.stats()
+    if ast_cache is not None:
+        worker["ast_cache"] = ast_cache.stats()
+    return [worker], written
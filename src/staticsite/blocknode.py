@@ -0,0 +1,152 @@
+from enum import Enum
+import re
+
+from .htmlnode import LeafNode, ParentNode
+from .textnode import text_nodes_to_html_nodes, text_to_textnodes
+
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+
+# Version of what a page converts to. Bump it with any change to parsing, or to the
+# inline HTML an InlineCache bakes into trees, so stored trees (astcache) made by the
+# old code are rejected instead of rendered.
+PARSER_VERSION = 1
+
+HEADING_PATTERN = re.compile(r"(#{1,6}) ")
+ORDERED_ITEM_PATTERN = re.compile(r"\d+\. ")
+FENCE = "```"
+
+
+def line_block_type(line):
+    # Block type a line would start, or None for plain paragraph text.
+    if line.startswith("#") and HEADING_PATTERN.match(line):
+        return BlockType.HEADING
+    if line.startswith(FENCE):
+        return BlockType.CODE
+    if line.startswith(">"):
+        return BlockType.QUOTE
+    if line.startswith("- ") or line.startswith("* "):
+        return BlockType.UNORDERED_LIST
+    if line[:1].isdigit() and ORDERED_ITEM_PATTERN.match(line):
+        return BlockType.ORDERED_LIST
+    return None
+
+
+def continues_block(block_type, line_type):
+    if block_type is BlockType.PARAGRAPH:
+        return line_type is None
+    if block_type in (BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        return line_type is block_type
+    return False
+
+
+def iter_blocks(lines):
+    # Groups lines into blocks, yielding (BlockType, lines) as soon as each block ends.
+    # Only the lines of the block being built are held, so a file handle can be passed
+    # in and read lazily however big it is.
+    # Blank lines end a block. Headings are always one line. Quote and list blocks run
+    # while their lines keep the same marker, and a paragraph runs until a blank line
+    # or a line that starts some other block. Everything between two fence lines is
+    # one code block, blank lines included.
+    block_type = None
+    block = []
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if block_type is BlockType.CODE:
+            if line.startswith(FENCE):
+                yield block_type, block
+                block_type, block = None, []
+            else:
+                block.append(line)
+            continue
+
+        if not line.strip():
+            if block:
+                yield block_type, block
+                block_type, block = None, []
+            continue
+
+        line_type = line_block_type(line)
+        if block and not continues_block(block_type, line_type):
+            yield block_type, block
+            block_type, block = None, []
+
+        if line_type is BlockType.CODE:
+            block_type = BlockType.CODE
+            continue
+        if not block:
+            block_type = line_type or BlockType.PARAGRAPH
+        block.append(line)
+
+    if block or block_type is BlockType.CODE:
+        yield block_type, block
+
+
+def inline_children(text, cache=None, collect=None):
+    # With an InlineCache the fragment comes back as one leaf of ready-made HTML.
+    # collect, if given, is called with the fragment's TextNodes, for whatever gathers
+    # page data on the way (search terms, link targets). The cache only holds HTML,
+    # so with both a cached fragment is still parsed for collect.
+    if cache is not None:
+        if collect is not None:
+            collect(text_to_textnodes(text))
+        return [LeafNode(None, cache.inline_to_html(text))]
+    text_nodes = text_to_textnodes(text)
+    if collect is not None:
+        collect(text_nodes)
+    # A fragment of nothing but delimiter pairs ("****") has no TextNodes; an empty
+    # leaf keeps its element renderable, and the same as the cache's "" for it.
+    return text_nodes_to_html_nodes(text_nodes) or [LeafNode(None, "")]
+
+
+def block_to_html_node(block_type, lines, cache=None, collect=None):
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return ParentNode("p", inline_children("\n".join(lines), cache, collect))
+        case BlockType.HEADING:
+            level = len(HEADING_PATTERN.match(lines[0])[1])
+            return ParentNode(f"h{level}", inline_children(lines[0][level + 1:], cache, collect))
+        case BlockType.CODE:
+            text = "\n".join(lines) + "\n" if lines else ""
+            return ParentNode("pre", [LeafNode("code", text)])
+        case BlockType.QUOTE:
+            text = "\n".join(line[1:].lstrip() for line in lines)
+            return ParentNode("blockquote", inline_children(text, cache, collect))
+        case BlockType.UNORDERED_LIST:
+            items = [ParentNode("li", inline_children(line[2:], cache, collect)) for line in lines]
+            return ParentNode("ul", items)
+        case BlockType.ORDERED_LIST:
+            items = [ParentNode("li", inline_children(line.split(". ", 1)[1], cache, collect)) for line in lines]
+            return ParentNode("ol", items)
+    raise Exception("No valid block type provided.")
+
+
+def iter_html_blocks(lines, cache=None, collect=None):
+    # Streams one ParentNode per block, in document order. A MappedSource groups its
+    # own blocks by offsets; anything else is taken as an iterable of lines.
+    blocks = lines.iter_blocks() if hasattr(lines, "iter_blocks") else iter_blocks(lines)
+    for block_type, block in blocks:
+        yield block_to_html_node(block_type, block, cache, collect)
+
+
+def markdown_to_html_node(markdown, cache=None, collect=None):
+    blocks = list(iter_html_blocks(markdown.splitlines(), cache, collect))
+    return ParentNode("div", blocks or [LeafNode(None, "")])
+
+
+def markdown_to_html_file(fp_in, fp_out, cache=None):
+    # Same output as markdown_to_html_node(fp_in.read()).render_to(fp_out), but reads
+    # and writes one block at a time, so memory stays bounded by the largest block.
+    # fp_in can also be a MappedSource.
+    fp_out.write("<div>")
+    for node in iter_html_blocks(fp_in, cache):
+        node.render_to(fp_out)
+    fp_out.write("</div>")
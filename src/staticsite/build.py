@@ -0,0 +1,608 @@
+from collections import Counter
+import json
+import os
+import re
+import time
+from contextlib import nullcontext
+
+from .blocknode import markdown_to_html_node
+from .escape import SafeString
+from .inlinecache import InlineCache
+from .metrics import Metrics, collecting, stage
+from .references import ReferenceIndex, add_references, duplicate_assets
+from .searchindex import SEARCH_DIR, SearchIndex, add_terms
+from .template import Template
+
+
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 2
+
+DEFAULT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{ Title }}</title>
+</head>
+<body>
+{{ Content }}
+</body>
+</html>
+"""
+
+# Source bytes per batch handed to a worker process.
+BATCH_BYTES = 64 * 1024
+
+PIPELINES = ("batch", "async")
+
+INCLUDE_PATTERN = re.compile(r"\{\{ include (\S+) \}\}")
+
+# Site-wide indexes pages can be collected for, each kept under its name in the
+# page's manifest entry: "search" as the page title, its {term: count} going to a
+# sidecar file (see terms_path) to keep the manifest small, and "refs" as
+# [[text type value, url], ...].
+INDEXES = ("search", "refs")
+
+
+def extract_title(markdown):
+    for line in markdown.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return None
+
+
+class BuildManifest:
+    # What the last build saw, kept on disk between builds.
+    # files: path -> {"mtime", "size", "hash"}. A file whose mtime and size still
+    #        match is trusted without being read again, which keeps no-op builds cheap.
+    # pages: source path -> {"deps": {path: hash}}, every file the page was built from,
+    #        plus an entry per INDEXES name the page was collected for.
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.pages = {}
+        self.seen = {}
+        self.load()
+
+
+    def load(self):
+        try:
+            with open(self.path) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        self.files = data.get("files", {})
+        self.pages = data.get("pages", {})
+
+
+    def save(self):
+        # Only files looked at during this build are kept, so deleted sources drop out.
+        data = {"version": MANIFEST_VERSION, "files": self.seen, "pages": self.pages}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fp:
+            fp.write(json.dumps(data))
+        os.replace(tmp_path, self.path)
+
+
+    def file_hash(self, path):
+        entry = self.seen.get(path)
+        if entry is not None:
+            return entry["hash"]
+        st = os.stat(path)
+        entry = self.files.get(path)
+        if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            # Imported on first miss: loading OpenSSL is a good part of a no-op build.
+            import hashlib
+
+            with open(path, "rb") as fp:
+                digest = hashlib.sha256(fp.read()).hexdigest()
+            entry = {"mtime": st.st_mtime_ns, "size": st.st_size, "hash": digest}
+        self.seen[path] = entry
+        return entry["hash"]
+
+
+    def is_current(self, source, output_path, deps):
+        # deps: the other files (template, includes) this page would be built from now.
+        page = self.pages.get(source)
+        if page is None or not os.path.exists(output_path):
+            return False
+        if page["deps"].keys() != {source, *deps}:
+            return False
+        for dep, digest in page["deps"].items():
+            try:
+                if self.file_hash(dep) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+
+def load_template(template_path, manifest=None):
+    # Returns the template, includes expanded and compiled, plus {path: hash} of
+    # every file it was built from. Without a manifest the hashes are left as None.
+    if template_path is None:
+        return Template(DEFAULT_TEMPLATE), {}
+    deps = {template_path: manifest.file_hash(template_path) if manifest else None}
+    with open(template_path, encoding="utf-8") as fp:
+        template = fp.read()
+    base_dir = os.path.dirname(template_path)
+
+    def include(match):
+        include_path = os.path.join(base_dir, match[1])
+        deps[include_path] = manifest.file_hash(include_path) if manifest else None
+        with open(include_path, encoding="utf-8") as fp:
+            return fp.read()
+
+    return Template(INCLUDE_PATTERN.sub(include, template)), deps
+
+
+def find_sources(content_dir, output_dir):
+    # Returns (source, output path) pairs for every .md file, in a stable order.
+    sources = []
+
+    for dirpath, dirnames, filenames in os.walk(content_dir):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, content_dir)
+        out_dir = output_dir if rel_dir == os.curdir else os.path.join(output_dir, rel_dir)
+        for filename in sorted(filenames):
+            if filename.endswith(".md"):
+                sources.append((os.path.join(dirpath, filename),
+                                os.path.join(out_dir, filename[:-3] + ".html")))
+    return sources
+
+
+def output_path_for(source, content_dir, output_dir):
+    rel_path = os.path.relpath(source, content_dir)
+    return os.path.join(output_dir, os.path.splitext(rel_path)[0] + ".html")
+
+
+def render_content(markdown, default_title, cache=None, collect=None, ast_cache=None):
+    # Returns the page title and its HTML body, before the template goes around it.
+    # collect is passed on to the inline conversion, as in blocknode.inline_children.
+    # With an astcache.ASTCache, a page whose Markdown was parsed before is loaded
+    # from there instead, unless collect needs its TextNodes; parsed pages are stored
+    # unless they already are.
+    title = extract_title(markdown) or default_title
+    node = ast_cache.get(markdown) if ast_cache is not None and collect is None else None
+    if node is None:
+        node = markdown_to_html_node(markdown, cache, collect)
+        if ast_cache is not None and (collect is None or not ast_cache.has(markdown)):
+            ast_cache.put(markdown, node)
+    return title, node.to_html()
+
+
+def apply_template(template, title, content):
+    # template: a compiled template.Template, as load_template returns. The title is
+    # plain text, escaped like the <h1> it came from; content is already HTML.
+    return template.render({"Title": title, "Content": SafeString(content)})
+
+
+def render_page(markdown, template, default_title, cache=None, ast_cache=None):
+    return apply_template(template, *render_content(markdown, default_title, cache, None, ast_cache))
+
+
+def render_indexed(output_path, markdown, template, default_title, cache=None, records=None, indexes=(),
+                   ast_cache=None):
+    # render_page, also appending a record of the page to records for each of the
+    # INDEXES named in indexes: a dict of "output" (the output path) plus what the
+    # manifest keeps for each index.
+    if not indexes:
+        return render_page(markdown, template, default_title, cache, ast_cache)
+    terms = Counter() if "search" in indexes else None
+    refs = [] if "refs" in indexes else None
+
+    def collect(text_nodes):
+        if terms is not None:
+            add_terms(terms, text_nodes)
+        if refs is not None:
+            add_references(refs, text_nodes)
+
+    title, content = render_content(markdown, default_title, cache, collect, ast_cache)
+    record = {"output": output_path}
+    if terms is not None:
+        record["search"] = [title, dict(terms)]
+    if refs is not None:
+        record["refs"] = refs
+    records.append(record)
+    return apply_template(template, title, content)
+
+
+def page_title(source):
+    # Title for a page without a "# " heading.
+    return os.path.splitext(os.path.basename(source))[0]
+
+
+def read_source(source):
+    with stage("read") as timing:
+        with open(source, encoding="utf-8") as fp:
+            markdown = fp.read()
+        timing.nbytes = len(markdown)
+    return markdown
+
+
+def output_matches(output_path, data):
+    # Whether output_path already holds exactly data. A size mismatch settles it from
+    # the stat alone; otherwise the old file is read and compared byte for byte, which
+    # is what comparing hashes of the two would come down to anyway.
+    try:
+        if os.stat(output_path).st_size != len(data):
+            return False
+        with open(output_path, "rb") as fp:
+            return fp.read() == data
+    except OSError:
+        return False
+
+
+def write_output(output_path, html):
+    return write_data(output_path, html.encode("utf-8"))
+
+
+def write_data(output_path, data):
+    # Writes data to output_path unless the file there already holds the same bytes,
+    # so an unchanged page keeps its mtime and inode and rsync, CDN uploads and file
+    # watchers see nothing. Writes go to a temp file renamed over the old one, so a
+    # reader never sees half a page. Returns whether the file was written.
+    with stage("compare_output", len(data)):
+        if output_matches(output_path, data):
+            return False
+    with stage("write", len(data)):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, output_path)
+    return True
+
+
+def write_page(source, output_path, template, cache=None, records=None, indexes=(), ast_cache=None):
+    # Returns whether the output file was written, as write_output. records, indexes
+    # and ast_cache are as for render_indexed.
+    markdown = read_source(source)
+    return write_output(output_path, render_indexed(output_path, markdown, template, page_title(source),
+                                                    cache, records, indexes, ast_cache))
+
+
+def page_error(error):
+    # The message a page that failed to render is reported with.
+    return str(error) or type(error).__name__
+
+
+def render_batch(batch, template=None, cache=None, metrics=None, indexes=(), ast_cache=None):
+    # Renders a batch of (source, output path) pairs and writes the results straight
+    # to disk, so only paths and timings cross the process boundary.
+    # Without a template it runs as a pool worker and uses what init_worker set up,
+    # sending its stage metrics back with the result instead of collecting in place.
+    # Each page is collected for the INDEXES named in indexes (or init_worker's) as
+    # it's rendered. A page that fails to render is left as it was on disk and
+    # reported, and the rest of the batch carries on.
+    # Returns a dict of pid, seconds, pages, files written (the rest were unchanged or
+    # failed), inline_cache and ast_cache stats, metrics, the render_indexed records
+    # and [source, message] for every page that failed.
+    worker_metrics = None
+    if template is None:
+        template = worker_template
+        cache = worker_cache
+        indexes = worker_indexes
+        ast_cache = worker_ast_cache
+        if worker_collect:
+            metrics = worker_metrics = Metrics()
+    start = time.perf_counter()
+    written = 0
+    records = [] if indexes else None
+    errors = []
+    with collecting(metrics) if metrics is not None else nullcontext():
+        for source, output_path in batch:
+            try:
+                written += write_page(source, output_path, template, cache, records, indexes, ast_cache)
+            except Exception as error:
+                errors.append([source, page_error(error)])
+    return {
+        "pid": os.getpid(),
+        "seconds": time.perf_counter() - start,
+        "pages": len(batch),
+        "written": written,
+        "inline_cache": cache.stats() if cache is not None else None,
+        "ast_cache": ast_cache.stats() if ast_cache is not None else None,
+        "metrics": worker_metrics.to_dict() if worker_metrics is not None else None,
+        "search": records,
+        "errors": errors,
+    }
+
+
+def render_pages(pages, template, cache=None, records=None, indexes=(), ast_cache=None, errors=None):
+    # Renders already read pages, a list of (output path, markdown, default title), for
+    # callers that do their own file I/O. Returns [(output path, html)] for the pages
+    # that rendered and appends [output path, message] to errors for the rest.
+    rendered = []
+    for output_path, markdown, default_title in pages:
+        try:
+            rendered.append((output_path, render_indexed(output_path, markdown, template, default_title,
+                                                         cache, records, indexes, ast_cache)))
+        except Exception as error:
+            errors.append([output_path, page_error(error)])
+    return rendered
+
+
+def render_in_worker(pages):
+    # render_pages in a pool worker set up by init_worker. Returns the rendered pages,
+    # the stage metrics when collecting and the render_indexed records when indexing,
+    # for the parent to merge, and the errors.
+    metrics = Metrics() if worker_collect else None
+    records = [] if worker_indexes else None
+    errors = []
+    with collecting(metrics) if metrics is not None else nullcontext():
+        rendered = render_pages(pages, worker_template, worker_cache, records, worker_indexes, worker_ast_cache,
+                                errors)
+    return rendered, metrics.to_dict() if metrics is not None else None, records, errors
+
+
+# Set in each worker process by init_worker.
+worker_template = None
+worker_cache = None
+worker_collect = False
+worker_indexes = ()
+worker_ast_cache = None
+
+
+def init_worker(template, inline_cache_size, collect_metrics=False, indexes=(), ast_cache=None):
+    # Pool initializer: hands each worker the template once instead of per batch, and
+    # gives it its own inline cache since a cache can't be shared across processes.
+    global worker_template, worker_cache, worker_collect, worker_indexes, worker_ast_cache
+    worker_template = template
+    worker_cache = InlineCache(inline_cache_size) if inline_cache_size else None
+    worker_collect = collect_metrics
+    worker_indexes = indexes
+    worker_ast_cache = ast_cache
+
+
+def make_batches(stale, sizes, batch_bytes=BATCH_BYTES):
+    # Largest files go first so the long pages start early and the small ones fill in
+    # the gaps at the end. Small files are grouped until a batch holds batch_bytes of
+    # source, to keep the per-task IPC cost down.
+    batches = []
+    batch = []
+    batch_size = 0
+
+    for page in sorted(stale, key=lambda page: -sizes[page[0]]):
+        batch.append(page)
+        batch_size += sizes[page[0]]
+        if batch_size >= batch_bytes:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def render_stale(stale, sizes, template, jobs, inline_cache_size=0, metrics=None, records=None, indexes=(),
+                 ast_cache=None, errors=None):
+    # Idle workers pull the next batch off the pool's shared queue, so a worker stuck on
+    # a big page doesn't hold up the rest. Returns per-worker timings and the number of
+    # output files written. With indexes, every page's render_indexed record is
+    # collected into records. [source, message] for each page that failed to render
+    # goes into errors.
+    workers = {}
+    batches = make_batches(stale, sizes)
+    if jobs <= 1 or len(batches) <= 1:
+        cache = InlineCache(inline_cache_size) if inline_cache_size else None
+        results = [render_batch(batch, template, cache, metrics, indexes, ast_cache) for batch in batches]
+    else:
+        # Only parallel builds need the pool; importing it costs more than a small build.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(template, inline_cache_size, metrics is not None, indexes,
+                                           ast_cache)) as pool:
+            results = [future.result() for future in
+                       [pool.submit(render_batch, batch) for batch in batches]]
+
+    for result in results:
+        pid = result["pid"]
+        worker = workers.setdefault(pid, {"pid": pid, "batches": 0, "pages": 0, "seconds": 0.0})
+        worker["batches"] += 1
+        worker["pages"] += result["pages"]
+        worker["seconds"] += result["seconds"]
+        if result["inline_cache"] is not None:
+            # Counters are cumulative per process, so the latest batch has the totals.
+            worker["inline_cache"] = result["inline_cache"]
+        if result["ast_cache"] is not None:
+            worker["ast_cache"] = result["ast_cache"]
+        if result["metrics"] is not None:
+            metrics.merge(result["metrics"])
+        if result["search"] is not None:
+            records.extend(result["search"])
+        if errors is not None:
+            errors.extend(result["errors"])
+    written = sum(result["written"] for result in results)
+    return sorted(workers.values(), key=lambda worker: worker["pid"]), written
+
+
+def find_assets(content_dir):
+    # Site paths of every file under content_dir that isn't a page source.
+    assets = []
+    for dirpath, _, filenames in os.walk(content_dir):
+        rel_dir = os.path.relpath(dirpath, content_dir)
+        for filename in filenames:
+            if not filename.endswith(".md"):
+                path = filename if rel_dir == os.curdir else os.path.join(rel_dir, filename)
+                assets.append(path.replace(os.sep, "/"))
+    return assets
+
+
+def site_url(output_path, output_dir):
+    return os.path.relpath(output_path, output_dir).replace(os.sep, "/")
+
+
+def terms_dir_for(manifest_path):
+    # Where the search terms of each page are kept between builds: next to the
+    # manifest, so they don't end up in the published output.
+    return os.path.splitext(manifest_path)[0] + "-terms"
+
+
+def terms_path(terms_dir, output_path, output_dir):
+    # Output paths all start with output_dir, as find_sources makes them, so the
+    # relative part is sliced off rather than worked out by relpath for every page of
+    # a no-op build.
+    return os.path.join(terms_dir, output_path[len(os.path.join(output_dir, "")):] + ".json")
+
+
+def write_terms(terms_dir, output_path, output_dir, terms):
+    write_data(terms_path(terms_dir, output_path, output_dir),
+               json.dumps(terms, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def write_search_index(sources, pages, output_dir, terms_dir):
+    # Indexes every page from its manifest entry and terms file, and writes the index
+    # files that changed. Returns the number of pages indexed.
+    index = SearchIndex()
+    search_dir = os.path.join(output_dir, SEARCH_DIR)
+    with stage("search_index") as timing:
+        for source, output_path in sources:
+            with open(terms_path(terms_dir, output_path, output_dir), encoding="utf-8") as fp:
+                terms = json.load(fp)
+            index.add_page(site_url(output_path, output_dir), pages[source]["search"], terms)
+        for name, data in index.iter_files():
+            timing.nbytes += len(data)
+            write_data(os.path.join(search_dir, name), data)
+    return len(index)
+
+
+def check_references(sources, pages, content_dir, output_dir, manifest):
+    # Checks every page's links and images from its manifest entry against the set of
+    # generated pages and the files under content_dir, and groups the referenced
+    # assets that hold the same bytes. Asset hashes go through the manifest, so an
+    # asset is only read again once it changes.
+    # Returns counts of links and images, broken [page url, url] pairs and the
+    # duplicate asset groups.
+    with stage("references"):
+        index = ReferenceIndex((site_url(output_path, output_dir) for _, output_path in sources),
+                               find_assets(content_dir))
+        for source, output_path in sources:
+            index.add_page(site_url(output_path, output_dir), pages[source]["refs"])
+        duplicates = duplicate_assets(
+            index.assets(), lambda path: manifest.file_hash(os.path.join(content_dir, path)))
+        return {
+            "links": index.links,
+            "images": index.images,
+            "broken": [list(pair) for pair in index.broken()],
+            "duplicate_assets": duplicates,
+        }
+
+
+def build_site(content_dir, output_dir, template_path=None, manifest_path=None, jobs=1,
+               inline_cache_size=0, metrics=None, pipeline="batch", search=False, references=False,
+               ast_cache_dir=None):
+    # Converts every .md file under content_dir to HTML under output_dir, skipping
+    # pages whose source, template and includes all hash the same as last time.
+    # With jobs > 1 the stale pages are rendered in a pool of worker processes.
+    # pipeline="async" streams pages through asyncbuild's reader, converter and writer
+    # stages instead of rendering whole batches per worker.
+    # inline_cache_size > 0 memoizes repeated inline fragments in an InlineCache.
+    # ast_cache_dir keeps every parsed page tree in an astcache.ASTCache there, so a
+    # page rebuilt with unchanged Markdown (after a template change, say) isn't parsed.
+    # Passing a metrics.Metrics collects per-stage counts and timings into it.
+    # search=True also writes a SearchIndex of every page under output_dir/search. Terms
+    # are counted from the TextNodes as pages are converted and kept in a file per page
+    # next to the manifest, so pages skipped as current are indexed without being
+    # parsed again. A build that changes no page leaves the index alone.
+    # references=True collects every link and image the same way and adds a
+    # "references" entry to the stats, as check_references returns it.
+    # Returns counts of built, skipped and removed pages plus per-worker timings. Of the
+    # built pages, "written" changed on disk and "unchanged" rendered to the HTML that
+    # was already there, so their files were left alone.
+    # A page that fails to render doesn't stop the build: it goes into "errors" as
+    # [source, message], keeps its last good output and manifest entry, and is
+    # rebuilt next time.
+    if pipeline not in PIPELINES:
+        raise ValueError(f"Unknown pipeline: {pipeline}")
+    manifest = BuildManifest(manifest_path or os.path.join(output_dir, MANIFEST_NAME))
+    template, template_deps = load_template(template_path, manifest)
+    stats = {"built": 0, "written": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+    pages = {}
+    stale = []
+    sizes = {}
+    sources = find_sources(content_dir, output_dir)
+    indexes = tuple(name for name, wanted in zip(INDEXES, (search, references)) if wanted)
+    terms_dir = terms_dir_for(manifest.path)
+    records = []
+    errors = []
+    ast_cache = None
+    if ast_cache_dir is not None:
+        from .astcache import ASTCache
+        ast_cache = ASTCache(ast_cache_dir)
+
+    for source, output_path in sources:
+        # A page missing from one of the wanted indexes has to be converted again.
+        if manifest.is_current(source, output_path, template_deps) and all(
+                name in manifest.pages[source] for name in indexes) and (
+                not search or os.path.exists(terms_path(terms_dir, output_path, output_dir))):
+            pages[source] = manifest.pages[source]
+            stats["skipped"] += 1
+            continue
+        deps = {source: manifest.file_hash(source)}
+        deps.update(template_deps)
+        pages[source] = {"deps": deps}
+        sizes[source] = manifest.seen[source]["size"]
+        stale.append((source, output_path))
+
+    if pipeline == "async":
+        from .asyncbuild import render_stale_async
+        stats["workers"], written = render_stale_async(stale, template, jobs, inline_cache_size, metrics,
+                                                       records, indexes, ast_cache, errors)
+    else:
+        stats["workers"], written = render_stale(stale, sizes, template, jobs, inline_cache_size, metrics,
+                                                 records, indexes, ast_cache, errors)
+    stats["built"] = len(stale) - len(errors)
+    stats["written"] = written
+    stats["unchanged"] = stats["built"] - written
+    stats["errors"] = sorted(errors)
+
+    sources_by_output = {output_path: source for source, output_path in stale}
+    failed = {source for source, _ in errors}
+    for record in records:
+        output_path = record.pop("output")
+        source = sources_by_output[output_path]
+        if source in failed:
+            continue
+        if "search" in record:
+            title, terms = record["search"]
+            write_terms(terms_dir, output_path, output_dir, terms)
+            record["search"] = title
+        pages[source].update(record)
+    for source in failed:
+        # The output on disk, if any, is still from the old entry's build. Without an
+        # entry the page has never built and is left out of the indexes, as it is
+        # from the search index when its old terms file has gone.
+        page = manifest.pages.get(source)
+        if page is None:
+            del pages[source]
+            continue
+        output_path = output_path_for(source, content_dir, output_dir)
+        if "search" in page and not os.path.exists(terms_path(terms_dir, output_path, output_dir)):
+            page = {name: value for name, value in page.items() if name != "search"}
+        pages[source] = page
+
+    for source in manifest.pages:
+        if source not in pages:
+            output_path = output_path_for(source, content_dir, output_dir)
+            for path in (output_path, terms_path(terms_dir, output_path, output_dir)):
+                if os.path.exists(path):
+                    os.remove(path)
+            stats["removed"] += 1
+
+    sources = [(source, output_path) for source, output_path in sources
+               if all(name in pages.get(source, ()) for name in indexes)]
+    with collecting(metrics) if metrics is not None else nullcontext():
+        # "indexed" is only there when the index was written.
+        if search and (stats["built"] or stats["removed"]
+                       or not os.path.exists(os.path.join(output_dir, SEARCH_DIR, "index.json"))):
+            stats["indexed"] = write_search_index(sources, pages, output_dir, terms_dir)
+        if references:
+            stats["references"] = check_references(sources, pages, content_dir, output_dir, manifest)
+
+    manifest.pages = pages
+    manifest.save()
+    return stats
@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+
+# build.PIPELINES, repeated here so that --help and --convert don't import the builder.
+PIPELINES = ("batch", "async")
+
+
+def convert(path):
+    # Converts a single Markdown file ("-" for stdin) to an HTML fragment on stdout,
+    # for editor hooks and the like. Only the block parser gets imported. Files are
+    # memory-mapped, so even very large ones are scanned in place, unless their lines
+    # end in a lone "\r": those are read as text, which turns them into "\n"s.
+    from .blocknode import markdown_to_html_file
+
+    if path == "-":
+        markdown_to_html_file(sys.stdin, sys.stdout)
+    else:
+        from .mmapsource import MappedSource
+
+        with MappedSource(path) as source:
+            mapped = not source.has_bare_cr()
+            if mapped:
+                markdown_to_html_file(source, sys.stdout)
+        if not mapped:
+            with open(path, encoding="utf-8") as fp:
+                markdown_to_html_file(fp, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="staticsite", description="Build the static site from Markdown.")
+    parser.add_argument("content", nargs="?", default="content",
+                        help="directory of Markdown sources (default: content)")
+    parser.add_argument("output", nargs="?", default="public",
+                        help="directory to write HTML into (default: public)")
+    parser.add_argument("--template", default=None,
+                        help="HTML template with {{ Title }} and {{ Content }} placeholders")
+    parser.add_argument("--manifest", default=None,
+                        help="build manifest path (default: <output>/.build-manifest.json)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes to render pages with (default: 1)")
+    parser.add_argument("--inline-cache", type=int, default=0, metavar="SIZE",
+                        help="memoize up to SIZE repeated inline fragments per process (default: off)")
+    parser.add_argument("--ast-cache", metavar="DIR",
+                        help="keep parsed pages in DIR so unchanged Markdown isn't parsed again (default: off)")
+    parser.add_argument("--pipeline", choices=PIPELINES, default="batch",
+                        help="batch: render whole batches per worker; async: stream pages through "
+                             "concurrent read, convert and write stages (default: batch)")
+    parser.add_argument("--search-index", action="store_true",
+                        help="also write a client-side search index under <output>/search")
+    parser.add_argument("--check-references", action="store_true",
+                        help="report broken internal links and images, and duplicate assets")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-stage counts, bytes and timings to PATH")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), default="json",
+                        help="format for --metrics (default: json)")
+    parser.add_argument("--convert", metavar="PATH",
+                        help="convert one Markdown file (- for stdin) to HTML on stdout instead of building")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-render pages as they change, reporting each latency")
+    parser.add_argument("--poll", action="store_true",
+                        help="with --watch, poll file stats instead of using inotify")
+    args = parser.parse_args(argv)
+    if args.convert:
+        return convert(args.convert)
+    if args.watch:
+        from .watch import watch
+
+        try:
+            watch(args.content, args.output, args.template, args.manifest, poll=args.poll)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    from .build import build_site
+    from .metrics import Metrics
+
+    metrics = Metrics() if args.metrics else None
+    stats = build_site(args.content, args.output, args.template, args.manifest, args.jobs,
+                       args.inline_cache, metrics, args.pipeline, args.search_index, args.check_references,
+                       args.ast_cache)
+    print(f"built {stats['built']} ({stats['written']} written, {stats['unchanged']} unchanged), "
+          f"skipped {stats['skipped']}, removed {stats['removed']}")
+    for source, message in stats["errors"]:
+        print(f"error: {source}: {message}", file=sys.stderr)
+    if "indexed" in stats:
+        print(f"  search index: {stats['indexed']} pages")
+    if "references" in stats:
+        refs = stats["references"]
+        print(f"  references: {refs['links']} links, {refs['images']} images, {len(refs['broken'])} broken")
+        for page, url in refs["broken"]:
+            print(f"    broken: {page} -> {url}")
+        for paths in refs["duplicate_assets"]:
+            print(f"    same content: {', '.join(paths)}")
+    for worker in stats["workers"]:
+        if args.jobs > 1:
+            print(f"  worker {worker['pid']}: {worker['pages']} pages in "
+                  f"{worker['batches']} batches, {worker['seconds']:.3f}s")
+        if "inline_cache" in worker:
+            cache = worker["inline_cache"]
+            print(f"  inline cache: {cache['hits']} hits, {cache['misses']} misses, "
+                  f"{cache['evictions']} evictions")
+        if "ast_cache" in worker:
+            cache = worker["ast_cache"]
+            print(f"  AST cache: {cache['hits']} hits, {cache['misses']} misses")
+    if metrics is not None:
+        with open(args.metrics, "w") as fp:
+            fp.write(metrics.to_json() if args.metrics_format == "json" else metrics.to_prometheus())
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
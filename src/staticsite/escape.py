@@ -0,0 +1,34 @@
+# Escaping for text and attribute values written into HTML.
+# Almost every value in a generated page has nothing to escape, so each function
+# first checks for the special characters with plain substring tests, which
+# scan the string at C speed, and hands the string back untouched when none are
+# found. Only strings that need it pay for the chained replaces.
+
+
+class SafeString(str):
+    # A str already known to be valid HTML, e.g. output of a renderer. The escape
+    # functions return it as is, so markup can be nested without being escaped twice.
+    __slots__ = ()
+
+
+def escape_text(text):
+    # For element content: &, < and >.
+    if type(text) is str:
+        if "&" in text or "<" in text or ">" in text:
+            return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return text
+    if isinstance(text, SafeString):
+        return text
+    return escape_text(str(text))
+
+
+def escape_attribute(value):
+    # For double quoted attribute values: &, <, >, " and ', same as html.escape.
+    if type(value) is str:
+        if "&" in value or "<" in value or ">" in value or '"' in value or "'" in value:
+            return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                    .replace('"', "&quot;").replace("'", "&#x27;"))
+        return value
+    if isinstance(value, SafeString):
+        return value
+    return escape_attribute(str(value))
@@ -0,0 +1,327 @@
+from .escape import SafeString, escape_attribute, escape_text
+from .metrics import instrumented
+
+
+ENTER = "enter"
+LEAVE = "leave"
+
+
+def walk(node):
+    # Depth-first walk over a node tree using an explicit stack, so any depth works
+    # without touching Python's recursion limit.
+    # Yields (ENTER, node) in document order and (LEAVE, node) once all of that
+    # node's children have been walked. Leaves get both events back to back.
+    yield ENTER, node
+    if not node.children:
+        yield LEAVE, node
+        return
+    stack = [(node, iter(node.children))]
+    
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield LEAVE, parent
+            continue
+        yield ENTER, child
+        if child.children:
+            stack.append((child, iter(child.children)))
+        else:
+            yield LEAVE, child
+
+
+class HTMLNode:
+    # Slotted: big documents hold millions of nodes and a __dict__ each adds up.
+    # frozen_in is only set on nodes inside frozen subtrees, see ParentNode.freeze.
+    __slots__ = ("tag", "value", "children", "props", "frozen_in")
+    frozen = False
+
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+    @instrumented("serialize", lambda args, result: len(result))
+    def to_html(self):
+        return "".join(self.iter_html())
+
+
+    def iter_html(self):
+        # Yields the rendered HTML in chunks; subclasses decide how they are split up.
+        raise NotImplementedError
+
+
+    @instrumented("serialize")
+    def render_to(self, fp, buffer_size=1024):
+        # Streams the HTML into anything with a write() method, joining small chunks
+        # first so a file isn't hit once per tag. If a node further down turns out to be
+        # invalid, whatever came before it has already been written.
+        parts = []
+        for chunk in self.iter_html():
+            parts.append(chunk)
+            if len(parts) >= buffer_size:
+                fp.write("".join(parts))
+                parts.clear()
+        if parts:
+            fp.write("".join(parts))
+    
+
+    def props_to_html(self):
+        if self.props is None:
+            return ""
+        parts = []
+        for k, v in self.props.items():
+            # Same inlined fast path as LeafNode.to_html.
+            if type(v) is not str or "&" in v or "<" in v or ">" in v or '"' in v or "'" in v:
+                v = escape_attribute(v)
+            parts.append(f' {k}="{v}"')
+        return "".join(parts)
+    
+
+    def __repr__(self):
+        return(f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})")
+
+
+class LeafNode(HTMLNode):
+    __slots__ = ()
+    # Leaves never have children, so they share one empty tuple instead of each
+    # allocating an empty list.
+    children = ()
+
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.props = props
+
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("All leaf nodes must have a value.")
+        # Values are escaped unless they are an escape.SafeString. escape_text's
+        # checks are repeated here to save a call per leaf in the common cases.
+        value = self.value
+        if type(value) is str:
+            if "&" in value or "<" in value or ">" in value:
+                value = escape_text(value)
+        elif not isinstance(value, SafeString):
+            value = escape_text(value)
+        if not self.tag:
+            return value
+        return f'<{self.tag}{self.props_to_html()}>{value}</{self.tag}>'
+
+
+    def iter_html(self):
+        yield self.to_html()
+
+
+    def __repr__(self):
+        # Shown as the empty list leaves used to carry; the shared tuple is internal.
+        return f"HTMLNode({self.tag}, {self.value}, [], {self.props})"
+
+
+class ParentNode(HTMLNode):
+    # cached_html is only set once the node is frozen.
+    __slots__ = ("cached_html",)
+
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+    def freeze(self):
+        # Renders this subtree once and keeps the HTML on the node. Rendering the node
+        # again, alone or inside any parent, splices the cached string in verbatim.
+        # Every node below is switched to a watched class, every children list to a
+        # WatchedList and every props dict to a WatchedDict. From then on, assigning to
+        # any node's attributes or changing its children or props drops the cache of
+        # each frozen node around it, and the next render freezes the subtree again.
+        # frozen_in holds every frozen node a node sits directly in, so a subtree
+        # shared by several frozen parents invalidates all of them. A node taken out
+        # of a frozen subtree keeps invalidating it until it's dropped, which only
+        # costs a spare re-render. A list or dict that was swapped out for a watched
+        # one is no longer watched.
+        watch(self, frozen=True)
+        if getattr(self, "frozen_in", None) is None:
+            object.__setattr__(self, "frozen_in", set())
+        owners = [self]
+
+        for event, node in walk(self):
+            if event is LEAVE:
+                if node is owners[-1] and node is not self:
+                    owners.pop()
+                continue
+            if node is not self:
+                frozen_in = getattr(node, "frozen_in", None)
+                if frozen_in is None:
+                    object.__setattr__(node, "frozen_in", {owners[-1]})
+                else:
+                    frozen_in.add(owners[-1])
+                if node.frozen:
+                    owners.append(node)
+                else:
+                    watch(node)
+            if type(node.children) is list:
+                object.__setattr__(node, "children", WatchedList(node, node.children))
+            if type(node.props) is dict:
+                object.__setattr__(node, "props", WatchedDict(node, node.props))
+
+        object.__setattr__(self, "cached_html", None)
+        object.__setattr__(self, "cached_html", "".join(self.iter_html_uncached()))
+        return self
+
+
+    def frozen_html(self):
+        html = self.cached_html
+        if html is None:
+            html = self.freeze().cached_html
+        return html
+
+
+    def iter_html(self):
+        if self.frozen:
+            yield self.frozen_html()
+            return
+        yield from self.iter_html_uncached()
+
+
+    def iter_html_uncached(self):
+        # Same traversal as walk() but inlined, with an explicit stack instead of
+        # recursion so nesting depth doesn't matter. Frozen subtrees below this node
+        # still come out of their caches.
+        yield self.open_tag()
+        stack = [(self, iter(self.children))]
+        
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    if child.frozen:
+                        yield child.frozen_html()
+                        continue
+                    yield child.open_tag()
+                    stack.append((child, iter(child.children)))
+                    break
+                elif isinstance(child, LeafNode):
+                    yield child.to_html()
+                else:
+                    yield from child.iter_html()
+            else:
+                stack.pop()
+                yield f"</{parent.tag}>"
+
+
+    def open_tag(self):
+        if not self.tag:
+            raise ValueError("No tag provided.")
+        if not self.children:
+            raise ValueError("No children provided.")
+        return f"<{self.tag}{self.props_to_html()}>"
+
+
+def invalidate(node):
+    # Drops the cached HTML of every frozen subtree node sits in, however deep.
+    pending = [node] if node.frozen else list(node.frozen_in or ())
+    seen = set()
+    while pending:
+        owner = pending.pop()
+        if owner in seen:
+            continue
+        seen.add(owner)
+        object.__setattr__(owner, "cached_html", None)
+        pending.extend(owner.frozen_in or ())
+
+
+def restore(cls, state, frozen):
+    # Unpickles a node saved by Watched.__reduce_ex__.
+    node = cls.__new__(cls)
+    for name, value in state.items():
+        setattr(node, name, value)
+    return node.freeze() if frozen else node
+
+
+class Watched:
+    # Mixed into the classes of nodes inside frozen subtrees; every attribute write
+    # invalidates the caches above the node.
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        invalidate(self)
+
+
+    def __reduce_ex__(self, protocol):
+        # The watched classes are made at run time and can't be found by name, so a
+        # node pickles as its plain class, without caches or owners, and a frozen one
+        # freezes again when it's loaded.
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name in ("frozen_in", "cached_html") or name in state:
+                    continue
+                # Through the slot itself: LeafNode's class-level children hides its slot.
+                try:
+                    value = cls.__dict__[name].__get__(self, cls)
+                except AttributeError:
+                    continue
+                if type(value) is WatchedList:
+                    value = list(value)
+                elif type(value) is WatchedDict:
+                    value = dict(value)
+                state[name] = value
+        return restore, (self.unwatched, state, self.frozen)
+
+
+# (class, frozen) -> watched subclass, made on first use so subclasses of LeafNode
+# and ParentNode keep their own behaviour once watched.
+WATCHED_CLASSES = {}
+
+
+def watch(node, frozen=False):
+    cls = getattr(type(node), "unwatched", type(node))
+    watched = WATCHED_CLASSES.get((cls, frozen))
+    if watched is None:
+        watched = WATCHED_CLASSES[(cls, frozen)] = type(
+            cls.__name__, (Watched, cls), {"__slots__": (), "frozen": frozen, "unwatched": cls})
+    if type(node) is not watched:
+        object.__setattr__(node, "__class__", watched)
+
+
+class WatchedList(list):
+    # Children list of a node in a frozen subtree; changes invalidate like attribute
+    # writes on the owner do.
+    __slots__ = ("owner",)
+
+    def __init__(self, owner, items):
+        super().__init__(items)
+        self.owner = owner
+
+
+def watched_method(name, base=list):
+    method = getattr(base, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        invalidate(self.owner)
+        return result
+    wrapper.__name__ = name
+    return wrapper
+
+
+for name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert",
+             "pop", "remove", "clear", "sort", "reverse"):
+    setattr(WatchedList, name, watched_method(name))
+
+
+class WatchedDict(dict):
+    # Props dict of a node in a frozen subtree, watched like WatchedList.
+    __slots__ = ("owner",)
+
+    def __init__(self, owner, items):
+        super().__init__(items)
+        self.owner = owner
+
+
+for name in ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault", "update"):
+    setattr(WatchedDict, name, watched_method(name, dict))
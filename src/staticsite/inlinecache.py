@@ -0,0 +1,67 @@
+from collections import OrderedDict
+import threading
+
+from .textnode import text_to_textnodes, text_nodes_to_html
+
+
+def inline_to_html(text):
+    # Comes back as a SafeString, so a LeafNode wrapping the cached HTML doesn't
+    # escape it again.
+    return text_nodes_to_html(text_to_textnodes(text))
+
+
+class InlineCache:
+    # Bounded LRU of inline Markdown fragment -> rendered HTML, for pages that repeat
+    # the same nav snippets, footers and link lists over and over.
+    # Values are plain strings, so a hit can be handed out to any number of callers
+    # without copying. One lock guards the table and counters, which makes a single
+    # cache safe to share between threads. The conversion itself runs outside the lock,
+    # so two threads missing on the same fragment may both convert it.
+    def __init__(self, maxsize=4096):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive.")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def inline_to_html(self, text):
+        with self.lock:
+            html = self.entries.get(text)
+            if html is not None:
+                self.entries.move_to_end(text)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = inline_to_html(text)
+
+        with self.lock:
+            self.entries[text] = html
+            self.entries.move_to_end(text)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return html
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+            }
+
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
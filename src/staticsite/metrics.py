@@ -0,0 +1,141 @@
+from contextlib import contextmanager, nullcontext
+import functools
+import time
+
+
+# The Metrics currently collecting, or None. Instrumented functions check this
+# first and call straight through when it's None, so leaving it off costs one
+# extra function call and a global lookup.
+active = None
+
+
+class Timing:
+    # Handed out by stage() so the block can fill in its byte count once known.
+    __slots__ = ("nbytes",)
+
+    def __init__(self, nbytes=0):
+        self.nbytes = nbytes
+
+
+class Metrics:
+    # Calls, bytes and wall time per pipeline stage.
+    # A stage that calls itself, like a ParentNode rendering its children, is only
+    # counted at the outermost call so time isn't added up twice.
+    def __init__(self):
+        self.stages = {}
+        # Imported here rather than at the top: the instrumented modules import this
+        # one, and most runs never collect.
+        import threading
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+
+    def record(self, stage, nbytes, seconds, errors=0):
+        with self.lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {"calls": 0, "errors": 0, "bytes": 0, "seconds": 0.0}
+            entry["calls"] += 1
+            entry["errors"] += errors
+            entry["bytes"] += nbytes
+            entry["seconds"] += seconds
+
+
+    def call(self, stage, measure, func, args, kwargs):
+        running = self.local.__dict__.setdefault("running", set())
+        if stage in running:
+            return func(*args, **kwargs)
+        running.add(stage)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(stage, 0, time.perf_counter() - start, errors=1)
+            raise
+        finally:
+            running.discard(stage)
+        self.record(stage, measure(args, result) if measure else 0, time.perf_counter() - start)
+        return result
+
+
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        timing = Timing(nbytes)
+        start = time.perf_counter()
+        try:
+            yield timing
+        except Exception:
+            self.record(name, 0, time.perf_counter() - start, errors=1)
+            raise
+        self.record(name, timing.nbytes, time.perf_counter() - start)
+
+
+    def merge(self, stages):
+        # Folds in another collector's to_dict(), e.g. from a worker process.
+        with self.lock:
+            for name, other in stages.items():
+                entry = self.stages.setdefault(name, {"calls": 0, "errors": 0, "bytes": 0, "seconds": 0.0})
+                for key in entry:
+                    entry[key] += other[key]
+
+
+    def to_dict(self):
+        with self.lock:
+            return {name: dict(entry) for name, entry in sorted(self.stages.items())}
+
+
+    def to_json(self):
+        import json
+
+        return json.dumps({"stages": self.to_dict()}, indent=2)
+
+
+    def to_prometheus(self, prefix="staticsite"):
+        stages = self.to_dict()
+        lines = []
+        for key, kind, help_text in (
+            ("calls", "calls_total", "Calls per pipeline stage."),
+            ("errors", "errors_total", "Calls per pipeline stage that raised."),
+            ("bytes", "bytes_total", "Bytes processed per pipeline stage."),
+            ("seconds", "seconds_total", "Wall time spent per pipeline stage."),
+        ):
+            name = f"{prefix}_stage_{kind}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, entry in stages.items():
+                lines.append(f'{name}{{stage="{stage}"}} {entry[key]}')
+        return "\n".join(lines) + "\n"
+
+
+def instrumented(stage, measure=None):
+    # Decorator marking a function as a pipeline stage. measure(args, result), if
+    # given, returns the byte count to record for a call.
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return func(*args, **kwargs)
+            return active.call(stage, measure, func, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def stage(name, nbytes=0):
+    # Context manager timing a block as a stage; does nothing unless collecting.
+    # Yields a Timing whose nbytes can be set inside the block.
+    if active is None:
+        return nullcontext(Timing())
+    return active.stage(name, nbytes)
+
+
+@contextmanager
+def collecting(metrics=None):
+    # Turns instrumentation on for the duration of the block and yields the Metrics.
+    global active
+    previous = active
+    active = metrics if metrics is not None else Metrics()
+    try:
+        yield active
+    finally:
+        active = previous
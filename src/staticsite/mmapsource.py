@@ -0,0 +1,130 @@
+import mmap
+import os
+import re
+
+from .blocknode import BlockType
+
+
+# Byte-level versions of the line rules in blocknode.iter_blocks, so whole blocks can
+# be matched in place against the mapped file.
+# Whitespace as str.strip() sees it: the ASCII characters, plus the UTF-8 encodings
+# of U+0085, U+00A0, U+1680, U+2000-U+200A, U+2028, U+2029, U+202F, U+205F and U+3000.
+SPACE = (rb"(?:[ \t\r\f\v\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80"
+         rb"|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)")
+BLANK_LINE = SPACE + rb"*(?:\n|\Z)"
+# Whatever line_block_type would give a type for.
+MARKER = rb"(?:#{1,6} |```|>|[-*] |\d+\. )"
+PLAIN_LINE = rb"(?!" + MARKER + rb")(?!" + BLANK_LINE + rb")[^\n]*"
+# One block per match; the named group says which and spans its lines, without the
+# last "\n". A code block runs from its fence to the next line starting with one, or
+# to the end of the file, and its group holds every line in between with its "\n".
+# Blank lines after a block are taken along with it, so they don't cost a match each.
+BLOCK = re.compile(
+    rb"(?:(?P<blank>" + BLANK_LINE + rb")"
+    rb"|(?P<heading>#{1,6} [^\n]*)\n?"
+    rb"|```[^\n]*\n?(?P<code>(?:(?!```)[^\n]*\n)*(?:(?!```)[^\n]+\Z)?)(?:```[^\n]*\n?)?"
+    rb"|(?P<quote>>[^\n]*(?:\n>[^\n]*)*)\n?"
+    rb"|(?P<unordered>[-*] [^\n]*(?:\n[-*] [^\n]*)*)\n?"
+    rb"|(?P<ordered>\d+\. [^\n]*(?:\n\d+\. [^\n]*)*)\n?"
+    rb"|(?P<paragraph>" + PLAIN_LINE + rb"(?:\n" + PLAIN_LINE + rb")*)\n?"
+    rb")(?:" + SPACE + rb"*\n)*"
+)
+# A "\r" line end without its "\n" (old Mac files), which BLOCK doesn't split on.
+BARE_CR = re.compile(rb"\r(?!\n)")
+BLOCK_TYPES = {
+    "heading": BlockType.HEADING,
+    "code": BlockType.CODE,
+    "quote": BlockType.QUOTE,
+    "unordered": BlockType.UNORDERED_LIST,
+    "ordered": BlockType.ORDERED_LIST,
+    "paragraph": BlockType.PARAGRAPH,
+}
+
+# Once this much of the file has been scanned, its pages are dropped from the
+# process again so resident memory doesn't grow with the file. They stay in the
+# page cache; it's only our mapping of them that goes.
+RELEASE_WINDOW = 16 * 1024 * 1024
+
+
+class MappedSource:
+    # A Markdown file mapped read-only into memory and scanned by byte offsets.
+    # Block boundaries are found by matching whole blocks in place, without decoding
+    # anything or splitting lines in Python; each block's text is then decoded
+    # straight out of the mapping, one block at a time.
+    # Can be passed to iter_html_blocks or markdown_to_html_file in place of lines.
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            # Empty files can't be mapped, and have nothing to scan anyway.
+            self.data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.data.madvise(mmap.MADV_SEQUENTIAL)
+
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def __len__(self):
+        return len(self.data)
+
+
+    def release(self, end):
+        # Drops the pages before end from this process's resident set.
+        if isinstance(self.data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+            self.data.madvise(mmap.MADV_DONTNEED, 0, end - end % mmap.PAGESIZE)
+
+
+    def has_bare_cr(self):
+        # Whether any line ends in a lone "\r". iter_blocks only knows "\n" and "\r\n"
+        # line ends, so such a file has to be read as text instead (see cli.convert).
+        found = BARE_CR.search(self.data) is not None
+        self.release(len(self.data))
+        return found
+
+
+    def iter_blocks(self):
+        # Drop-in for blocknode.iter_blocks over the file's lines, in the same order and
+        # by the same rules, for files whose lines end in "\n" or "\r\n". Paragraph and code blocks come back as a single line
+        # holding the whole run, since block_to_html_node only ever joins their lines
+        # with "\n" again.
+        data = self.data
+        match = BLOCK.match
+        size = len(data)
+        pos = released = 0
+        while pos < size:
+            m = match(data, pos)
+            pos = m.end()
+            if pos - released >= RELEASE_WINDOW:
+                self.release(pos)
+                released = pos
+            kind = m.lastgroup
+            if kind == "blank":
+                continue
+            start, end = m.span(kind)
+            if kind == "code":
+                if start == end:
+                    yield BlockType.CODE, []
+                    continue
+                if data[end - 1] == 10:
+                    end -= 1
+            # Slicing copies just this block out of the mapping; for spans this size
+            # that's cheaper than decoding through a memoryview.
+            text = data[start:end].decode("utf-8")
+            if "\r" in text:
+                # Lines lose their trailing "\r"s, as with line.rstrip("\r\n").
+                lines = [line.rstrip("\r") for line in text.split("\n")]
+                text = "\n".join(lines)
+            if kind == "paragraph" or kind == "code":
+                yield BLOCK_TYPES[kind], [text]
+            else:
+                yield BLOCK_TYPES[kind], text.split("\n")
@@ -0,0 +1,136 @@
+import posixpath
+
+from .textnode import TextType
+
+
+# URLs with one of these in front point off the site, or at nothing to check.
+EXTERNAL_PREFIXES = ("#", "//", "mailto:", "tel:", "data:", "javascript:")
+
+# Memo marker for a url not resolved yet; None and False are results.
+UNRESOLVED = object()
+
+
+def add_references(refs, text_nodes):
+    # Appends [text type value, url] for every link and image in text_nodes to refs, a
+    # list. The pairs are plain lists of strings so they go into the build manifest
+    # as they are.
+    link = TextType.LINK
+    image = TextType.IMAGE
+    for node in text_nodes:
+        text_type = node.text_type
+        if text_type is link or text_type is image:
+            refs.append([text_type.value, node.url])
+
+
+def internal_path(page_url, url):
+    # The site path a reference from the page at page_url resolves to, or None for
+    # external URLs. Queries and fragments are dropped; a leading "/" is the site root.
+    if "://" in url or url.startswith(EXTERNAL_PREFIXES):
+        return None
+    for mark in ("#", "?"):
+        cut = url.find(mark)
+        if cut != -1:
+            url = url[:cut]
+    if not url:
+        return None
+    if url.startswith("/"):
+        path = url[1:]
+    else:
+        path = posixpath.join(posixpath.dirname(page_url), url)
+    path = posixpath.normpath(path)
+    if path == ".":
+        return ""
+    # Kept when normpath drops it: "blog/" means blog/index.html, "blog" may not.
+    return path + "/" if url.endswith("/") else path
+
+
+class ReferenceIndex:
+    # Every link and image on a site, collected page by page and checked against the
+    # set of generated pages and the site's asset files as it comes in.
+    # Each distinct url is resolved once and memoized: site-absolute and external urls
+    # once for the whole site, relative ones once per page directory. Every other
+    # reference to it is a dict lookup, so checking the site takes one pass over its
+    # references rather than a rescan of every page.
+    def __init__(self, page_urls, asset_paths=()):
+        self.page_urls = set(page_urls)
+        self.asset_paths = set(asset_paths)
+        self.links = 0
+        self.images = 0
+        self.broken_refs = []
+        self.used_assets = set()
+        # url -> ("page" or "asset", site path), None for external urls, or False
+        # when nothing on the site is there.
+        self.absolute = {}
+        # page directory -> {url: the same}.
+        self.relative = {}
+
+
+    def add_page(self, page_url, refs):
+        # refs: [[text type value, url], ...], as collected by add_references.
+        absolute = self.absolute
+        relative = None
+        for kind, url in refs:
+            if kind == "image":
+                self.images += 1
+            else:
+                self.links += 1
+            if url.startswith("/") or "://" in url:
+                memo = absolute
+            else:
+                if relative is None:
+                    relative = self.relative.setdefault(posixpath.dirname(page_url), {})
+                memo = relative
+            target = memo.get(url, UNRESOLVED)
+            if target is UNRESOLVED:
+                target = memo[url] = self.target(page_url, url)
+            if target is False:
+                self.broken_refs.append((page_url, url))
+
+
+    def target(self, page_url, url):
+        path = internal_path(page_url, url)
+        if path is None:
+            return None
+        target = self.resolve(path)
+        if target is None:
+            return False
+        if target[0] == "asset":
+            self.used_assets.add(target[1])
+        return target
+
+
+    def resolve(self, path):
+        # Returns ("page" or "asset", site path) for an internal path, or None when
+        # nothing on the site is there. Directories mean their index.html, and
+        # extensionless paths may be pages without their ".html".
+        if path.endswith("/") or not path:
+            candidates = (path + "index.html",)
+        else:
+            candidates = (path, path + ".html", path + "/index.html")
+        for candidate in candidates:
+            if candidate in self.page_urls:
+                return "page", candidate
+        if path in self.asset_paths:
+            return "asset", path
+        return None
+
+
+    def broken(self):
+        # Returns sorted (page url, url) pairs for internal references that resolve to
+        # neither a generated page nor an asset.
+        return sorted(self.broken_refs)
+
+
+    def assets(self):
+        # Returns the site paths of every asset file something references.
+        return set(self.used_assets)
+
+
+def duplicate_assets(paths, file_hash):
+    # Groups asset paths by content: file_hash(path) gives each one's digest. Returns
+    # sorted lists of two or more paths holding the same bytes, the first in each list
+    # being the one to keep.
+    by_hash = {}
+    for path in sorted(paths):
+        by_hash.setdefault(file_hash(path), []).append(path)
+    return sorted(group for group in by_hash.values() if len(group) > 1)
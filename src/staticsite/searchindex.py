@@ -0,0 +1,88 @@
+import re
+import zlib
+
+
+SEARCH_DIR = "search"
+SEARCH_VERSION = 1
+
+# Shard files the postings are spread over. A client hashes a query term the same
+# way, crc32 of its UTF-8 bytes modulo this, and fetches just that shard.
+SHARDS = 16
+
+COMPRESS_LEVEL = 6
+
+# Words as the index sees them, after lowercasing. Single characters are dropped:
+# they match nearly every page and would make up most of the postings.
+TERM_PATTERN = re.compile(r"\w\w+")
+
+
+def add_terms(terms, text_nodes):
+    # Counts the search terms in text_nodes into terms, a Counter. Every TextType
+    # contributes its text: plain, bold, italic and code spans, and the anchor and alt
+    # text of links and images. URLs are left out. The texts are joined with a newline,
+    # which no term spans, so one findall covers the lot.
+    terms.update(TERM_PATTERN.findall("\n".join([node.text for node in text_nodes]).lower()))
+
+
+def shard_of(term, shards=SHARDS):
+    return zlib.crc32(term.encode("utf-8")) % shards
+
+
+class SearchIndex:
+    # Inverted index over a site's pages, filled one page at a time as they're rendered
+    # and written out as a set of files under a search directory:
+    #   index.json         {"version", "shards", "docs": [[url, title], ...]}
+    #   terms-NN.json.gz   {term: postings} for the terms whose shard_of is NN, where
+    #                      postings is a flat [doc gap, count, doc gap, count, ...] list.
+    # Doc gaps are the differences between successive ids into docs, which keeps the
+    # numbers small and repetitive for gzip. Docs are numbered in url order when the
+    # index is written, so the files come out the same however pages were scheduled.
+    def __init__(self, shards=SHARDS):
+        self.shards = shards
+        self.pages = []
+
+
+    def __len__(self):
+        return len(self.pages)
+
+
+    def add_page(self, url, title, terms):
+        # terms: {term: count}, as collected by add_terms. Pages are only inverted
+        # once all of them are in, since their doc ids depend on the url order.
+        self.pages.append((url, title, terms))
+
+
+    def iter_files(self):
+        # Yields (file name, bytes) for every file of the index.
+        # Imported here: only builds that write an index need these, and add_terms is
+        # used without them.
+        import gzip
+        import json
+
+        pages = sorted(self.pages, key=lambda page: page[0])
+        meta = {"version": SEARCH_VERSION, "shards": self.shards,
+                "docs": [[url, title] for url, title, _ in pages]}
+        yield "index.json", json.dumps(meta, separators=(",", ":")).encode("utf-8")
+
+        # Docs go in in id order, so each posting list comes out sorted and its gaps
+        # can be taken on the way, from the last doc seen per term.
+        shards = [{} for _ in range(self.shards)]
+        postings = {}
+        last = {}
+        for doc, (_, _, terms) in enumerate(pages):
+            for term, count in terms.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = shards[shard_of(term, self.shards)][term] = []
+                    previous = 0
+                else:
+                    previous = last[term]
+                entry.append(doc - previous)
+                entry.append(count)
+                last[term] = doc
+        for number, shard in enumerate(shards):
+            data = json.dumps(shard, separators=(",", ":"), ensure_ascii=False, sort_keys=True).encode("utf-8")
+            # mtime=0 so the same index compresses to the same bytes every build. Level 9
+            # takes ten times as long on these runs of small numbers for 4% less.
+            yield f"terms-{number:02d}.json.gz", gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+
@@ -0,0 +1,216 @@
+from array import array
+
+from .escape import SafeString, escape_attribute, escape_text
+from .textnode import (
+    IMAGE_PATTERN,
+    INLINE_DELIMITERS,
+    LINK_PATTERN,
+    TextNode,
+    TextType,
+    _valid_matches,
+)
+
+
+# TextType <-> the small integer stored per span.
+TYPES = tuple(TextType)
+TYPE_CODES = {text_type: code for code, text_type in enumerate(TYPES)}
+TEXT = TYPE_CODES[TextType.TEXT]
+IMAGE = TYPE_CODES[TextType.IMAGE]
+
+NO_URL = -1
+
+
+class SpanBuffer:
+    # Compact alternative to a list of TextNodes: one shared source string plus
+    # parallel arrays of start/end offsets, type codes and url indexes, one entry
+    # per span. Splitting only appends integers; span texts are sliced out of the
+    # source when they are rendered or turned back into TextNodes.
+    # URLs live in a table shared by every span, so repeated links are stored once.
+    __slots__ = ("source", "starts", "ends", "types", "url_ids", "urls", "url_table")
+
+    def __init__(self, source, urls=None):
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.types = array("b")
+        self.url_ids = array("q")
+        self.urls = urls if urls is not None else []
+        self.url_table = {url: i for i, url in enumerate(self.urls)}
+
+
+    @classmethod
+    def from_text(cls, text):
+        # One TEXT span covering the whole string, like [TextNode(text, TextType.TEXT)].
+        buffer = cls(text)
+        buffer.append(0, len(text), TEXT)
+        return buffer
+
+
+    @classmethod
+    def from_textnodes(cls, nodes):
+        # Bridge in: the node texts are joined into one source string.
+        buffer = cls("".join([node.text for node in nodes]))
+        pos = 0
+        for node in nodes:
+            if not isinstance(node.text_type, TextType):
+                raise Exception("No valid text type provided.")
+            end = pos + len(node.text)
+            buffer.append(pos, end, TYPE_CODES[node.text_type], node.url)
+            pos = end
+        return buffer
+
+
+    def derive(self):
+        # Empty buffer over the same source and url table, for the result of a split.
+        buffer = SpanBuffer(self.source, self.urls)
+        buffer.url_table = self.url_table
+        return buffer
+
+
+    def append(self, start, end, type_code, url=None):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.types.append(type_code)
+        if url is None:
+            self.url_ids.append(NO_URL)
+            return
+        url_id = self.url_table.get(url)
+        if url_id is None:
+            url_id = self.url_table[url] = len(self.urls)
+            self.urls.append(url)
+        self.url_ids.append(url_id)
+
+
+    def __len__(self):
+        return len(self.starts)
+
+
+    def text(self, i):
+        return self.source[self.starts[i]:self.ends[i]]
+
+
+    def text_type(self, i):
+        return TYPES[self.types[i]]
+
+
+    def url(self, i):
+        url_id = self.url_ids[i]
+        return None if url_id == NO_URL else self.urls[url_id]
+
+
+    def to_textnodes(self):
+        # Bridge out: the one place span texts get copied.
+        source = self.source
+        urls = self.urls
+        return [
+            TextNode(source[start:end], TYPES[code], None if url_id == NO_URL else urls[url_id])
+            for start, end, code, url_id in zip(self.starts, self.ends, self.types, self.url_ids)
+        ]
+
+
+    def to_html(self):
+        # Same as joining text_node_to_html_node(node).to_html() over to_textnodes(),
+        # without building the nodes in between. Texts and urls are escaped the same way:
+        # an image's text goes into its alt attribute, so it's escaped as one.
+        source = self.source
+        urls = self.urls
+        parts = []
+        for start, end, code, url_id in zip(self.starts, self.ends, self.types, self.url_ids):
+            text = source[start:end]
+            parts.append(RENDERERS[code](escape_attribute(text) if code == IMAGE else escape_text(text),
+                                         escape_attribute(urls[url_id]) if url_id != NO_URL else None))
+        return SafeString("".join(parts))
+
+
+    def split_delimiter(self, delimiter, text_type):
+        # split_nodes_delimiter on offsets: TEXT spans are cut at delimiter pairs,
+        # everything else is carried over as is.
+        if not delimiter:
+            raise Exception("No delimiter provided.")
+        if not isinstance(text_type, TextType):
+            raise Exception("No valid text type provided.")
+        source = self.source
+        size = len(delimiter)
+        code = TYPE_CODES[text_type]
+        result = self.derive()
+        starts, ends, types, url_ids = result.starts, result.ends, result.types, result.url_ids
+
+        for start, end, span_code, url_id in zip(self.starts, self.ends, self.types, self.url_ids):
+            if span_code != TEXT or source.find(delimiter, start, end) == -1:
+                starts.append(start)
+                ends.append(end)
+                types.append(span_code)
+                url_ids.append(url_id)
+                continue
+            if source.count(delimiter, start, end) % 2 != 0:
+                raise Exception("There are unclosed delimiters present. Please verify correct format.")
+            pos = start
+            inside = False
+            while pos <= end:
+                cut = source.find(delimiter, pos, end)
+                if cut == -1:
+                    cut = end
+                if cut > pos:
+                    starts.append(pos)
+                    ends.append(cut)
+                    types.append(code if inside else TEXT)
+                    url_ids.append(NO_URL)
+                inside = not inside
+                pos = cut + size
+        return result
+
+
+    def split_pattern(self, pattern, text_type, diagnostics=None):
+        # split_nodes_pattern on offsets. Like the TextNode version this applies to
+        # spans of any type, and image/link texts stay offsets into the source.
+        # Diagnostics positions are relative to the source string.
+        source = self.source
+        code = TYPE_CODES[text_type]
+        result = self.derive()
+        starts, ends, types, url_ids = result.starts, result.ends, result.types, result.url_ids
+
+        for start, end, span_code, url_id in zip(self.starts, self.ends, self.types, self.url_ids):
+            matches = None
+            if source.find("](", start, end) != -1:
+                matches = _valid_matches(pattern, source, start, end, diagnostics)
+            if matches is None:
+                starts.append(start)
+                ends.append(end)
+                types.append(span_code)
+                url_ids.append(url_id)
+                continue
+            pos = start
+            for m in matches:
+                if m.start() > pos:
+                    result.append(pos, m.start(), TEXT)
+                result.append(m.start(1), m.end(1), code, m[2])
+                pos = m.end()
+            if pos < end:
+                result.append(pos, end, TEXT)
+        return result
+
+
+    def split_images(self, diagnostics=None):
+        return self.split_pattern(IMAGE_PATTERN, TextType.IMAGE, diagnostics)
+
+
+    def split_links(self, diagnostics=None):
+        return self.split_pattern(LINK_PATTERN, TextType.LINK, diagnostics)
+
+
+def parse_inline(text, diagnostics=None):
+    # Same spans as text_to_textnodes, as a SpanBuffer over text.
+    buffer = SpanBuffer.from_text(text)
+    for delimiter, text_type in INLINE_DELIMITERS:
+        buffer = buffer.split_delimiter(delimiter, text_type)
+    return buffer.split_images(diagnostics).split_links(diagnostics)
+
+
+# Indexed by type code; mirrors text_node_to_html_node.
+RENDERERS = [None] * len(TYPES)
+RENDERERS[TYPE_CODES[TextType.TEXT]] = lambda text, url: text
+RENDERERS[TYPE_CODES[TextType.BOLD]] = lambda text, url: f"<b>{text}</b>"
+RENDERERS[TYPE_CODES[TextType.ITALIC]] = lambda text, url: f"<i>{text}</i>"
+RENDERERS[TYPE_CODES[TextType.CODE]] = lambda text, url: f"<code>{text}</code>"
+RENDERERS[TYPE_CODES[TextType.LINK]] = lambda text, url: f'<a href="{url}">{text}</a>'
+RENDERERS[TYPE_CODES[TextType.IMAGE]] = lambda text, url: f'<img src="{url}" alt="{text}"></img>'
@@ -0,0 +1,80 @@
+import re
+
+from .escape import escape_text
+from .htmlnode import HTMLNode
+from .metrics import instrumented
+
+
+# A slot is a name in double braces with one space either side, as in
+# "{{ Title }}". Includes ("{{ include nav.html }}") are expanded before compiling,
+# by build.load_template.
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+
+class Template:
+    # A page template compiled once into its static chunks with the slots between
+    # them, so filling it in for a page is one join over a short list instead of a
+    # str.replace pass over the whole template per slot, each copying the page.
+    # Slot values are strings, escaped as element text unless they're an
+    # escape.SafeString, or HTMLNodes, rendered in place: a navigation tree frozen once
+    # (ParentNode.freeze) costs a cached string per page.
+    # A slot with no value keeps its placeholder, as str.replace would have left it.
+    __slots__ = ("text", "parts", "slots")
+
+    def __init__(self, text):
+        self.text = text
+        # parts holds every chunk of the output, placeholders included, and slots the
+        # (index into parts, name) of each placeholder. split() puts the names of
+        # the matches at the odd positions.
+        self.parts = []
+        self.slots = []
+        for i, piece in enumerate(SLOT_PATTERN.split(text)):
+            if i % 2:
+                self.slots.append((len(self.parts), piece))
+                self.parts.append(f"{{{{ {piece} }}}}")
+            elif piece:
+                self.parts.append(piece)
+
+
+    def __repr__(self):
+        return f"Template({self.text!r})"
+
+
+    @instrumented("template", lambda args, result: len(result))
+    def render(self, values):
+        # Returns the filled-in page. values: {slot name: str, SafeString or HTMLNode}.
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = value.to_html() if isinstance(value, HTMLNode) else escape_text(value)
+        return "".join(parts)
+
+
+    def iter_html(self, values):
+        # Yields the page in chunks, HTMLNode values as their own iter_html chunks, so
+        # a page can be streamed without its body ever being one string.
+        slots = dict(self.slots)
+        for index, part in enumerate(self.parts):
+            name = slots.get(index)
+            value = None if name is None else values.get(name)
+            if value is None:
+                yield part
+            elif isinstance(value, HTMLNode):
+                yield from value.iter_html()
+            else:
+                yield escape_text(value)
+
+
+    @instrumented("template")
+    def render_to(self, fp, values, buffer_size=1024):
+        # Streams the page into anything with a write() method, buffering chunks the
+        # way HTMLNode.render_to does, and with the same output as render().
+        parts = []
+        for chunk in self.iter_html(values):
+            parts.append(chunk)
+            if len(parts) >= buffer_size:
+                fp.write("".join(parts))
+                parts.clear()
+        if parts:
+            fp.write("".join(parts))
@@ -0,0 +1,401 @@
+from enum import Enum
+from .escape import SafeString, escape_attribute, escape_text
+from .htmlnode import LeafNode
+from .metrics import instrumented
+import re
+
+class TextType(Enum):
+	TEXT = "text"
+	BOLD = "bold"
+	ITALIC = "italic"
+	CODE = "code"
+	LINK = "link"
+	IMAGE = "image"
+
+
+class TextNode:
+	__slots__ = ("text", "text_type", "url")
+
+	def __init__(self, text, text_type, url=None):
+		self.text = text
+		self.text_type = text_type
+		self.url = url
+
+
+	def __eq__(self, other):
+		return (self.text == other.text 
+		  and self.text_type == other.text_type 
+		  and self.url == other.url)
+
+
+	def __repr__(self):
+		url_part = f', "{self.url}"' if self.url is not None else ""
+		return f'TextNode("{self.text}", {self.text_type}{url_part})'
+
+
+def text_size(args, result):
+	return len(args[0])
+
+
+def nodes_text_size(args, result):
+	return sum(len(node.text) for node in args[0])
+
+
+def text_node_to_html_node(text_node):
+	# Not instrumented: it runs once per node, where even the disabled wrapper's extra
+	# call shows. text_nodes_to_html_nodes times conversions a fragment at a time.
+	if not isinstance(text_node.text_type, TextType):
+		raise Exception("No valid text type provided.")
+	else:
+		match text_node.text_type:
+			case TextType.TEXT:
+				return LeafNode(None, text_node.text)
+			case TextType.BOLD:
+				return LeafNode("b", text_node.text)
+			case TextType.ITALIC:
+				return LeafNode("i", text_node.text)
+			case TextType.CODE:
+				return LeafNode("code", text_node.text)
+			case TextType.LINK:
+				return LeafNode("a", text_node.text, {"href": text_node.url})
+			case TextType.IMAGE:
+				return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+
+
+@instrumented("to_html_node", nodes_text_size)
+def text_nodes_to_html_nodes(text_nodes):
+	return [text_node_to_html_node(node) for node in text_nodes]
+
+
+# Markup around the escaped text of each TextType, precomputed for text_nodes_to_html.
+# Links and images carry their url (and images their text) in attributes, so theirs
+# are the pieces that go around those.
+HTML_TAGS = {
+	TextType.TEXT: ("", ""),
+	TextType.BOLD: ("<b>", "</b>"),
+	TextType.ITALIC: ("<i>", "</i>"),
+	TextType.CODE: ("<code>", "</code>"),
+	TextType.LINK: ('<a href="', '">', "</a>"),
+	TextType.IMAGE: ('<img src="', '" alt="', '"></img>'),
+}
+
+
+@instrumented("nodes_to_html", nodes_text_size)
+def text_nodes_to_html(text_nodes, out=None):
+	# Same markup as joining text_node_to_html_node(node).to_html() over text_nodes,
+	# escaping included, but written straight from the HTML_TAGS table: no LeafNode or
+	# props dict per node. Returns it as a SafeString, or with out (anything with a
+	# write() method) writes it there in one go and returns None.
+	parts = []
+	append = parts.append
+	tags = HTML_TAGS
+	link = TextType.LINK
+	image = TextType.IMAGE
+	for node in text_nodes:
+		text_type = node.text_type
+		text = node.text
+		if text_type is image:
+			start, middle, end = tags[image]
+			append(f"{start}{escape_attribute(node.url)}{middle}{escape_attribute(text)}{end}")
+			continue
+		# escape_text's checks, inlined as in LeafNode.to_html.
+		if type(text) is not str:
+			if text is None:
+				raise ValueError("All leaf nodes must have a value.")
+			if not isinstance(text, SafeString):
+				text = escape_text(text)
+		elif "&" in text or "<" in text or ">" in text:
+			text = escape_text(text)
+		if text_type is link:
+			start, middle, end = tags[link]
+			append(f"{start}{escape_attribute(node.url)}{middle}{text}{end}")
+			continue
+		pair = tags.get(text_type)
+		if pair is None:
+			raise Exception("No valid text type provided.")
+		append(pair[0])
+		append(text)
+		append(pair[1])
+	html = SafeString("".join(parts))
+	if out is None:
+		return html
+	out.write(html)
+
+
+# def split_nodes_delimiter(old_nodes, delimiter, text_type):
+# # THIS IS THE OLD VERSION, KEPT FOR ARCHIVAL PURPOSES!
+# # Note: This function assumes that appropriate delimiters are used for the given text_type.
+# # It doesn't validate the semantic correctness of delimiter/text_type pairs.
+# 	if not delimiter:
+# 		raise Exception("No delimiter provided.")
+# 	if not isinstance(text_type, TextType):
+# 		raise Exception("No valid text type provided.")
+# 	new_nodes = []
+	
+# 	for node in old_nodes:
+# 		if not isinstance(node.text_type, TextType):
+# 			raise Exception("No valid text type provided.")
+# 		elif node.text_type != TextType.TEXT:
+# 			new_nodes.append(node) 
+# 		elif delimiter not in node.text:
+# 			new_nodes.append(node)
+# 		elif node.text.count(delimiter) % 2 != 0:
+# 			raise Exception("There are unclosed delimiters present. Please verify correct format.")
+# 		else:
+# 			split_node = node.text.split(delimiter)
+
+# 			for entry in split_node:
+# 				if entry[0].isspace() or entry[-1].isspace():
+# 					new_nodes.append(TextNode(entry, TextType.TEXT))
+# 				elif not entry[0].isspace() and entry[-1].isspace():
+# 					new_nodes.append(TextNode(entry, text_type))
+# 	return new_nodes
+
+
+@instrumented("split_delimiter", nodes_text_size)
+def split_nodes_delimiter(old_nodes, delimiter, text_type):
+    if not delimiter:
+        raise Exception("No delimiter provided.")
+    if not isinstance(text_type, TextType):
+        raise Exception("No valid text type provided.")
+    new_nodes = []
+    
+    for node in old_nodes:
+        if not isinstance(node.text_type, TextType):
+            raise Exception("No valid text type provided.")
+        elif node.text_type != TextType.TEXT:
+            new_nodes.append(node)
+        elif delimiter not in node.text:
+            new_nodes.append(node)
+        elif node.text.count(delimiter) % 2 != 0:
+            raise Exception("There are unclosed delimiters present. Please verify correct format.")
+        else:
+            # Only reach here if it's a TEXT node with properly paired delimiters
+            split_node = node.text.split(delimiter)
+            
+            for i, entry in enumerate(split_node):
+                # Handle empty strings that can occur from splitting
+                if not entry:
+                    continue
+                # Even indexes are normal text, odd indexes are special text (between delimiters)
+                if i % 2 == 0:
+                    new_nodes.append(TextNode(entry, TextType.TEXT))
+                else:
+                    new_nodes.append(TextNode(entry, text_type))
+                
+    return new_nodes
+
+
+def input_valid_for_extractors(findallres):
+# Malformed Markdown images or links or other formatting errors are IGNORED unless NO valid entries are present.
+	bad_res = []
+	gud_res = []
+	
+	if len(findallres) == 0:
+		raise Exception(
+			f"\n	Input was improperly formatted.\n"
+			"	Please provide correct Markdown syntax with both text and link in the correct format."
+			)
+	
+	for tup in findallres:
+		if len(tup[0]) == 0 or len(tup[1]) == 0:
+			bad_res.append(tup)
+		else:
+			gud_res.append(tup)
+
+	if len(bad_res) > 0:
+		raise Exception(
+			f"\n	Input contained the following invalid entries:\n"
+			f"	{bad_res}\n"
+			"	Please provide correct Markdown syntax with both text and link in the correct format."
+			)
+	else:
+		return gud_res
+
+
+# Compiled once at import; the splitters work off match spans so nothing has to be
+# searched for a second time.
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
+@instrumented("extract_images", text_size)
+def extract_markdown_images(text):
+	found_items = IMAGE_PATTERN.findall(text)
+	return input_valid_for_extractors(found_items)
+	
+
+@instrumented("extract_links", text_size)
+def extract_markdown_links(text):
+	found_items = LINK_PATTERN.findall(text)
+	return input_valid_for_extractors(found_items)
+
+
+class Diagnostics:
+	# Opt-in collector for malformed Markdown that the parser steps over (images or
+	# links with an empty text or url). Pass one to text_to_textnodes or the
+	# split_nodes_* functions to get a record of every skipped entry; leave it out
+	# and nothing is tracked at all.
+	def __init__(self):
+		self.entries = []
+
+
+	def report(self, source, pos, message):
+		line = source.count("\n", 0, pos) + 1
+		column = pos - source.rfind("\n", 0, pos)
+		self.entries.append({"line": line, "column": column, "message": message})
+
+
+	def __len__(self):
+		return len(self.entries)
+
+
+def _valid_matches(pattern, source, start, end, diagnostics=None):
+	# Same rule as input_valid_for_extractors: no matches, or any match with an
+	# empty text or url, means the span is left alone. Returns None in that case
+	# rather than raising, since plain text is the common case.
+	matches = list(pattern.finditer(source, start, end))
+	if not matches:
+		return None
+	valid = True
+	for m in matches:
+		if not m[1] or not m[2]:
+			if diagnostics is None:
+				return None
+			kind = "Image" if pattern is IMAGE_PATTERN else "Link"
+			missing = "text" if not m[1] else "url"
+			diagnostics.report(source, m.start(), f"{kind} {m[0]} is missing its {missing}.")
+			valid = False
+	return matches if valid else None
+
+
+def split_nodes_pattern(old_nodes, pattern, text_type, diagnostics=None):
+	# Shared by split_nodes_image and split_nodes_link: cuts each node at the spans
+	# of its matches in one pass. Diagnostics positions are relative to each node's text.
+	resultlst = []
+
+	for node in old_nodes:
+		text = node.text
+		# "](" is needed by both patterns, so plain text skips the regex entirely.
+		if "](" not in text:
+			resultlst.append(node)
+			continue
+		matches = _valid_matches(pattern, text, 0, len(text), diagnostics)
+		if matches is None:
+			resultlst.append(node)
+			continue
+
+		pos = 0
+		for m in matches:
+			if m.start() > pos:
+				resultlst.append(TextNode(text[pos:m.start()], TextType.TEXT))
+			resultlst.append(TextNode(m[1], text_type, m[2]))
+			pos = m.end()
+		if pos < len(text):
+			resultlst.append(TextNode(text[pos:], TextType.TEXT))
+	return resultlst
+
+
+@instrumented("split_images", nodes_text_size)
+def split_nodes_image(old_nodes, diagnostics=None):
+	return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE, diagnostics)
+
+
+@instrumented("split_links", nodes_text_size)
+def split_nodes_link(old_nodes, diagnostics=None):
+	return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK, diagnostics)
+
+
+# print(split_nodes_image([TextNode("This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and another " \
+# 	"![second image](https://i.imgur.com/3elNhQu.png) with some text at the end",
+#     TextType.TEXT, ), TextNode(
+# 	"This is text without a link to boot dev nor to youtube.", 
+# 	TextType.TEXT, )]))
+
+
+# Single-pass inline scanner.
+# Gives the same nodes as running split_nodes_delimiter for "**", "_" and "`",
+# then split_nodes_image and split_nodes_link, but walks the text once from
+# left to right and appends straight into one result list instead of
+# rebuilding a list of TextNodes after every stage.
+# Same precedence as the old pipeline: bold pairs are found over the whole text,
+# italic only outside bold, code only outside bold and italic, and images and
+# links are then picked out of every resulting span (whatever its type).
+INLINE_DELIMITERS = (
+	("**", TextType.BOLD),
+	("_", TextType.ITALIC),
+	("`", TextType.CODE),
+)
+
+
+@instrumented("inline", text_size)
+def text_to_textnodes(mkdntxt, diagnostics=None):
+	# The scan works on (start, end) offsets into mkdntxt and only slices out the
+	# final node texts, so diagnostics get positions in the original text.
+	nodes = []
+	_scan_delimited(mkdntxt, 0, len(mkdntxt), 0, nodes, diagnostics)
+	return nodes
+
+
+def _scan_delimited(source, start, end, level, nodes, diagnostics):
+	if level == len(INLINE_DELIMITERS):
+		_scan_images(source, start, end, TextType.TEXT, nodes, diagnostics)
+		return
+	delimiter, text_type = INLINE_DELIMITERS[level]
+	if source.find(delimiter, start, end) == -1:
+		_scan_delimited(source, start, end, level + 1, nodes, diagnostics)
+		return
+
+	size = len(delimiter)
+	pos = start
+	while True:
+		opening = source.find(delimiter, pos, end)
+		if opening == -1:
+			break
+		closing = source.find(delimiter, opening + size, end)
+		if closing == -1:
+			raise Exception("There are unclosed delimiters present. Please verify correct format.")
+		if opening > pos:
+			_scan_delimited(source, pos, opening, level + 1, nodes, diagnostics)
+		if closing > opening + size:
+			_scan_images(source, opening + size, closing, text_type, nodes, diagnostics)
+		pos = closing + size
+	if pos < end:
+		_scan_delimited(source, pos, end, level + 1, nodes, diagnostics)
+
+
+def _scan_images(source, start, end, text_type, nodes, diagnostics):
+	if source.find("](", start, end) == -1:
+		nodes.append(TextNode(source[start:end], text_type))
+		return
+	matches = _valid_matches(IMAGE_PATTERN, source, start, end, diagnostics)
+	if matches is None:
+		_scan_links(source, start, end, text_type, nodes, diagnostics)
+		return
+
+	pos = start
+	for m in matches:
+		if m.start() > pos:
+			_scan_links(source, pos, m.start(), TextType.TEXT, nodes, diagnostics)
+		nodes.append(TextNode(m[1], TextType.IMAGE, m[2]))
+		pos = m.end()
+	if pos < end:
+		_scan_links(source, pos, end, TextType.TEXT, nodes, diagnostics)
+
+
+def _scan_links(source, start, end, text_type, nodes, diagnostics):
+	matches = None
+	if source.find("](", start, end) != -1:
+		matches = _valid_matches(LINK_PATTERN, source, start, end, diagnostics)
+	if matches is None:
+		nodes.append(TextNode(source[start:end], text_type))
+		return
+
+	pos = start
+	for m in matches:
+		if m.start() > pos:
+			nodes.append(TextNode(source[pos:m.start()], TextType.TEXT))
+		nodes.append(TextNode(m[1], TextType.LINK, m[2]))
+		pos = m.end()
+	if pos < end:
+		nodes.append(TextNode(source[pos:end], TextType.TEXT))
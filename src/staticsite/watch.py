@@ -0,0 +1,289 @@
+import os
+import select
+import struct
+import sys
+import time
+
+from .build import (
+    apply_template,
+    build_site,
+    find_sources,
+    load_template,
+    output_path_for,
+    page_error,
+    page_title,
+    read_source,
+    render_content,
+    write_output,
+)
+
+
+# Seconds between rescans when falling back to polling.
+POLL_INTERVAL = 0.1
+
+# inotify(7) event bits.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Only finished writes count, not every write() an editor makes along the way.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollWatcher:
+    # Stat-based fallback: rescans the watched trees every interval and reports files
+    # whose mtime or size changed, that appeared or that went away.
+    def __init__(self, directories, files=(), interval=POLL_INTERVAL):
+        self.directories = list(directories)
+        self.files = list(files)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+
+    def scan(self):
+        snapshot = {}
+        paths = list(self.files)
+        for directory in self.directories:
+            for dirpath, _, filenames in os.walk(directory):
+                paths.extend(os.path.join(dirpath, filename) for filename in filenames)
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+
+    def wait(self, timeout=None):
+        # Returns the set of changed paths, empty if nothing changed within timeout.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self.scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    # Linux inotify through ctypes, so changes are picked up as soon as they land
+    # instead of on the next poll. Every directory under the watched trees gets a
+    # watch, directories created later included; single files are watched through
+    # their parent directory and filtered.
+    def __init__(self, directories, files=()):
+        import ctypes
+
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.get_errno = ctypes.get_errno
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.tree_dirs = set()
+        self.files = set(files)
+        try:
+            for directory in directories:
+                self.add_tree(directory)
+            for path in self.files:
+                self.add_dir(os.path.dirname(path) or ".")
+        except OSError:
+            self.close()
+            raise
+
+
+    def add_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(self.get_errno(), f"inotify_add_watch failed for {path}")
+        self.watches[wd] = path
+        return wd
+
+
+    def add_tree(self, root):
+        # Returns the files already in the tree, which a new directory may arrive with.
+        found = []
+        for dirpath, _, filenames in os.walk(root):
+            self.add_dir(dirpath)
+            self.tree_dirs.add(dirpath)
+            found.extend(os.path.join(dirpath, filename) for filename in filenames)
+        return found
+
+
+    def read_events(self):
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                directory = self.watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and directory in self.tree_dirs:
+                        changed.update(self.add_tree(path))
+                elif directory in self.tree_dirs or path in self.files:
+                    changed.add(path)
+
+
+    def wait(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        return self.read_events() if ready else set()
+
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(directories, files=(), interval=POLL_INTERVAL, poll=False):
+    # inotify where the platform has it, polling otherwise or when asked to.
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories, files)
+        except (OSError, AttributeError):
+            # No inotify in this libc, or out of watches: fall through to polling.
+            pass
+    return PollWatcher(directories, files, interval)
+
+
+class LiveSite:
+    # The in-memory side of watch mode: keeps the title and rendered body of every page
+    # it has converted, so an edit re-renders one page and a template change only
+    # re-applies the template. A page (or template) that fails to render keeps its last
+    # good output, with the error in errors until it renders again.
+    def __init__(self, content_dir, output_dir, template_path=None):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.template_path = template_path
+        self.pages = {}
+        self.errors = {}
+        self.template, deps = load_template(template_path)
+        self.template_files = set(deps)
+
+
+    def reload_template(self):
+        # Returns "templated", or "failed" with the message kept in errors and the last
+        # good template still in use. A file the template named but that isn't there
+        # yet is watched as well, so saving it retries the load.
+        try:
+            self.template, deps = load_template(self.template_path)
+        except Exception as error:
+            self.errors[self.template_path] = page_error(error)
+            if getattr(error, "filename", None):
+                self.template_files = self.template_files | {error.filename}
+            return "failed"
+        self.errors.pop(self.template_path, None)
+        self.template_files = set(deps)
+        return "templated"
+
+
+    def output_path(self, source):
+        return output_path_for(source, self.content_dir, self.output_dir)
+
+
+    def render(self, source):
+        # Returns "rendered", or "failed" with the message kept in errors.
+        try:
+            title, content = render_content(read_source(source), page_title(source))
+            write_output(self.output_path(source), apply_template(self.template, title, content))
+        except Exception as error:
+            self.errors[source] = page_error(error)
+            return "failed"
+        self.errors.pop(source, None)
+        self.pages[source] = (title, content)
+        return "rendered"
+
+
+    def remove(self, source):
+        self.pages.pop(source, None)
+        self.errors.pop(source, None)
+        try:
+            os.remove(self.output_path(source))
+        except FileNotFoundError:
+            pass
+
+
+    def handle(self, changed):
+        # Brings the output in line with the changed paths. Returns (path, action,
+        # latency) per page touched, latency being seconds from the source's last
+        # modification to its output being written (or, for removals, from the call).
+        # A page that fails to render is reported as "failed" and the rest carry on; so
+        # is a template that fails to load, leaving every page on the last good one.
+        start = time.time()
+        results = []
+        template_files = self.template_files
+        if changed & template_files and self.reload_template() == "failed":
+            results.append((self.template_path, "failed", time.time() - start))
+        elif changed & template_files:
+            # Every page needs the new template: cached pages only re-apply it, the
+            # rest are converted once and cached from then on.
+            for source, _ in find_sources(self.content_dir, self.output_dir):
+                if source in self.pages:
+                    title, content = self.pages[source]
+                    write_output(self.output_path(source), apply_template(self.template, title, content))
+                    results.append((source, "templated", time.time() - start))
+                else:
+                    results.append((source, self.render(source), time.time() - start))
+
+        for path in sorted(changed):
+            if not path.endswith(".md") or path in template_files:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns / 1e9
+            except FileNotFoundError:
+                self.remove(path)
+                results.append((path, "removed", time.time() - start))
+                continue
+            results.append((path, self.render(path), time.time() - mtime))
+        return results
+
+
+def watch(content_dir, output_dir, template_path=None, manifest_path=None, interval=POLL_INTERVAL,
+          poll=False, report=print, stop=None):
+    # Runs until interrupted, or until stop (a threading.Event) is set: an incremental
+    # build first, then every change under content_dir or to the template and its
+    # includes is re-rendered as it lands, with its latency passed to report.
+    # A last incremental build on the way out brings the build manifest up to date.
+    # Pages that fail to render are reported and watched like the rest.
+    for source, message in build_site(content_dir, output_dir, template_path, manifest_path)["errors"]:
+        report(f"failed {os.path.relpath(source, content_dir)}: {message}")
+    site = LiveSite(content_dir, output_dir, template_path)
+    watcher = open_watcher([content_dir], site.template_files, interval, poll)
+    report(f"watching {content_dir} ({type(watcher).__name__})")
+    try:
+        while stop is None or not stop.is_set():
+            changed = watcher.wait(timeout=0.5)
+            template_files = site.template_files
+            for path, action, latency in site.handle(changed):
+                if action == "failed":
+                    report(f"failed {os.path.relpath(path, content_dir)}: {site.errors[path]}")
+                else:
+                    report(f"{action} {os.path.relpath(path, content_dir)} in {latency * 1000:.1f} ms")
+            if site.template_files != template_files:
+                # Includes may have come or gone with the new template.
+                watcher.close()
+                watcher = open_watcher([content_dir], site.template_files, interval, poll)
+    finally:
+        watcher.close()
+        build_site(content_dir, output_dir, template_path, manifest_path)
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fixtures import write_file
+from staticsite.astcache import (
+    FORMAT_VERSION, HEADER, ASTCache, dump_textnodes, dump_tree, load_textnodes, load_tree,
+)
+from staticsite.blocknode import PARSER_VERSION, markdown_to_html_node
+from staticsite.build import build_site, render_content
+from staticsite.escape import SafeString
+from staticsite.htmlnode import LeafNode, ParentNode
+from staticsite.textnode import text_to_textnodes
+
+
+MARKDOWN = (
+    "# Title\n\n"
+    "Some **bold**, _italic_ and `code` with a [link](https://boot.dev) and ![img](/i.png).\n\n"
+    "> a quote\n\n"
+    "- one\n- two\n\n"
+    "```\nx < y\n```"
+)
+
+
+class TestTextNodes(unittest.TestCase):
+    def test_roundtrip(self):
+        text_nodes = text_to_textnodes("Some **bold** with a [link](https://boot.dev) and ![é](/i.png)")
+        self.assertEqual(load_textnodes(dump_textnodes(text_nodes)), text_nodes)
+
+
+    def test_empty(self):
+        self.assertEqual(load_textnodes(dump_textnodes([])), [])
+
+
+class TestTree(unittest.TestCase):
+    def test_roundtrip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        self.assertEqual(load_tree(dump_tree(node)).to_html(), node.to_html())
+
+
+    def test_props(self):
+        node = ParentNode("div", [LeafNode(None, "text"),
+                                  LeafNode("a", "x", {"href": "/", "class": ""})], {})
+        self.assertEqual(load_tree(dump_tree(node)).to_html(), node.to_html())
+
+
+    def test_safe_string_kept(self):
+        node = ParentNode("p", [LeafNode(None, SafeString("&amp;")), LeafNode(None, "&")])
+        loaded = load_tree(dump_tree(node))
+        self.assertIsInstance(loaded.children[0].value, SafeString)
+        self.assertNotIsInstance(loaded.children[1].value, SafeString)
+        self.assertEqual(loaded.to_html(), "<p>&amp;&amp;</p>")
+
+
+    def test_deep_tree(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("i", [node])
+        self.assertEqual(load_tree(dump_tree(node)).to_html(), node.to_html())
+
+
+    def test_wide_values_use_wider_records(self):
+        node = ParentNode("div", [LeafNode(None, str(n)) for n in range(40_000)])
+        self.assertEqual(load_tree(dump_tree(node)).to_html(), node.to_html())
+
+
+class TestRejected(unittest.TestCase):
+    def setUp(self):
+        self.data = dump_tree(markdown_to_html_node(MARKDOWN))
+
+
+    def test_truncated(self):
+        for size in (0, HEADER.size - 1, len(self.data) - 1):
+            with self.assertRaises(ValueError):
+                load_tree(self.data[:size])
+
+
+    def test_other_version(self):
+        data = bytearray(self.data)
+        data[4:6] = (FORMAT_VERSION + 1).to_bytes(2, "little")
+        with self.assertRaises(ValueError):
+            load_tree(bytes(data))
+
+
+    def test_other_parser_version(self):
+        data = bytearray(self.data)
+        data[6:8] = (PARSER_VERSION + 1).to_bytes(2, "little")
+        with self.assertRaises(ValueError):
+            load_tree(bytes(data))
+
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            load_tree(b"XXXX" + self.data[4:])
+
+
+    def test_wrong_kind(self):
+        with self.assertRaises(ValueError):
+            load_textnodes(self.data)
+
+
+class TestASTCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ASTCache(os.path.join(self.tmp.name, "ast"))
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get(MARKDOWN))
+        node = markdown_to_html_node(MARKDOWN)
+        self.cache.put(MARKDOWN, node)
+        self.assertEqual(self.cache.get(MARKDOWN).to_html(), node.to_html())
+        self.assertIsNone(self.cache.get(MARKDOWN + "\n\nmore"))
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 2})
+
+
+    def test_stale_entry_is_a_miss(self):
+        path = self.cache.path(MARKDOWN)
+        write_file(path, "old")
+        self.assertIsNone(self.cache.get(MARKDOWN))
+        self.cache.put(MARKDOWN, markdown_to_html_node(MARKDOWN))
+        self.assertIsNotNone(self.cache.get(MARKDOWN))
+
+
+    def test_has(self):
+        self.assertFalse(self.cache.has(MARKDOWN))
+        self.cache.put(MARKDOWN, markdown_to_html_node(MARKDOWN))
+        self.assertTrue(self.cache.has(MARKDOWN))
+        with open(self.cache.path(MARKDOWN), "r+b") as fp:
+            fp.seek(6)
+            fp.write((PARSER_VERSION + 1).to_bytes(2, "little"))
+        self.assertFalse(self.cache.has(MARKDOWN))
+        self.assertIsNone(self.cache.get(MARKDOWN))
+
+
+    def test_collector_stores_once(self):
+        render_content(MARKDOWN, "x", collect=lambda text_nodes: None, ast_cache=self.cache)
+        self.assertTrue(self.cache.has(MARKDOWN))
+        with mock.patch.object(self.cache, "put") as put:
+            render_content(MARKDOWN, "x", collect=lambda text_nodes: None, ast_cache=self.cache)
+        put.assert_not_called()
+
+
+    def test_build_after_template_change(self):
+        content = os.path.join(self.tmp.name, "content")
+        output = os.path.join(self.tmp.name, "public")
+        template = os.path.join(self.tmp.name, "template.html")
+        ast_dir = os.path.join(self.tmp.name, "ast")
+        write_file(os.path.join(content, "index.md"), MARKDOWN)
+        write_file(os.path.join(content, "blog", "post.md"), "A [link](https://boot.dev).")
+        write_file(template, "<title>{{ Title }}</title>{{ Content }}")
+        stats = build_site(content, output, template, ast_cache_dir=ast_dir)
+        self.assertEqual(stats["workers"][0]["ast_cache"], {"hits": 0, "misses": 2})
+
+        write_file(template, "<main>{{ Content }}</main>")
+        stats = build_site(content, output, template, ast_cache_dir=ast_dir)
+        self.assertEqual(stats["workers"][0]["ast_cache"], {"hits": 2, "misses": 0})
+        with open(os.path.join(output, "index.html")) as fp:
+            self.assertEqual(fp.read(), f"<main>{markdown_to_html_node(MARKDOWN).to_html()}</main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fixtures import write_file
+from staticsite import asyncbuild
+from staticsite.asyncbuild import run_pipeline
+from staticsite.build import MANIFEST_NAME, build_site
+from staticsite.metrics import Metrics
+
+
+def read_tree(root):
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename != MANIFEST_NAME:
+                path = os.path.join(dirpath, filename)
+                with open(path) as fp:
+                    files[os.path.relpath(path, root)] = fp.read()
+    return files
+
+
+class TestAsyncBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome _home_.")
+        for n in range(30):
+            write_file(os.path.join(self.content, f"section{n % 3}", f"page{n}.md"),
+                       f"Page **{n}** with a [link](https://boot.dev/{n}).\n\n" + "text " * 50 * n)
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def output(self, name):
+        return os.path.join(self.tmp.name, name)
+
+
+    def test_matches_batch_build(self):
+        build_site(self.content, self.output("batch"))
+        stats = build_site(self.content, self.output("async"), pipeline="async")
+        self.assertEqual(stats["built"], 31)
+        self.assertEqual(stats["workers"][0]["pages"], 31)
+        self.assertEqual(read_tree(self.output("async")), read_tree(self.output("batch")))
+
+
+    def test_worker_processes_match_batch_build(self):
+        build_site(self.content, self.output("batch"))
+        metrics = Metrics()
+        stats = build_site(self.content, self.output("async"), jobs=2, metrics=metrics, pipeline="async")
+        self.assertEqual(stats["built"], 31)
+        self.assertEqual(read_tree(self.output("async")), read_tree(self.output("batch")))
+        stages = metrics.to_dict()
+        self.assertEqual(stages["read"]["calls"], 31)
+        self.assertEqual(stages["write"]["calls"], 31)
+        self.assertEqual(stages["serialize"]["calls"], 31)
+
+
+    def test_incremental(self):
+        build_site(self.content, self.output("async"), pipeline="async")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nChanged.")
+        stats = build_site(self.content, self.output("async"), pipeline="async")
+        self.assertEqual((stats["built"], stats["skipped"]), (1, 30))
+
+
+    def test_counts_unchanged_writes(self):
+        build_site(self.content, self.output("async"), pipeline="async")
+        os.remove(os.path.join(self.output("async"), MANIFEST_NAME))
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nChanged.")
+        stats = build_site(self.content, self.output("async"), jobs=2, pipeline="async")
+        self.assertEqual((stats["built"], stats["written"], stats["unchanged"]), (31, 1, 30))
+
+
+    def test_unknown_pipeline(self):
+        with self.assertRaises(ValueError):
+            build_site(self.content, self.output("x"), pipeline="threads")
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_bounded_queues(self):
+        # With a slow converter, readers may only get as far as the queues let them.
+        reads = []
+        ahead = []
+        written = []
+
+        def read_source(source):
+            reads.append(source)
+            return source
+
+        async def convert(pages):
+            await asyncio.sleep(0.001)
+            ahead.append(len(reads) - int(pages[-1][1]))
+            return [(output_path, markdown) for output_path, markdown, _ in pages]
+
+        stale = [(str(n), f"{n}.html") for n in range(200)]
+        with mock.patch.object(asyncbuild, "read_source", read_source), \
+             mock.patch.object(asyncbuild, "write_output", lambda path, html: written.append(path)):
+            asyncio.run(run_pipeline(stale, convert, converters=1, io_threads=2, queue_size=4, chunk_size=5))
+        self.assertEqual(len(reads), 200)
+        self.assertEqual(sorted(written), sorted(output_path for _, output_path in stale))
+        # Queued chunks, one chunk per reader blocked on put, and the chunk being converted.
+        self.assertLessEqual(max(ahead), (4 + 2 + 1) * 5)
+
+
+    def test_error_propagates(self):
+        async def convert(pages):
+            raise ValueError("bad page")
+
+        stale = [(str(n), f"{n}.html") for n in range(10)]
+        with mock.patch.object(asyncbuild, "read_source", lambda source: source), \
+             mock.patch.object(asyncbuild, "write_output", lambda path, html: None):
+            with self.assertRaises(ExceptionGroup) as raised:
+                asyncio.run(run_pipeline(stale, convert))
+        self.assertIsInstance(raised.exception.exceptions[0], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
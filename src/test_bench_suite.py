@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from bench_suite import compare, count_nodes, main, make_inline_document, make_tree
+from staticsite.textnode import TextType, text_to_textnodes
+
+
+def result(throughput, peak_memory):
+    return {"throughput": throughput, "unit": "MB/s", "seconds": 1.0, "peak_memory": peak_memory}
+
+
+class TestCorpus(unittest.TestCase):
+    def test_inline_document_is_deterministic(self):
+        self.assertEqual(make_inline_document(2000), make_inline_document(2000))
+        self.assertNotEqual(make_inline_document(2000, seed=1), make_inline_document(2000, seed=2))
+
+
+    def test_inline_document_density(self):
+        plain = text_to_textnodes(make_inline_document(5000, 0, 0))
+        self.assertEqual(len(plain), 1)
+        linked = text_to_textnodes(make_inline_document(5000, 0.5, 0))
+        kinds = {node.text_type for node in linked}
+        self.assertEqual(kinds, {TextType.TEXT, TextType.LINK, TextType.IMAGE})
+
+
+    def test_tree_shape(self):
+        tree = make_tree(100, 3)
+        # root + 10 groups of (3 spans + 1 p + 10 leaves)
+        self.assertEqual(count_nodes(tree), 1 + 10 * 14)
+
+
+class TestCompare(unittest.TestCase):
+    def test_within_threshold(self):
+        baseline = {"case": result(100, 1000)}
+        self.assertEqual(compare({"case": result(85, 1150)}, baseline, 0.2), [])
+
+
+    def test_slower(self):
+        baseline = {"case": result(100, 1000)}
+        regressions = compare({"case": result(70, 1000)}, baseline, 0.2)
+        self.assertEqual([name for name, _ in regressions], ["case"])
+        self.assertIn("throughput down 30%", regressions[0][1])
+
+
+    def test_more_memory(self):
+        baseline = {"case": result(100, 1000)}
+        regressions = compare({"case": result(100, 1500)}, baseline, 0.2)
+        self.assertIn("peak memory up 50%", regressions[0][1])
+
+
+    def test_new_case_is_not_a_regression(self):
+        self.assertEqual(compare({"new": result(1, 1)}, {}, 0.2), [])
+
+
+class TestGate(unittest.TestCase):
+    CASE = ["to_html/depth-1000", "--repeat", "1"]
+
+    def run_main(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return main(self.CASE + list(args))
+
+
+    def test_missing_baseline_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            self.assertEqual(self.run_main("--baseline", path), 2)
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(self.run_main("--baseline", path, "--update"), 0)
+            self.assertEqual(self.run_main("--baseline", path, "--threshold", "100"), 0)
+
+
+    def test_no_baseline_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                self.assertEqual(self.run_main(), 0)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import unittest
+
+from staticsite.blocknode import BlockType, iter_blocks, markdown_to_html_node, markdown_to_html_file
+from staticsite.inlinecache import InlineCache
+
+
+class TestIterBlocks(unittest.TestCase):
+    def test_paragraphs(self):
+        blocks = list(iter_blocks(["First line\n", "second line\n", "\n", "\n", "Another\n"]))
+        self.assertEqual(blocks, [
+            (BlockType.PARAGRAPH, ["First line", "second line"]),
+            (BlockType.PARAGRAPH, ["Another"]),
+        ])
+
+
+    def test_headings_are_single_lines(self):
+        blocks = list(iter_blocks(["# One", "## Two", "Text", "####### Not a heading"]))
+        self.assertEqual(blocks, [
+            (BlockType.HEADING, ["# One"]),
+            (BlockType.HEADING, ["## Two"]),
+            (BlockType.PARAGRAPH, ["Text", "####### Not a heading"]),
+        ])
+
+
+    def test_code_fence_keeps_blank_lines(self):
+        blocks = list(iter_blocks(["Before", "```", "x = 1", "", "- not a list", "```", "After"]))
+        self.assertEqual(blocks, [
+            (BlockType.PARAGRAPH, ["Before"]),
+            (BlockType.CODE, ["x = 1", "", "- not a list"]),
+            (BlockType.PARAGRAPH, ["After"]),
+        ])
+
+
+    def test_unclosed_code_fence(self):
+        self.assertEqual(list(iter_blocks(["```", "code"])), [(BlockType.CODE, ["code"])])
+
+
+    def test_lists_and_quotes(self):
+        blocks = list(iter_blocks(["- a", "* b", "1. one", "2. two", "> quoted", ">more", "text"]))
+        self.assertEqual(blocks, [
+            (BlockType.UNORDERED_LIST, ["- a", "* b"]),
+            (BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+            (BlockType.QUOTE, ["> quoted", ">more"]),
+            (BlockType.PARAGRAPH, ["text"]),
+        ])
+
+
+    def test_blocks_are_yielded_lazily(self):
+        # The first block must come out before the rest of the input is read.
+        def lines():
+            yield "# Title\n"
+            yield "\n"
+            raise AssertionError("read too far")
+
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), (BlockType.HEADING, ["# Title"]))
+
+
+class TestMarkdownToHTML(unittest.TestCase):
+    def test_paragraphs_and_headings(self):
+        node = markdown_to_html_node("# Title\n\nSome **bold** text\nstill the same paragraph\n\n\n## Sub")
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>Title</h1><p>Some <b>bold</b> text\nstill the same paragraph</p><h2>Sub</h2></div>",
+        )
+
+
+    def test_code(self):
+        node = markdown_to_html_node("```\nThis is _not_ parsed\n```")
+        self.assertEqual(node.to_html(), "<div><pre><code>This is _not_ parsed\n</code></pre></div>")
+
+
+    def test_lists(self):
+        node = markdown_to_html_node("- a `code` item\n- [link](https://boot.dev)\n\n1. first\n2. second")
+        self.assertEqual(
+            node.to_html(),
+            '<div><ul><li>a <code>code</code> item</li><li><a href="https://boot.dev">link</a></li></ul>'
+            "<ol><li>first</li><li>second</li></ol></div>",
+        )
+
+
+    def test_quote(self):
+        node = markdown_to_html_node("> A _quote_\n> over two lines")
+        self.assertEqual(node.to_html(), "<div><blockquote>A <i>quote</i>\nover two lines</blockquote></div>")
+
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html_node("\n\n").to_html(), "<div></div>")
+
+
+    def test_delimiters_only(self):
+        markdown = "****\n\n# __\n\n- ``\n- b"
+        expected = "<div><p></p><h1></h1><ul><li></li><li>b</li></ul></div>"
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(markdown, InlineCache()).to_html(), expected)
+
+
+    def test_file_matches_string(self):
+        markdown = "# Title\n\n- one\n- two\n\n```\ncode\n```\n\n> quote\n\nThe **end**.\n"
+        fp_out = io.StringIO()
+        markdown_to_html_file(io.StringIO(markdown), fp_out)
+        self.assertEqual(fp_out.getvalue(), markdown_to_html_node(markdown).to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fixtures import bump_mtime, read_file, write_file
+from staticsite.build import MANIFEST_NAME, build_site, extract_title, make_batches
+
+
+def counts(stats):
+    return {key: stats[key] for key in ("built", "skipped", "removed")}
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("Intro\n# Hello there \nmore"), "Hello there")
+
+
+    def test_extract_title_missing(self):
+        self.assertEqual(extract_title("## Not a title"), None)
+
+
+class TestBuildSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome _home_.")
+        write_file(os.path.join(self.content, "blog", "post.md"), "A [link](https://boot.dev).")
+        write_file(self.template, "<title>{{ Title }}</title>{{ include nav.html }}{{ Content }}")
+        write_file(os.path.join(self.tmp.name, "nav.html"), "<nav>nav</nav>")
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def build(self):
+        return build_site(self.content, self.output, self.template)
+
+
+    def test_first_build(self):
+        self.assertEqual(counts(self.build()), {"built": 2, "skipped": 0, "removed": 0})
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            "<title>Home</title><nav>nav</nav><div><h1>Home</h1><p>Welcome <i>home</i>.</p></div>",
+        )
+        self.assertEqual(
+            read_file(os.path.join(self.output, "blog", "post.html")),
+            '<title>post</title><nav>nav</nav><div><p>A <a href="https://boot.dev">link</a>.</p></div>',
+        )
+
+
+    def test_noop_rebuild(self):
+        self.build()
+        self.assertEqual(counts(self.build()), {"built": 0, "skipped": 2, "removed": 0})
+
+
+    def test_changed_source(self):
+        self.build()
+        source = os.path.join(self.content, "index.md")
+        write_file(source, "# Home\n\nChanged.")
+        bump_mtime(source)
+        self.assertEqual(counts(self.build()), {"built": 1, "skipped": 1, "removed": 0})
+        self.assertIn("Changed.", read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_touched_but_same_content(self):
+        self.build()
+        bump_mtime(os.path.join(self.content, "index.md"))
+        self.assertEqual(counts(self.build()), {"built": 0, "skipped": 2, "removed": 0})
+
+
+    def test_changed_include(self):
+        self.build()
+        include = os.path.join(self.tmp.name, "nav.html")
+        write_file(include, "<nav>new nav</nav>")
+        bump_mtime(include)
+        self.assertEqual(counts(self.build()), {"built": 2, "skipped": 0, "removed": 0})
+        self.assertIn("new nav", read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_different_template(self):
+        self.build()
+        other = os.path.join(self.tmp.name, "other.html")
+        write_file(other, "{{ Content }}")
+        stats = build_site(self.content, self.output, other)
+        self.assertEqual(counts(stats), {"built": 2, "skipped": 0, "removed": 0})
+
+
+    def test_missing_output(self):
+        self.build()
+        os.remove(os.path.join(self.output, "index.html"))
+        self.assertEqual(counts(self.build()), {"built": 1, "skipped": 1, "removed": 0})
+
+
+    def test_removed_source(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(counts(self.build()), {"built": 0, "skipped": 1, "removed": 1})
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog", "post.html")))
+
+
+    def test_stale_manifest_version(self):
+        self.build()
+        manifest_path = os.path.join(self.output, MANIFEST_NAME)
+        with open(manifest_path) as fp:
+            data = json.load(fp)
+        data["version"] = -1
+        with open(manifest_path, "w") as fp:
+            json.dump(data, fp)
+        self.assertEqual(counts(self.build()), {"built": 2, "skipped": 0, "removed": 0})
+
+
+    def test_corrupt_manifest(self):
+        self.build()
+        write_file(os.path.join(self.output, MANIFEST_NAME), "{not json")
+        self.assertEqual(counts(self.build()), {"built": 2, "skipped": 0, "removed": 0})
+
+
+    def test_rebuild_to_same_html_leaves_files_alone(self):
+        self.build()
+        index = os.path.join(self.output, "index.html")
+        before = os.stat(index)
+        os.remove(os.path.join(self.output, MANIFEST_NAME))
+        stats = self.build()
+        self.assertEqual((stats["built"], stats["written"], stats["unchanged"]), (2, 0, 2))
+        after = os.stat(index)
+        self.assertEqual((after.st_ino, after.st_mtime_ns), (before.st_ino, before.st_mtime_ns))
+
+
+    def test_written_and_unchanged_counts(self):
+        self.build()
+        source = os.path.join(self.content, "index.md")
+        write_file(source, "# Home\n\nWelcome _home_.\n")
+        bump_mtime(source)
+        write_file(os.path.join(self.output, "blog", "post.html"), "edited by hand")
+        os.remove(os.path.join(self.output, MANIFEST_NAME))
+        stats = self.build()
+        self.assertEqual((stats["written"], stats["unchanged"]), (1, 1))
+        self.assertIn("boot.dev", read_file(os.path.join(self.output, "blog", "post.html")))
+        self.assertEqual(sorted(os.listdir(self.output)), [MANIFEST_NAME, "blog", "index.html"])
+
+
+    def test_parallel_build_matches_serial(self):
+        for n in range(20):
+            write_file(os.path.join(self.content, "many", f"page{n}.md"), f"# Page {n}\n\n" + "text " * 3000 * (n % 4 + 1))
+        serial_output = os.path.join(self.tmp.name, "serial")
+        build_site(self.content, serial_output, self.template)
+        stats = build_site(self.content, self.output, self.template, jobs=2)
+        self.assertEqual(stats["built"], 22)
+        self.assertEqual(sum(worker["pages"] for worker in stats["workers"]), 22)
+        self.assertTrue(all(worker["pid"] != os.getpid() for worker in stats["workers"]))
+        for dirpath, _, filenames in os.walk(serial_output):
+            for filename in filenames:
+                if filename == MANIFEST_NAME:
+                    continue
+                serial_path = os.path.join(dirpath, filename)
+                parallel_path = os.path.join(self.output, os.path.relpath(serial_path, serial_output))
+                self.assertEqual(read_file(parallel_path), read_file(serial_path))
+
+
+    def test_inline_cache(self):
+        stats = build_site(self.content, self.output, self.template, inline_cache_size=16)
+        self.assertEqual(stats["workers"][0]["inline_cache"]["misses"], 3)
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            "<title>Home</title><nav>nav</nav><div><h1>Home</h1><p>Welcome <i>home</i>.</p></div>",
+        )
+
+
+    def test_failing_page_is_reported_and_skipped(self):
+        self.build()
+        index = os.path.join(self.content, "index.md")
+        write_file(index, "# Home\n\nA half typed _emph")
+        write_file(os.path.join(self.content, "new.md"), "A my_var here.")
+        write_file(os.path.join(self.content, "ok.md"), "Fine.")
+        for run, (jobs, pipeline) in enumerate(((1, "batch"), (2, "batch"), (1, "async"), (2, "async"))):
+            stats = build_site(self.content, self.output, self.template, jobs=jobs, pipeline=pipeline)
+            self.assertEqual([source for source, _ in stats["errors"]],
+                             [index, os.path.join(self.content, "new.md")])
+            self.assertIn("unclosed delimiters", stats["errors"][0][1])
+            self.assertEqual(stats["built"], 0 if run else 1)
+        # The last good output stays, and the failing pages are retried next build.
+        self.assertIn("Welcome <i>home</i>", read_file(os.path.join(self.output, "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "new.html")))
+        with open(os.path.join(self.output, MANIFEST_NAME)) as fp:
+            self.assertIn(os.path.join(self.content, "ok.md"), json.load(fp)["pages"])
+        write_file(index, "# Home\n\nFixed _emph_.")
+        write_file(os.path.join(self.content, "new.md"), "A fixed var here.")
+        stats = self.build()
+        self.assertEqual((stats["built"], stats["errors"]), (2, []))
+
+
+    def test_undecodable_page_is_reported(self):
+        bad = os.path.join(self.content, "bad.md")
+        with open(bad, "wb") as fp:
+            fp.write(b"# Bad \xff\n")
+        for jobs, pipeline in ((1, "batch"), (2, "batch"), (1, "async"), (2, "async")):
+            stats = build_site(self.content, self.output, self.template, jobs=jobs, pipeline=pipeline)
+            self.assertEqual([source for source, _ in stats["errors"]], [bad])
+            self.assertIn("can't decode", stats["errors"][0][1])
+            self.assertTrue(os.path.exists(os.path.join(self.output, MANIFEST_NAME)))
+
+
+    def test_sources_are_read_as_utf8(self):
+        write_file(os.path.join(self.content, "index.md"), "# Caf\u00e9\n\nNa\u00efve.")
+        self.build()
+        self.assertIn("<h1>Caf\u00e9</h1><p>Na\u00efve.</p>", read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_title_is_escaped(self):
+        write_file(os.path.join(self.content, "index.md"), "# Fish & <Chips>\n\nText.")
+        self.build()
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            "<title>Fish &amp; &lt;Chips&gt;</title><nav>nav</nav>"
+            "<div><h1>Fish &amp; &lt;Chips&gt;</h1><p>Text.</p></div>",
+        )
+
+
+    def test_make_batches(self):
+        stale = [("a", "a.html"), ("b", "b.html"), ("c", "c.html"), ("d", "d.html")]
+        sizes = {"a": 10, "b": 500, "c": 20, "d": 30}
+        self.assertEqual(make_batches(stale, sizes, batch_bytes=50), [
+            [("b", "b.html")],
+            [("d", "d.html"), ("c", "c.html")],
+            [("a", "a.html")],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import staticsite
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(*args, stdin=None, check=True):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    return subprocess.run([sys.executable, *args], input=stdin, capture_output=True, text=True,
+                          env=env, check=check)
+
+
+class TestPackage(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        # Importing the package prints nothing and loads none of the submodules.
+        out = run_python("-c", "import sys, staticsite; "
+                               "print(sorted(m for m in sys.modules if m.startswith('staticsite')))")
+        self.assertEqual(out.stdout, "['staticsite']\n")
+        self.assertEqual(out.stderr, "")
+
+
+    def test_lazy_exports(self):
+        from staticsite.textnode import TextNode
+        self.assertIs(staticsite.TextNode, TextNode)
+        self.assertIn("build_site", dir(staticsite))
+        with self.assertRaises(AttributeError):
+            staticsite.no_such_name
+
+
+class TestCLI(unittest.TestCase):
+    def test_convert_stdin(self):
+        out = run_python("-m", "staticsite", "--convert", "-", stdin="# Hi\n\nSome **bold** & more\n")
+        self.assertEqual(out.stdout, "<div><h1>Hi</h1><p>Some <b>bold</b> &amp; more</p></div>\n")
+
+
+    def test_convert_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as fp:
+                fp.write("# Hi\n\n- one\n- two\n")
+            out = run_python("-m", "staticsite", "--convert", path)
+        self.assertEqual(out.stdout, "<div><h1>Hi</h1><ul><li>one</li><li>two</li></ul></div>\n")
+
+
+    def test_convert_file_with_cr_line_ends(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", newline="") as fp:
+                fp.write("# Title\r\rSome text\r- a\r- b\r")
+            out = run_python("-m", "staticsite", "--convert", path)
+        self.assertEqual(out.stdout, "<div><h1>Title</h1><p>Some text</p><ul><li>a</li><li>b</li></ul></div>\n")
+
+
+    def test_convert_does_not_import_builder(self):
+        out = run_python("-c", "import sys; from staticsite.cli import main; main(['--convert', '-']); "
+                               "print('staticsite.build' in sys.modules, file=sys.stderr)", stdin="text")
+        self.assertEqual(out.stderr, "False\n")
+
+
+    def test_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as fp:
+                fp.write("# Home\n")
+            out = run_python("-m", "staticsite", content, os.path.join(tmp, "public"))
+            self.assertEqual(out.stdout, "built 1 (1 written, 0 unchanged), skipped 0, removed 0\n")
+            self.assertTrue(os.path.exists(os.path.join(tmp, "public", "index.html")))
+
+
+
+    def test_build_reports_failing_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as fp:
+                fp.write("A my_var here.\n")
+            out = run_python("-m", "staticsite", content, os.path.join(tmp, "public"), check=False)
+            self.assertEqual(out.returncode, 1)
+            self.assertIn(f"error: {os.path.join(content, 'index.md')}: There are unclosed delimiters",
+                          out.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
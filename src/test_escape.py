@@ -0,0 +1,44 @@
+import html
+import random
+import unittest
+
+from staticsite.escape import SafeString, escape_attribute, escape_text
+
+
+class TestEscape(unittest.TestCase):
+    def test_plain_text_is_returned_as_is(self):
+        text = "Nothing special here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute("""x?a=1&b="2"&c='3'<>"""),
+                         "x?a=1&amp;b=&quot;2&quot;&amp;c=&#x27;3&#x27;&lt;&gt;")
+
+
+    def test_matches_html_escape(self):
+        rng = random.Random(15)
+        for _ in range(1000):
+            text = "".join(rng.choice("ab &<>\"'") for _ in range(rng.randint(0, 10)))
+            self.assertEqual(escape_attribute(text), html.escape(text), repr(text))
+            self.assertEqual(escape_text(text), html.escape(text, quote=False), repr(text))
+
+
+    def test_safe_string_bypasses(self):
+        markup = SafeString("<b>&amp;</b>")
+        self.assertIs(escape_text(markup), markup)
+        self.assertIs(escape_attribute(markup), markup)
+
+
+    def test_non_strings(self):
+        self.assertEqual(escape_text(5), "5")
+        self.assertEqual(escape_attribute(1.5), "1.5")
+
+
+if __name__ == "__main__":
+    unittest.main()
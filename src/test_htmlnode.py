@@ -1,6 +1,9 @@
+import io
+import pickle
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from staticsite.escape import SafeString
+from staticsite.htmlnode import HTMLNode, LeafNode, ParentNode, walk, ENTER, LEAVE
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_1(self):
@@ -42,6 +45,17 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.to_html(), '<a href="https://www.google.com">Click me!</a>')
 
 
+    def test_leaf_escapes_value_and_props(self):
+        node = LeafNode("a", "Fish & <chips>", {"href": 'https://boot.dev/?a=1&b="2"'})
+        self.assertEqual(node.to_html(),
+                         '<a href="https://boot.dev/?a=1&amp;b=&quot;2&quot;">Fish &amp; &lt;chips&gt;</a>')
+
+
+    def test_leaf_safe_string_is_not_escaped(self):
+        node = ParentNode("p", [LeafNode(None, SafeString("<b>bold</b> &amp;")), LeafNode(None, "1 < 2")])
+        self.assertEqual(node.to_html(), "<p><b>bold</b> &amp;1 &lt; 2</p>")
+
+
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
         parent_node = ParentNode("div", [child_node])
@@ -105,5 +119,186 @@ class TestHTMLNode(unittest.TestCase):
         )    
 
 
+    def test_base_node_iter_html(self):
+        node = HTMLNode("p", "text")
+        with self.assertRaises(NotImplementedError):
+            node.to_html()
+
+
+    def test_iter_html_chunks(self):
+        parent_node = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " plain")],
+                                 {"class": "wrap"})
+        self.assertEqual(list(parent_node.iter_html()),
+                         ['<div class="wrap">', "<b>bold</b>", " plain", "</div>"])
+
+
+    def test_iter_html_matches_to_html(self):
+        grandchild_node = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
+        child_node = ParentNode("span", [grandchild_node, LeafNode(None, "text")])
+        parent_node = ParentNode("div", [child_node, LeafNode("i", "more")])
+        self.assertEqual("".join(parent_node.iter_html()), parent_node.to_html())
+
+
+    def test_render_to(self):
+        children = [LeafNode("li", f"item {i}") for i in range(10)]
+        parent_node = ParentNode("ul", children)
+        fp = io.StringIO()
+        parent_node.render_to(fp, buffer_size=3)
+        self.assertEqual(fp.getvalue(), parent_node.to_html())
+
+
+    def test_render_to_invalid_child(self):
+        parent_node = ParentNode("div", [LeafNode("b", "fine"), ParentNode("span", [])])
+        with self.assertRaises(ValueError):
+            parent_node.render_to(io.StringIO())
+
+
+    def test_to_html_deep_tree(self):
+        node = LeafNode("b", "deep")
+        for _ in range(10_000):
+            node = ParentNode("div", [node])
+        self.assertEqual(node.to_html(), "<div>" * 10_000 + "<b>deep</b>" + "</div>" * 10_000)
+
+
+    def test_to_html_deep_tree_invalid_child(self):
+        node = ParentNode("span", [])
+        for _ in range(5_000):
+            node = ParentNode("div", [node])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+
+    def test_nodes_have_no_dict(self):
+        for node in (HTMLNode("p", "x"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+
+    def test_leaf_repr(self):
+        node = LeafNode("b", "bold", {"class": "x"})
+        self.assertEqual(repr(node), "HTMLNode(b, bold, [], {'class': 'x'})")
+
+
+class TestFreeze(unittest.TestCase):
+    def make_nav(self):
+        self.home = LeafNode("a", "Home", {"href": "/"})
+        self.items = ParentNode("ul", [ParentNode("li", [self.home])])
+        return ParentNode("nav", [self.items], {"class": "top"})
+
+
+    def test_frozen_html_is_reused(self):
+        nav = self.make_nav().freeze()
+        html = nav.to_html()
+        self.assertEqual(html, '<nav class="top"><ul><li><a href="/">Home</a></li></ul></nav>')
+        page = ParentNode("body", [nav, LeafNode("p", "text")])
+        self.assertEqual(page.to_html(), f"<body>{html}<p>text</p></body>")
+        self.assertIs(nav.to_html(), nav.cached_html)
+        self.assertIsInstance(self.home, LeafNode)
+        self.assertFalse(hasattr(self.home, "__dict__"))
+
+
+    def test_attribute_change_invalidates(self):
+        nav = self.make_nav().freeze()
+        self.home.value = "Start"
+        self.assertIsNone(nav.cached_html)
+        self.assertIn(">Start</a>", nav.to_html())
+        nav.props = {"class": "side"}
+        self.assertEqual(nav.to_html(), '<nav class="side"><ul><li><a href="/">Start</a></li></ul></nav>')
+
+
+    def test_children_change_invalidates(self):
+        nav = self.make_nav().freeze()
+        nav.to_html()
+        about = LeafNode("a", "About", {"href": "/about"})
+        self.items.children.append(ParentNode("li", [about]))
+        self.assertIn('<li><a href="/about">About</a></li>', nav.to_html())
+        # Nodes added since are watched after the next render.
+        about.value = "About us"
+        self.assertIn(">About us</a>", nav.to_html())
+        self.items.children.sort(key=lambda li: li.children[0].value)
+        self.assertIn("About us</a></li><li><a", nav.to_html())
+
+
+    def test_nested_frozen_subtrees(self):
+        nav = self.make_nav().freeze()
+        header = ParentNode("header", [LeafNode("h1", "Site"), nav]).freeze()
+        self.home.value = "Start"
+        self.assertIsNone(nav.cached_html)
+        self.assertIsNone(header.cached_html)
+        self.assertEqual(header.to_html(),
+                         '<header><h1>Site</h1><nav class="top"><ul><li><a href="/">Start</a></li></ul></nav></header>')
+        self.assertIsNotNone(nav.cached_html)
+
+
+    def test_shared_subtree_invalidates_every_parent(self):
+        nav = self.make_nav()
+        header = ParentNode("header", [nav]).freeze()
+        footer = ParentNode("footer", [nav]).freeze()
+        header.to_html()
+        footer.to_html()
+        self.home.value = "Start"
+        self.assertIn(">Start</a>", header.to_html())
+        self.assertIn(">Start</a>", footer.to_html())
+
+
+    def test_props_change_invalidates(self):
+        nav = self.make_nav().freeze()
+        self.home.props["href"] = "/start"
+        self.assertIn('<a href="/start">', nav.to_html())
+        nav.props.update({"id": "main"})
+        self.assertTrue(nav.to_html().startswith('<nav class="top" id="main">'))
+
+
+    def test_pickle_frozen(self):
+        nav = self.make_nav().freeze()
+        loaded = pickle.loads(pickle.dumps(nav))
+        self.assertTrue(loaded.frozen)
+        self.assertEqual(loaded.to_html(), nav.to_html())
+        loaded.children[0].children[0].children[0].value = "Start"
+        self.assertIn(">Start</a>", loaded.to_html())
+        self.assertIs(type(pickle.loads(pickle.dumps(self.home))), LeafNode)
+
+
+    def test_unfrozen_tree_is_unchanged(self):
+        node = ParentNode("div", [LeafNode("b", "x")])
+        self.assertIs(type(node), ParentNode)
+        self.assertFalse(node.frozen)
+
+
+class TestWalk(unittest.TestCase):
+    def test_walk_leaf(self):
+        node = LeafNode("b", "bold")
+        self.assertEqual(list(walk(node)), [(ENTER, node), (LEAVE, node)])
+
+
+    def test_walk_order(self):
+        leaf_1 = LeafNode("b", "one")
+        leaf_2 = LeafNode("i", "two")
+        leaf_3 = LeafNode(None, "three")
+        child_node = ParentNode("span", [leaf_1, leaf_2])
+        parent_node = ParentNode("div", [child_node, leaf_3])
+        self.assertEqual(list(walk(parent_node)), [
+            (ENTER, parent_node),
+            (ENTER, child_node),
+            (ENTER, leaf_1), (LEAVE, leaf_1),
+            (ENTER, leaf_2), (LEAVE, leaf_2),
+            (LEAVE, child_node),
+            (ENTER, leaf_3), (LEAVE, leaf_3),
+            (LEAVE, parent_node),
+        ])
+
+
+    def test_walk_deep_tree(self):
+        node = LeafNode("b", "deep")
+        for _ in range(10_000):
+            node = ParentNode("div", [node])
+        depth = 0
+        max_depth = 0
+        for event, _ in walk(node):
+            depth += 1 if event is ENTER else -1
+            max_depth = max(max_depth, depth)
+        self.assertEqual(depth, 0)
+        self.assertEqual(max_depth, 10_001)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.inlinecache import InlineCache, inline_to_html
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_inline_to_html(self):
+        self.assertEqual(inline_to_html("A **bold** [link](https://boot.dev)"),
+                         'A <b>bold</b> <a href="https://boot.dev">link</a>')
+
+
+    def test_cached_html_is_not_escaped_again(self):
+        markdown = "Fish & **chips** < [menu](https://boot.dev/?a=1&b=2)"
+        self.assertEqual(markdown_to_html_node(markdown, InlineCache()).to_html(),
+                         markdown_to_html_node(markdown).to_html())
+
+
+    def test_hits_and_misses(self):
+        cache = InlineCache(maxsize=4)
+        first = cache.inline_to_html("Some _text_")
+        second = cache.inline_to_html("Some _text_")
+        self.assertEqual(first, "Some <i>text</i>")
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1, "maxsize": 4})
+
+
+    def test_evicts_least_recently_used(self):
+        cache = InlineCache(maxsize=2)
+        cache.inline_to_html("a")
+        cache.inline_to_html("b")
+        cache.inline_to_html("a")
+        cache.inline_to_html("c")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+    def test_errors_are_not_cached(self):
+        cache = InlineCache()
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                cache.inline_to_html("**unclosed")
+        self.assertEqual(cache.stats()["size"], 0)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            InlineCache(maxsize=0)
+
+
+    def test_clear(self):
+        cache = InlineCache()
+        cache.inline_to_html("a")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "maxsize": 4096})
+
+
+    def test_shared_between_threads(self):
+        cache = InlineCache(maxsize=8)
+        fragments = [f"fragment **{i}**" for i in range(16)]
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(50):
+                    for fragment in fragments:
+                        self.assertEqual(cache.inline_to_html(fragment), inline_to_html(fragment))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 4 * 50 * 16)
+        self.assertLessEqual(stats["size"], 8)
+
+
+    def test_markdown_with_cache_matches_without(self):
+        markdown = "# Title\n\nSome **bold** text\n\n- [nav](https://boot.dev)\n- [nav](https://boot.dev)\n\n> _quote_"
+        cache = InlineCache()
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(),
+                         markdown_to_html_node(markdown).to_html())
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
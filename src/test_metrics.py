@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+from staticsite import metrics
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.build import build_site
+from staticsite.htmlnode import LeafNode, ParentNode
+from staticsite.metrics import Metrics, collecting, instrumented, stage
+from staticsite.textnode import text_to_textnodes
+
+
+class TestMetrics(unittest.TestCase):
+    def test_nothing_recorded_when_disabled(self):
+        m = Metrics()
+        text_to_textnodes("some **bold** text")
+        self.assertIsNone(metrics.active)
+        self.assertEqual(m.to_dict(), {})
+
+
+    def test_collecting_records_stages(self):
+        with collecting() as m:
+            text_to_textnodes("some **bold** text")
+        self.assertIsNone(metrics.active)
+        inline = m.to_dict()["inline"]
+        self.assertEqual(inline["calls"], 1)
+        self.assertEqual(inline["bytes"], len("some **bold** text"))
+        self.assertGreater(inline["seconds"], 0)
+
+
+    def test_node_conversion_counted_per_fragment(self):
+        with collecting() as m:
+            markdown_to_html_node("some **bold** text\n\nand _more_")
+        stage = m.to_dict()["to_html_node"]
+        self.assertEqual(stage["calls"], 2)
+        self.assertEqual(stage["bytes"], len("some bold textand more"))
+
+
+    def test_nested_calls_counted_once(self):
+        tree = ParentNode("div", [ParentNode("p", [LeafNode("b", "x")]), LeafNode(None, "y")])
+        with collecting() as m:
+            html = tree.to_html()
+        serialize = m.to_dict()["serialize"]
+        self.assertEqual(serialize["calls"], 1)
+        self.assertEqual(serialize["bytes"], len(html))
+
+
+    def test_errors_counted(self):
+        @instrumented("fail")
+        def fail():
+            raise ValueError("boom")
+
+        with collecting() as m:
+            with self.assertRaises(ValueError):
+                fail()
+            with self.assertRaises(KeyError):
+                with stage("block"):
+                    raise KeyError("x")
+        stages = m.to_dict()
+        self.assertEqual((stages["fail"]["calls"], stages["fail"]["errors"]), (1, 1))
+        self.assertEqual((stages["block"]["calls"], stages["block"]["errors"]), (1, 1))
+
+
+    def test_stage_bytes_set_inside_block(self):
+        with collecting() as m:
+            with stage("read") as timing:
+                timing.nbytes = 42
+        self.assertEqual(m.to_dict()["read"]["bytes"], 42)
+        # Disabled stages still hand out something to write to.
+        with stage("read") as timing:
+            timing.nbytes = 1
+
+
+    def test_merge(self):
+        a = Metrics()
+        a.record("write", 10, 0.5)
+        b = Metrics()
+        b.record("write", 5, 0.25, errors=1)
+        b.record("read", 3, 0.1)
+        a.merge(b.to_dict())
+        self.assertEqual(a.to_dict(), {
+            "read": {"calls": 1, "errors": 0, "bytes": 3, "seconds": 0.1},
+            "write": {"calls": 2, "errors": 1, "bytes": 15, "seconds": 0.75},
+        })
+
+
+    def test_prometheus(self):
+        m = Metrics()
+        m.record("write", 10, 0.5)
+        text = m.to_prometheus()
+        self.assertIn("# TYPE staticsite_stage_calls_total counter", text)
+        self.assertIn('staticsite_stage_bytes_total{stage="write"} 10', text)
+        self.assertIn('staticsite_stage_seconds_total{stage="write"} 0.5', text)
+
+
+class TestBuildMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        for n in range(6):
+            path = os.path.join(self.content, f"page{n}.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(f"# Page {n}\n\nSome **bold** text " + "word " * 3000 * (n % 3 + 1))
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def test_serial_build(self):
+        m = Metrics()
+        build_site(self.content, self.public, metrics=m)
+        stages = m.to_dict()
+        self.assertEqual(stages["read"]["calls"], 6)
+        self.assertEqual(stages["write"]["calls"], 6)
+        self.assertGreater(stages["inline"]["bytes"], 0)
+        self.assertIsNone(metrics.active)
+
+
+    def test_parallel_build_merges_workers(self):
+        m = Metrics()
+        build_site(self.content, self.public, jobs=2, metrics=m)
+        stages = m.to_dict()
+        self.assertEqual(stages["read"]["calls"], 6)
+        self.assertEqual(stages["write"]["calls"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import io
+import os
+import tempfile
+import unittest
+
+from staticsite.blocknode import BlockType, iter_blocks, markdown_to_html_file
+from staticsite.mmapsource import MappedSource
+
+
+DOCUMENT = """# Title
+
+A paragraph with **bold**, _italic_ and `code`
+over two lines, a [link](https://boot.dev) and ünïcödé.
+
+- one
+- two with an ![image](https://i.imgur.com/x.png)
+1. first
+2. second
+
+> quoted
+>   text
+
+```
+code
+
+kept as is
+```
+    \t
+## Last
+plain text right after"""
+
+
+class TestMappedSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+
+    def write(self, text, newline=None):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, "w", encoding="utf-8", newline=newline) as fp:
+            fp.write(text)
+        return path
+
+
+    def mapped(self, text, newline=None):
+        source = MappedSource(self.write(text, newline))
+        self.addCleanup(source.close)
+        return source
+
+
+    def assert_same_html(self, text, newline=None):
+        expected = io.StringIO()
+        with open(self.write(text, newline), encoding="utf-8") as fp:
+            markdown_to_html_file(fp, expected)
+        actual = io.StringIO()
+        markdown_to_html_file(self.mapped(text, newline), actual)
+        self.assertEqual(actual.getvalue(), expected.getvalue())
+
+
+    def test_same_html_as_reading_lines(self):
+        self.assert_same_html(DOCUMENT)
+
+
+    def test_same_html_with_crlf(self):
+        self.assert_same_html(DOCUMENT, newline="\r\n")
+
+
+    def test_same_html_with_trailing_newline(self):
+        self.assert_same_html(DOCUMENT + "\n\n")
+
+
+    def test_empty_file(self):
+        self.assert_same_html("")
+        self.assertEqual(len(self.mapped("")), 0)
+
+
+    def test_blank_lines_only(self):
+        self.assert_same_html("\n  \n\t")
+
+
+    def test_unclosed_code_block(self):
+        self.assert_same_html("text\n```\nstill code")
+
+
+    def test_same_block_types(self):
+        with open(self.write(DOCUMENT), encoding="utf-8") as fp:
+            expected = [block_type for block_type, _ in iter_blocks(fp)]
+        actual = [block_type for block_type, _ in self.mapped(DOCUMENT).iter_blocks()]
+        self.assertEqual(actual, expected)
+
+
+    def test_block_markers(self):
+        source = self.mapped("### h\n#######\n- x\n* y\n12. z\n>q\n```py\nplain\n```\n\nplain")
+        self.assertEqual([block_type for block_type, _ in source.iter_blocks()],
+                         [BlockType.HEADING, BlockType.PARAGRAPH, BlockType.UNORDERED_LIST,
+                          BlockType.ORDERED_LIST, BlockType.QUOTE, BlockType.CODE, BlockType.PARAGRAPH])
+
+
+    def test_unicode_whitespace_line_is_blank(self):
+        self.assert_same_html("one\n \u00a0\u2003\ntwo é")
+        self.assertEqual(len(list(self.mapped("one\n\u3000\ntwo").iter_blocks())), 2)
+
+
+    def test_code_block_lines(self):
+        self.assert_same_html("```\n```\n```\n\n```\n```\na\r\n\r\nb\r\n```")
+
+
+    def test_paragraph_decoded_as_one_run(self):
+        blocks = list(self.mapped("one\ntwo\nthree").iter_blocks())
+        self.assertEqual(blocks, [(BlockType.PARAGRAPH, ["one\ntwo\nthree"])])
+
+
+    def test_bare_cr(self):
+        self.assertFalse(self.mapped(DOCUMENT).has_bare_cr())
+        self.assertFalse(self.mapped(DOCUMENT, newline="\r\n").has_bare_cr())
+        self.assertTrue(self.mapped(DOCUMENT, newline="\r").has_bare_cr())
+        self.assertFalse(self.mapped("").has_bare_cr())
+
+
+    def test_context_manager_closes_mapping(self):
+        with MappedSource(self.write(DOCUMENT)) as source:
+            data = source.data
+        self.assertTrue(data.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
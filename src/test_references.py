@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import write_file
+from staticsite.build import build_site
+from staticsite.references import ReferenceIndex, add_references, duplicate_assets, internal_path
+from staticsite.textnode import text_to_textnodes
+
+
+class TestAddReferences(unittest.TestCase):
+    def test_links_and_images(self):
+        refs = []
+        add_references(refs, text_to_textnodes("A [link](a.html), ![img](i.png) and **bold** [b](https://x.y)"))
+        self.assertEqual(refs, [["link", "a.html"], ["image", "i.png"], ["link", "https://x.y"]])
+
+
+class TestInternalPath(unittest.TestCase):
+    def test_paths(self):
+        self.assertEqual(internal_path("blog/post.html", "other.html"), "blog/other.html")
+        self.assertEqual(internal_path("blog/post.html", "../index.html#top"), "index.html")
+        self.assertEqual(internal_path("blog/post.html", "/img/x.png?v=2"), "img/x.png")
+        self.assertEqual(internal_path("blog/post.html", "/docs/"), "docs/")
+        self.assertEqual(internal_path("blog/post.html", "/"), "")
+
+
+    def test_external(self):
+        for url in ("https://boot.dev", "//cdn.example.com/x.js", "mailto:me@x.y", "#section", "?q=1"):
+            self.assertIsNone(internal_path("index.html", url), url)
+
+
+class TestReferenceIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ReferenceIndex(["index.html", "blog/post.html", "docs/index.html"], ["img/logo.png"])
+
+
+    def test_broken(self):
+        self.index.add_page("index.html", [["link", "blog/post.html"], ["link", "blog/missing.html"],
+                                           ["link", "docs/"], ["link", "blog/post"], ["image", "img/logo.png"],
+                                           ["link", "https://elsewhere.example"]])
+        self.index.add_page("blog/post.html", [["link", "../index.html"], ["image", "img/logo.png"],
+                                               ["image", "/img/logo.png"], ["link", "post.html#top"]])
+        self.assertEqual(self.index.broken(), [("blog/post.html", "img/logo.png"),
+                                               ("index.html", "blog/missing.html")])
+        self.assertEqual((self.index.links, self.index.images), (7, 3))
+
+
+    def test_assets(self):
+        self.index.add_page("blog/post.html", [["image", "../img/logo.png"], ["link", "../index.html"]])
+        self.assertEqual(self.index.assets(), {"img/logo.png"})
+
+
+    def test_duplicate_assets(self):
+        hashes = {"a.png": "1", "b.png": "2", "c.png": "1", "d.png": "1"}
+        self.assertEqual(duplicate_assets(hashes, hashes.get), [["a.png", "c.png", "d.png"]])
+
+
+class TestBuildReferences(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        write_file(os.path.join(self.content, "index.md"),
+                   "# Home\n\n[Post](blog/post.html) and [gone](blog/gone.html), ![logo](img/logo.png)")
+        write_file(os.path.join(self.content, "blog", "post.md"),
+                   "[Home](/) and ![copy](../img/copy.png) and [source](https://boot.dev)")
+        write_file(os.path.join(self.content, "img", "logo.png"), "same bytes")
+        write_file(os.path.join(self.content, "img", "copy.png"), "same bytes")
+        write_file(os.path.join(self.content, "img", "other.png"), "same bytes")
+
+
+    def build(self):
+        return build_site(self.content, self.output, references=True)
+
+
+    def test_build(self):
+        refs = self.build()["references"]
+        self.assertEqual((refs["links"], refs["images"]), (4, 2))
+        self.assertEqual(refs["broken"], [["index.html", "blog/gone.html"]])
+        # other.png has the same bytes but nothing uses it.
+        self.assertEqual(refs["duplicate_assets"], [["img/copy.png", "img/logo.png"]])
+
+
+    def test_skipped_pages_keep_references(self):
+        self.build()
+        write_file(os.path.join(self.content, "blog", "gone.md"), "Back again.")
+        stats = self.build()
+        self.assertEqual((stats["built"], stats["skipped"]), (1, 2))
+        self.assertEqual(stats["references"]["broken"], [])
+        self.assertEqual(stats["references"]["links"], 4)
+
+
+    def test_with_search_index(self):
+        build_site(self.content, self.output, references=True)
+        stats = build_site(self.content, self.output, search=True, references=True)
+        self.assertEqual((stats["built"], stats["indexed"]), (2, 2))
+        stats = build_site(self.content, self.output, search=True, references=True)
+        self.assertEqual((stats["skipped"], stats["references"]["images"]), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
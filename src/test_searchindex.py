@@ -0,0 +1,191 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from collections import Counter
+from functools import partial
+
+from fixtures import write_file
+from staticsite.blocknode import markdown_to_html_node
+from staticsite.build import MANIFEST_NAME, build_site
+from staticsite.inlinecache import InlineCache
+from staticsite.searchindex import SEARCH_DIR, SearchIndex, add_terms, shard_of
+from staticsite.textnode import text_to_textnodes
+
+
+def read_index(files):
+    # {file name: bytes} -> (docs, {term: [(doc, count), ...]}), undoing the gaps.
+    meta = json.loads(files["index.json"])
+    postings = {}
+    for number in range(meta["shards"]):
+        shard = json.loads(gzip.decompress(files[f"terms-{number:02d}.json.gz"]))
+        for term, flat in shard.items():
+            assert shard_of(term, meta["shards"]) == number
+            doc = 0
+            postings[term] = []
+            for gap, count in zip(flat[0::2], flat[1::2]):
+                doc += gap
+                postings[term].append((doc, count))
+    return meta["docs"], postings
+
+
+def read_index_dir(path):
+    files = {}
+    for name in os.listdir(path):
+        with open(os.path.join(path, name), "rb") as fp:
+            files[name] = fp.read()
+    return read_index(files)
+
+
+class TestAddTerms(unittest.TestCase):
+    def test_text_of_every_type(self):
+        terms = Counter()
+        add_terms(terms, text_to_textnodes(
+            "Plain **Bold** _italic_ `code` [anchor](https://boot.dev/hidden) ![alt text](https://x.y/img.png) plain"))
+        self.assertEqual(terms, Counter({"plain": 2, "bold": 1, "italic": 1, "code": 1, "anchor": 1,
+                                         "alt": 1, "text": 1}))
+
+
+    def test_collected_during_conversion(self):
+        markdown = "# Title\n\nSome *words* and **words**.\n\n- a list item\n\n```\nnot indexed\n```"
+        terms = Counter()
+        html = markdown_to_html_node(markdown, collect=partial(add_terms, terms)).to_html()
+        self.assertEqual(html, markdown_to_html_node(markdown).to_html())
+        self.assertEqual(terms, Counter({"title": 1, "some": 1, "words": 2, "and": 1, "list": 1, "item": 1}))
+
+
+    def test_collected_with_inline_cache(self):
+        markdown = "Same _line_\n\n- Same _line_"
+        plain, cached = Counter(), Counter()
+        markdown_to_html_node(markdown, collect=partial(add_terms, plain))
+        markdown_to_html_node(markdown, InlineCache(), partial(add_terms, cached))
+        self.assertEqual(cached, plain)
+        self.assertEqual(cached["line"], 2)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_postings(self):
+        index = SearchIndex(shards=4)
+        index.add_page("b.html", "B", {"shared": 2, "only": 1})
+        index.add_page("a.html", "A", {"shared": 1})
+        index.add_page("c.html", "C", {"shared": 3})
+        docs, postings = read_index(dict(index.iter_files()))
+        self.assertEqual(docs, [["a.html", "A"], ["b.html", "B"], ["c.html", "C"]])
+        self.assertEqual(postings, {"shared": [(0, 1), (1, 2), (2, 3)], "only": [(1, 1)]})
+
+
+    def test_same_bytes_in_any_order(self):
+        pages = [(f"{n}.html", f"Page {n}", {"term": n + 1, f"t{n}": 1}) for n in range(10)]
+        forward, backward = SearchIndex(), SearchIndex()
+        for page in pages:
+            forward.add_page(*page)
+        for page in reversed(pages):
+            backward.add_page(*page)
+        self.assertEqual(dict(forward.iter_files()), dict(backward.iter_files()))
+
+
+class TestBuildSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome _home_.")
+        for n in range(12):
+            write_file(os.path.join(self.content, "blog", f"post{n}.md"), f"Post **number{n}** about home.")
+
+
+    def output(self, name="public"):
+        return os.path.join(self.tmp.name, name)
+
+
+    def index(self, name="public"):
+        return read_index_dir(os.path.join(self.output(name), SEARCH_DIR))
+
+
+    def test_build(self):
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual(stats["indexed"], 13)
+        docs, postings = self.index()
+        self.assertEqual(docs[-1], ["index.html", "Home"])
+        self.assertEqual(docs[0], ["blog/post0.html", "post0"])
+        self.assertEqual(len(postings["home"]), 13)
+        self.assertEqual(postings["number3"], [(docs.index(["blog/post3.html", "post3"]), 1)])
+
+
+    def test_skipped_pages_stay_indexed(self):
+        build_site(self.content, self.output(), search=True)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nChanged.")
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual((stats["built"], stats["skipped"], stats["indexed"]), (1, 12, 13))
+        docs, postings = self.index()
+        self.assertEqual(postings["changed"], [(len(docs) - 1, 1)])
+        self.assertEqual(len(postings["home"]), 13)
+
+
+    def test_noop_build_leaves_index_alone(self):
+        build_site(self.content, self.output(), search=True)
+        index_path = os.path.join(self.output(), SEARCH_DIR, "index.json")
+        mtime = os.stat(index_path).st_mtime_ns
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual(stats["built"], 0)
+        self.assertNotIn("indexed", stats)
+        self.assertEqual(os.stat(index_path).st_mtime_ns, mtime)
+        os.remove(index_path)
+        self.assertEqual(build_site(self.content, self.output(), search=True)["indexed"], 13)
+
+
+    def test_terms_kept_out_of_manifest(self):
+        build_site(self.content, self.output(), search=True)
+        with open(os.path.join(self.output(), MANIFEST_NAME)) as fp:
+            page = json.load(fp)["pages"][os.path.join(self.content, "index.md")]
+        self.assertEqual(page["search"], "Home")
+        terms_dir = os.path.join(self.output(), ".build-manifest-terms")
+        with open(os.path.join(terms_dir, "index.html.json")) as fp:
+            self.assertEqual(json.load(fp), {"home": 2, "welcome": 1})
+
+        # A page whose terms file went missing is converted again.
+        os.remove(os.path.join(terms_dir, "blog", "post1.html.json"))
+        self.assertEqual(build_site(self.content, self.output(), search=True)["built"], 1)
+
+        os.remove(os.path.join(self.content, "blog", "post2.md"))
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual((stats["removed"], stats["indexed"]), (1, 12))
+        self.assertFalse(os.path.exists(os.path.join(terms_dir, "blog", "post2.html.json")))
+
+
+    def test_failing_page_without_terms_left_out(self):
+        build_site(self.content, self.output(), search=True)
+        terms_dir = os.path.join(self.output(), ".build-manifest-terms")
+        os.remove(os.path.join(terms_dir, "blog", "post1.html.json"))
+        write_file(os.path.join(self.content, "blog", "post1.md"), "Half typed _emph")
+        write_file(os.path.join(self.content, "blog", "post2.md"), "Post **edited** about home.")
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual([source for source, _ in stats["errors"]],
+                         [os.path.join(self.content, "blog", "post1.md")])
+        self.assertEqual((stats["built"], stats["indexed"]), (1, 12))
+        docs, _ = self.index()
+        self.assertNotIn(["blog/post1.html", "post1"], docs)
+
+        write_file(os.path.join(self.content, "blog", "post1.md"), "Post **fixed** about home.")
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual((stats["built"], stats["errors"], stats["indexed"]), (1, [], 13))
+
+
+    def test_enabling_rebuilds_unindexed_pages(self):
+        build_site(self.content, self.output())
+        stats = build_site(self.content, self.output(), search=True)
+        self.assertEqual((stats["built"], stats["unchanged"]), (13, 13))
+
+
+    def test_same_index_from_every_pipeline(self):
+        build_site(self.content, self.output("serial"), search=True)
+        expected = self.index("serial")
+        for name, options in (("parallel", {"jobs": 2}), ("async", {"pipeline": "async"}),
+                              ("async-parallel", {"jobs": 2, "pipeline": "async"})):
+            build_site(self.content, self.output(name), search=True, **options)
+            self.assertEqual(self.index(name), expected, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+
+from staticsite.inlinecache import inline_to_html
+from staticsite.spanbuffer import SpanBuffer, parse_inline
+from staticsite.textnode import Diagnostics, TextNode, TextType, split_nodes_delimiter, split_nodes_image, text_to_textnodes
+
+
+def outcome(func, mkdntxt):
+    try:
+        return func(mkdntxt)
+    except Exception as e:
+        return ("raised", str(e))
+
+
+class TestSpanBuffer(unittest.TestCase):
+    def test_round_trip(self):
+        nodes = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("link", TextType.LINK, "https://boot.dev"),
+            TextNode("", TextType.TEXT),
+            TextNode("img", TextType.IMAGE, "https://i.imgur.com/a.png"),
+        ]
+        buffer = SpanBuffer.from_textnodes(nodes)
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(buffer.source, "plain boldlinkimg")
+        self.assertEqual((buffer.text(2), buffer.text_type(2), buffer.url(2)),
+                         ("link", TextType.LINK, "https://boot.dev"))
+        self.assertEqual(buffer.to_textnodes(), nodes)
+
+
+    def test_invalid_text_type(self):
+        with self.assertRaises(Exception):
+            SpanBuffer.from_textnodes([TextNode("x", "bold")])
+
+
+    def test_urls_are_shared(self):
+        buffer = parse_inline("[a](https://boot.dev) [b](https://boot.dev) ![c](https://boot.dev)")
+        self.assertEqual(buffer.urls, ["https://boot.dev"])
+        self.assertEqual([buffer.url(i) for i in range(len(buffer))],
+                         ["https://boot.dev", None, "https://boot.dev", None, "https://boot.dev"])
+
+
+    def test_split_delimiter_matches_textnodes(self):
+        nodes = [
+            TextNode("a **b** c****d **e**", TextType.TEXT),
+            TextNode("**not split**", TextType.CODE),
+            TextNode("no delimiter", TextType.TEXT),
+        ]
+        buffer = SpanBuffer.from_textnodes(nodes).split_delimiter("**", TextType.BOLD)
+        self.assertEqual(buffer.to_textnodes(), split_nodes_delimiter(nodes, "**", TextType.BOLD))
+
+
+    def test_split_delimiter_unclosed(self):
+        with self.assertRaises(Exception):
+            SpanBuffer.from_text("a **b").split_delimiter("**", TextType.BOLD)
+
+
+    def test_split_images_matches_textnodes(self):
+        nodes = [
+            TextNode("see ![a](x.png) and ![b](y.png)!", TextType.TEXT),
+            TextNode("![c](z.png)", TextType.BOLD),
+            TextNode("bad ![](x.png)", TextType.TEXT),
+        ]
+        buffer = SpanBuffer.from_textnodes(nodes).split_images()
+        self.assertEqual(buffer.to_textnodes(), split_nodes_image(nodes))
+
+
+    def test_splits_do_not_copy_text(self):
+        source = "**bold** and [link](https://boot.dev)"
+        buffer = parse_inline(source)
+        self.assertIs(buffer.source, source)
+        self.assertEqual(list(buffer.starts), [2, 8, 14])
+        self.assertEqual(list(buffer.ends), [6, 13, 18])
+
+
+    def test_diagnostics(self):
+        diagnostics = Diagnostics()
+        source = "First **line**\n_second_ ![alt]() and\n[](https://boot.dev) [ok](x)"
+        parse_inline(source, diagnostics)
+        expected = Diagnostics()
+        text_to_textnodes(source, expected)
+        self.assertEqual(diagnostics.entries, expected.entries)
+
+
+    def test_to_html(self):
+        source = "A **b** _c_ `d & e` ![e < f](f?a=1&b=\"2\") [g](h) end"
+        self.assertEqual(parse_inline(source).to_html(), inline_to_html(source))
+
+
+    def test_to_html_image_alt_quotes(self):
+        source = "![say \"hi\" & 'bye'](a.png)"
+        self.assertEqual(parse_inline(source).to_html(),
+                         '<img src="a.png" alt="say &quot;hi&quot; &amp; &#x27;bye&#x27;"></img>')
+        self.assertEqual(parse_inline(source).to_html(), inline_to_html(source))
+
+
+    def test_matches_text_to_textnodes_random(self):
+        pieces = ["a", " ", "**", "_", "`", "[", "]", "(", ")", "!", "*", "](",
+                  "![x](u)", "![y](v)", "[y](v)", "[z]()", "[](w)"]
+        rng = random.Random(1414)
+        for _ in range(5000):
+            mkdntxt = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(outcome(lambda text: parse_inline(text).to_textnodes(), mkdntxt),
+                             outcome(text_to_textnodes, mkdntxt), repr(mkdntxt))
+
+
+if __name__ == "__main__":
+    unittest.main()
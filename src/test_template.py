@@ -0,0 +1,78 @@
+import io
+import pickle
+import unittest
+
+from staticsite.escape import SafeString
+from staticsite.htmlnode import LeafNode, ParentNode
+from staticsite.metrics import Metrics, collecting
+from staticsite.template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.render({"Title": "Hi", "Content": SafeString("<p>x</p>")}),
+                         "<title>Hi</title><body><p>x</p></body>")
+
+
+    def test_plain_strings_are_escaped(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        values = {"Title": "Fish & <Chips>", "Content": SafeString("<p>&amp;</p>")}
+        expected = "<title>Fish &amp; &lt;Chips&gt;</title><p>&amp;</p>"
+        self.assertEqual(template.render(values), expected)
+        self.assertEqual("".join(template.iter_html(values)), expected)
+
+
+    def test_matches_str_replace(self):
+        text = "{{ Title }}{{ Content }}a {{ Title }} b{{ Other }}{{Title}}"
+        expected = text.replace("{{ Title }}", "T").replace("{{ Content }}", "C")
+        self.assertEqual(Template(text).render({"Title": "T", "Content": "C"}), expected)
+
+
+    def test_missing_slot_keeps_placeholder(self):
+        self.assertEqual(Template("a{{ Nav }}b").render({}), "a{{ Nav }}b")
+
+
+    def test_values_are_not_substituted_again(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "{{ Content }}", "Content": "c"}), "{{ Content }}|c")
+
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render({"Title": "x"}), "plain")
+        self.assertEqual(Template("").render({}), "")
+
+
+    def test_node_values(self):
+        nav = ParentNode("nav", [LeafNode("a", "home", {"href": "/"})])
+        nav.freeze()
+        template = Template("{{ Nav }}<main>{{ Content }}</main>")
+        values = {"Nav": nav, "Content": ParentNode("p", [LeafNode(None, "a < b")])}
+        expected = '<nav><a href="/">home</a></nav><main><p>a &lt; b</p></main>'
+        self.assertEqual(template.render(values), expected)
+        self.assertEqual("".join(template.iter_html(values)), expected)
+
+
+    def test_render_to(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}{{ Missing }}")
+        content = ParentNode("div", [LeafNode("p", str(n)) for n in range(50)])
+        values = {"Title": "T", "Content": content}
+        fp = io.StringIO()
+        template.render_to(fp, values, buffer_size=4)
+        self.assertEqual(fp.getvalue(), template.render(values))
+
+
+    def test_pickle(self):
+        template = Template("<b>{{ Title }}</b>")
+        self.assertEqual(pickle.loads(pickle.dumps(template)).render({"Title": "x"}), "<b>x</b>")
+
+
+    def test_metrics(self):
+        metrics = Metrics()
+        with collecting(metrics):
+            Template("{{ Title }}!").render({"Title": "abc"})
+        self.assertEqual(metrics.stages["template"]["bytes"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,58 @@
+import contextlib
+import io
+import random
+import re
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links
+from staticsite.textnode import TextNode, TextType, text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links
+from staticsite.textnode import split_nodes_image, split_nodes_link, text_to_textnodes, Diagnostics
+from staticsite.textnode import text_nodes_to_html
+from staticsite.escape import SafeString
+
+
+# Frozen copies of the original image and link splitters (minus their prints), so
+# the reference below doesn't move when split_nodes_image/split_nodes_link are
+# rewritten on top of the scanner's helpers.
+STAGED_IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+STAGED_LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
+def staged_split(old_nodes, pattern, prefix, text_type):
+    resultlst = []
+    for node in old_nodes:
+        extractions = pattern.findall(node.text)
+        # The old extractors raised on no match or any empty text/url, and the
+        # splitters kept the node as it was.
+        if not extractions or any(not text or not url for text, url in extractions):
+            resultlst.append(node)
+            continue
+        remaining = node.text
+        for text, url in extractions:
+            before, remaining = remaining.split(f"{prefix}[{text}]({url})", 1)
+            if before:
+                resultlst.append(TextNode(before, TextType.TEXT))
+            resultlst.append(TextNode(text, text_type, url))
+        if remaining:
+            resultlst.append(TextNode(remaining, TextType.TEXT))
+    return resultlst
+
+
+def staged_text_to_textnodes(mkdntxt):
+    # The old five-stage pipeline, kept here as the reference for text_to_textnodes.
+    nodes = [TextNode(mkdntxt, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = staged_split(nodes, STAGED_IMAGE_PATTERN, "!", TextType.IMAGE)
+    nodes = staged_split(nodes, STAGED_LINK_PATTERN, "", TextType.LINK)
+    return nodes
+
+
+def outcome(func, mkdntxt):
+    try:
+        return func(mkdntxt)
+    except Exception as e:
+        return ("raised", str(e))
 
 class TestTextNode(unittest.TestCase):
     def test_eq_text_type_url_as_none(self):
@@ -39,6 +91,12 @@ class TestTextNode(unittest.TestCase):
         self.assertNotEqual(node, node2)
 
 
+    def test_no_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), 'TextNode("This is a text node", TextType.BOLD)')
+
+
     def test_text_to_html(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -205,6 +263,42 @@ class TestTextNode(unittest.TestCase):
                 "This is text with a ![](https://i.imgur.com/aKaOqIh.gif)")
 
 
+    def test_split_nodes_link_repeated_after_malformed(self):
+        # Splits happen at the match itself, not at the first copy of its text.
+        node = TextNode("![](a.png) [x](b) then ![x](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(new_nodes, [
+            TextNode("![](a.png) ", TextType.TEXT),
+            TextNode("x", TextType.LINK, "b"),
+            TextNode(" then ![x](b)", TextType.TEXT)])
+
+
+    def test_split_nodes_image_many(self):
+        text = "".join(f"see ![img {i}](https://i.imgur.com/{i}.png) " for i in range(100))
+        new_nodes = split_nodes_image([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(new_nodes), 201)
+        self.assertEqual(new_nodes[1], TextNode("img 0", TextType.IMAGE, "https://i.imgur.com/0.png"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
+
+    def test_split_nodes_plain_text_is_silent(self):
+        nodes = [TextNode("Just text.", TextType.TEXT), TextNode("Bad ![](x.png)", TextType.TEXT)]
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            new_nodes = split_nodes_link(split_nodes_image(nodes))
+        self.assertEqual(new_nodes, nodes)
+        self.assertEqual(out.getvalue(), "")
+
+
+    def test_split_nodes_diagnostics(self):
+        diagnostics = Diagnostics()
+        nodes = [TextNode("ok [a](b)", TextType.TEXT), TextNode("line one\nthen [](https://boot.dev)", TextType.TEXT)]
+        new_nodes = split_nodes_link(nodes, diagnostics)
+        self.assertEqual(new_nodes[-1], nodes[1])
+        self.assertEqual(diagnostics.entries, [
+            {"line": 2, "column": 6, "message": "Link [](https://boot.dev) is missing its text."}])
+
+
     def test_extract_link_empty_input(self):
         with self.assertRaises(Exception):
             extract_markdown_links("")
@@ -250,5 +344,136 @@ class TestTextNode(unittest.TestCase):
                 "This is a link [](https://www.youtube.com/@bootdotdev)")
             
 
+class TestTextNodesToHTML(unittest.TestCase):
+    def nodes(self):
+        return [
+            TextNode("plain & <simple> ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("it", TextType.ITALIC),
+            TextNode("a < b", TextType.CODE),
+            TextNode("anchor", TextType.LINK, "https://boot.dev/?a=1&b=\"2\""),
+            TextNode('alt "text"', TextType.IMAGE, "https://i.imgur.com/x.png"),
+            TextNode(SafeString("<br>"), TextType.TEXT),
+        ]
+
+
+    def test_same_as_leaf_nodes(self):
+        nodes = self.nodes()
+        expected = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        html = text_nodes_to_html(nodes)
+        self.assertEqual(html, expected)
+        self.assertIsInstance(html, SafeString)
+
+
+    def test_write_to_buffer(self):
+        out = io.StringIO()
+        self.assertIsNone(text_nodes_to_html(self.nodes(), out))
+        self.assertEqual(out.getvalue(), text_nodes_to_html(self.nodes()))
+
+
+    def test_empty(self):
+        self.assertEqual(text_nodes_to_html([]), "")
+
+
+    def test_invalid_type(self):
+        with self.assertRaises(Exception):
+            text_nodes_to_html([TextNode("text", TextType.TEXT), TextNode("text", "Garbage.")])
+
+
+    def test_missing_text(self):
+        with self.assertRaises(ValueError):
+            text_nodes_to_html([TextNode(None, TextType.BOLD)])
+
+
+    def test_parsed_markdown(self):
+        nodes = text_to_textnodes("Some **bold**, _it_, `code`, [a](https://x.y) and ![i](https://x.y/i.png) & more")
+        self.assertEqual(text_nodes_to_html(nodes),
+                         "".join(text_node_to_html_node(node).to_html() for node in nodes))
+
+
+class TestTextToTextNodes(unittest.TestCase):
+    def assertMatchesStaged(self, mkdntxt):
+        self.assertEqual(outcome(text_to_textnodes, mkdntxt),
+                         outcome(staged_text_to_textnodes, mkdntxt), repr(mkdntxt))
+
+
+    def test_all_types(self):
+        nodes = text_to_textnodes(
+            "This is **text** with an _italic_ word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)")
+        self.assertEqual(nodes, [
+            TextNode("This is ", TextType.TEXT),
+            TextNode("text", TextType.BOLD),
+            TextNode(" with an ", TextType.TEXT),
+            TextNode("italic", TextType.ITALIC),
+            TextNode(" word and a ", TextType.TEXT),
+            TextNode("code block", TextType.CODE),
+            TextNode(" and an ", TextType.TEXT),
+            TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+            TextNode(" and a ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://boot.dev"),
+        ])
+
+
+    def test_empty_input(self):
+        self.assertEqual(text_to_textnodes(""), [TextNode("", TextType.TEXT)])
+
+
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **unclosed and _closed_ text")
+
+
+    def test_unclosed_delimiter_inside_bold_is_ignored(self):
+        self.assertEqual(text_to_textnodes("**snake_case** word"),
+                         [TextNode("snake_case", TextType.BOLD), TextNode(" word", TextType.TEXT)])
+
+
+    def test_diagnostics(self):
+        diagnostics = Diagnostics()
+        nodes = text_to_textnodes("First **line**\n_second_ ![alt]() and\n[](https://boot.dev) [ok](x)", diagnostics)
+        self.assertEqual(nodes[-1], TextNode(" ![alt]() and\n[](https://boot.dev) [ok](x)", TextType.TEXT))
+        self.assertEqual(diagnostics.entries, [
+            {"line": 2, "column": 10, "message": "Image ![alt]() is missing its url."},
+            {"line": 3, "column": 1, "message": "Link [](https://boot.dev) is missing its text."},
+        ])
+
+
+    def test_no_diagnostics_for_valid_text(self):
+        diagnostics = Diagnostics()
+        text_to_textnodes("A **b** _c_ `d` ![e](f) [g](h)", diagnostics)
+        self.assertEqual(len(diagnostics), 0)
+
+
+    def test_matches_staged_pipeline(self):
+        cases = [
+            "plain text",
+            "**bold****more bold**",
+            "a***b***c",
+            "_it_ **b** `c` _d_",
+            "`code with **stars**` and **bold with `ticks`**",
+            "**[bold link](https://boot.dev)** after",
+            "`![code image](https://i.imgur.com/a.png)`",
+            "![](https://i.imgur.com/a.png) and ![ok](https://i.imgur.com/b.png)",
+            "[](https://boot.dev) and [ok](https://boot.dev)",
+            "![img](https://i.imgur.com/a.png)[link](https://boot.dev)",
+            "[link](https://boot.dev)![img](https://i.imgur.com/a.png)",
+            "[[nested](https://boot.dev)]",
+            "_unclosed",
+            "**a** _b",
+        ]
+        for mkdntxt in cases:
+            self.assertMatchesStaged(mkdntxt)
+
+
+    def test_matches_staged_pipeline_random(self):
+        pieces = ["a", " ", "**", "_", "`", "[", "]", "(", ")", "!", "*", "](",
+                  "![x](u)", "![y](v)", "[y](v)", "[z]()", "[](w)"]
+        rng = random.Random(808)
+        for _ in range(5000):
+            mkdntxt = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertMatchesStaged(mkdntxt)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,266 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from fixtures import bump_mtime, read_file, write_file
+from staticsite.build import build_site
+from staticsite.watch import InotifyWatcher, LiveSite, PollWatcher, open_watcher, watch
+
+
+def inotify_available():
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        InotifyWatcher([]).close()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+class SiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.index = os.path.join(self.content, "index.md")
+        write_file(self.index, "# Home\n\nWelcome _home_.")
+        write_file(os.path.join(self.content, "blog", "post.md"), "A [link](https://boot.dev).")
+        write_file(self.template, "<title>{{ Title }}</title>{{ include nav.html }}{{ Content }}")
+        write_file(os.path.join(self.tmp.name, "nav.html"), "<nav>nav</nav>")
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestLiveSite(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        build_site(self.content, self.output, self.template)
+        self.site = LiveSite(self.content, self.output, self.template)
+        self.site.render(self.index)
+
+
+    def test_tracks_template_includes(self):
+        self.assertEqual(self.site.template_files, {self.template, os.path.join(self.tmp.name, "nav.html")})
+
+
+    def test_edit_rerenders_page(self):
+        write_file(self.index, "# Home\n\nEdited **home**.")
+        results = self.site.handle({self.index})
+        self.assertEqual([(path, action) for path, action, _ in results], [(self.index, "rendered")])
+        self.assertIn("<b>home</b>", read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_new_page_rendered(self):
+        page = os.path.join(self.content, "blog", "new.md")
+        write_file(page, "# New\n\nFresh.")
+        self.site.handle({page})
+        self.assertIn("<title>New</title>", read_file(os.path.join(self.output, "blog", "new.html")))
+
+
+    def test_deleted_page_removed(self):
+        os.remove(self.index)
+        results = self.site.handle({self.index})
+        self.assertEqual([action for _, action, _ in results], ["removed"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+        self.assertNotIn(self.index, self.site.pages)
+
+
+    def test_non_markdown_ignored(self):
+        other = os.path.join(self.content, "notes.txt")
+        write_file(other, "not a page")
+        self.assertEqual(self.site.handle({other}), [])
+
+
+    def test_failing_edit_keeps_last_output(self):
+        before = read_file(os.path.join(self.output, "index.html"))
+        post = os.path.join(self.content, "blog", "post.md")
+        write_file(self.index, "# Home\n\nHalf typed _emph")
+        write_file(post, "Still **fine**.")
+        results = self.site.handle({self.index, post})
+        self.assertEqual(sorted((path, action) for path, action, _ in results),
+                         [(post, "rendered"), (self.index, "failed")])
+        self.assertIn("unclosed delimiters", self.site.errors[self.index])
+        self.assertEqual(read_file(os.path.join(self.output, "index.html")), before)
+        self.assertIn("<b>fine</b>", read_file(os.path.join(self.output, "blog", "post.html")))
+
+        write_file(self.index, "# Home\n\nWhole _emph_.")
+        self.site.handle({self.index})
+        self.assertEqual(self.site.errors, {})
+        self.assertIn("<i>emph</i>", read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_include_change_retemplates_rendered_pages(self):
+        nav = os.path.join(self.tmp.name, "nav.html")
+        write_file(nav, "<nav>new nav</nav>")
+        results = self.site.handle({nav})
+        post = os.path.join(self.content, "blog", "post.md")
+        self.assertEqual(sorted((path, action) for path, action, _ in results),
+                         [(post, "rendered"), (self.index, "templated")])
+        self.assertIn("<nav>new nav</nav>", read_file(os.path.join(self.output, "index.html")))
+        self.assertIn("<nav>new nav</nav>", read_file(os.path.join(self.output, "blog", "post.html")))
+
+
+    def test_failing_template_keeps_last_template(self):
+        before = read_file(os.path.join(self.output, "index.html"))
+        footer = os.path.join(self.tmp.name, "footer.html")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}{{ include footer.html }}")
+        results = self.site.handle({self.template})
+        self.assertEqual([(path, action) for path, action, _ in results], [(self.template, "failed")])
+        self.assertIn("footer.html", self.site.errors[self.template])
+        self.assertIn(footer, self.site.template_files)
+        self.assertEqual(read_file(os.path.join(self.output, "index.html")), before)
+
+        # Pages still render with the last good template meanwhile.
+        write_file(self.index, "# Home\n\nEdited.")
+        self.site.handle({self.index})
+        self.assertIn("<nav>nav</nav>", read_file(os.path.join(self.output, "index.html")))
+
+        write_file(footer, "<footer>foot</footer>")
+        results = self.site.handle({footer})
+        self.assertEqual(self.site.errors, {})
+        self.assertIn((self.index, "templated"), [(path, action) for path, action, _ in results])
+        self.assertTrue(read_file(os.path.join(self.output, "index.html")).endswith("<footer>foot</footer>"))
+
+
+class TestPollWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.watcher = PollWatcher([self.content], [self.template], interval=0.01)
+
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.watcher.wait(timeout=0), set())
+
+
+    def test_detects_modify_add_and_delete(self):
+        write_file(self.index, "# Home\n\nChanged.")
+        bump_mtime(self.index)
+        added = os.path.join(self.content, "new", "page.md")
+        write_file(added, "new")
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        self.assertEqual(self.watcher.wait(timeout=1), {self.index, added, post})
+        self.assertEqual(self.watcher.wait(timeout=0), set())
+
+
+    def test_detects_watched_file(self):
+        write_file(self.template, "{{ Content }}")
+        bump_mtime(self.template)
+        self.assertEqual(self.watcher.wait(timeout=1), {self.template})
+
+
+@unittest.skipUnless(inotify_available(), "inotify not available")
+class TestInotifyWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.watcher = InotifyWatcher([self.content], [self.template])
+        self.addCleanup(self.watcher.close)
+
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.watcher.wait(timeout=0), set())
+
+
+    def test_detects_modify_and_delete(self):
+        write_file(self.index, "# Home\n\nChanged.")
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        self.assertEqual(self.watcher.wait(timeout=1), {self.index, post})
+
+
+    def test_detects_pages_in_new_directory(self):
+        page = os.path.join(self.content, "new", "page.md")
+        write_file(page, "new")
+        self.assertIn(page, self.watcher.wait(timeout=1))
+        write_file(page, "newer")
+        self.assertEqual(self.watcher.wait(timeout=1), {page})
+
+
+    def test_filters_siblings_of_watched_file(self):
+        write_file(os.path.join(self.tmp.name, "unrelated.txt"), "x")
+        write_file(self.template, "{{ Content }}")
+        self.assertEqual(self.watcher.wait(timeout=1), {self.template})
+
+
+    def test_open_watcher_prefers_inotify(self):
+        watcher = open_watcher([self.content])
+        self.addCleanup(watcher.close)
+        self.assertIsInstance(watcher, InotifyWatcher)
+        self.assertIsInstance(open_watcher([self.content], poll=True), PollWatcher)
+
+
+class TestWatch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stop = threading.Event()
+        self.reports = []
+        self.thread = threading.Thread(target=watch, args=(self.content, self.output, self.template),
+                                       kwargs={"interval": 0.01, "poll": True, "report": self.reports.append,
+                                               "stop": self.stop})
+        self.thread.start()
+
+
+    def tearDown(self):
+        # Before the site goes: the watcher builds it once more on the way out.
+        self.stop.set()
+        self.thread.join()
+        super().tearDown()
+
+
+    def wait_until(self, condition, timeout=5):
+        # Fails rather than hanging if the watch thread dies or condition never holds.
+        deadline = time.monotonic() + timeout
+        while not condition() and self.thread.is_alive() and time.monotonic() < deadline:
+            self.thread.join(0.01)
+        self.assertTrue(self.thread.is_alive(), "watch thread exited")
+        self.assertTrue(condition(), self.reports)
+
+
+    def edit(self, text):
+        # Written aside and renamed into place, so the watcher never sees the page
+        # half written.
+        tmp_path = os.path.join(self.tmp.name, "edit.tmp")
+        write_file(tmp_path, text)
+        bump_mtime(tmp_path)
+        os.replace(tmp_path, self.index)
+
+
+    def rendered(self, text):
+        # The page's output holds text and the watcher has reported rendering it.
+        return lambda: (self.reports[-1].startswith("rendered index.md in ")
+                        and text in read_file(os.path.join(self.output, "index.html")))
+
+
+    def test_renders_edits_until_stopped(self):
+        self.wait_until(lambda: self.reports)
+        self.edit("# Home\n\nWatched.")
+        self.wait_until(self.rendered("Watched."))
+
+
+    def test_keeps_watching_after_failing_page(self):
+        self.wait_until(lambda: self.reports)
+        self.edit("# Home\n\nHalf typed _emph")
+        self.wait_until(lambda: len(self.reports) > 1)
+        self.assertTrue(self.reports[1].startswith("failed index.md: There are unclosed delimiters"))
+        self.edit("# Home\n\nWhole _emph_.")
+        self.wait_until(self.rendered("<i>emph</i>"))
+
+
+    def test_keeps_watching_after_failing_template(self):
+        self.wait_until(lambda: self.reports)
+        footer = os.path.join(self.tmp.name, "footer.html")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}{{ include footer.html }}")
+        bump_mtime(self.template)
+        self.wait_until(lambda: any(report.startswith("failed ../template.html: ") for report in self.reports))
+        write_file(footer, "<footer>foot</footer>")
+        self.wait_until(lambda: "<footer>foot</footer>" in read_file(os.path.join(self.output, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()